@@ -1 +1,46 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import UserProfile
+
+
+class AccountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_register_creates_user_and_profile(self):
+        response = self.client.post(
+            reverse('register'),
+            {'username': 'alice', 'email': 'alice@example.com', 'password': 'pw-alice-123'},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(username='alice')
+        self.assertTrue(UserProfile.objects.filter(user=user).exists())
+
+    def test_login_returns_tokens_that_authenticate(self):
+        User.objects.create_user(username='bob', password='pw-bob-123')
+
+        response = self.client.post(
+            reverse('token_obtain_pair'),
+            {'username': 'bob', 'password': 'pw-bob-123'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        profile = self.client.get(reverse('profile'))
+        self.assertEqual(profile.status_code, 200)
+        self.assertEqual(profile.data['user']['username'], 'bob')
+
+    def test_profile_update(self):
+        user = User.objects.create_user(username='carol', password='pw')
+        self.client.force_authenticate(user)
+
+        response = self.client.put(reverse('profile'), {'bio': 'Physics'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(UserProfile.objects.get(user=user).bio, 'Physics')
@@ -5,36 +5,62 @@ import threading
 from typing import Any, Dict, Union
 
 
+_DELETED = object()
+
+
 class _CVar:
-    """Storage utility for Local."""
+    """Storage utility for Local.
+
+    Every attribute is kept in its own ContextVar, created on first write.
+    The interpreter's context is already a persistent (copy-on-write) map,
+    so setting one attribute costs the same however many others are set,
+    and copying a context to another thread or task copies nothing.
+    """
 
     def __init__(self) -> None:
-        self._data: "contextvars.ContextVar[Dict[str, Any]]" = contextvars.ContextVar(
-            "asgiref.local"
-        )
+        self._vars: "Dict[str, contextvars.ContextVar[Any]]" = {}
+        self._create_lock = threading.Lock()
+
+    def _var(self, key: str) -> "contextvars.ContextVar[Any]":
+        var = self._vars.get(key)
+        if var is None:
+            with self._create_lock:
+                var = self._vars.get(key)
+                if var is None:
+                    var = contextvars.ContextVar(f"asgiref.local.{key}")
+                    self._vars[key] = var
+        return var
+
+    # Local calls _get/_set/_delete directly; the attribute protocol is kept
+    # for the thread-critical storage, which treats both kinds alike.
+
+    def _get(self, key: str) -> Any:
+        var = self._vars.get(key)
+        if var is not None:
+            value = var.get(_DELETED)
+            if value is not _DELETED:
+                return value
+        raise AttributeError(f"{self!r} object has no attribute {key!r}")
+
+    def _set(self, key: str, value: Any) -> None:
+        self._var(key).set(value)
+
+    def _delete(self, key: str) -> None:
+        var = self._vars.get(key)
+        if var is None or var.get(_DELETED) is _DELETED:
+            raise AttributeError(f"{self!r} object has no attribute {key!r}")
+        var.set(_DELETED)
 
     def __getattr__(self, key):
-        storage_object = self._data.get({})
-        try:
-            return storage_object[key]
-        except KeyError:
-            raise AttributeError(f"{self!r} object has no attribute {key!r}")
+        return self._get(key)
 
     def __setattr__(self, key: str, value: Any) -> None:
-        if key == "_data":
+        if key in ("_vars", "_create_lock"):
             return super().__setattr__(key, value)
-
-        storage_object = self._data.get({}).copy()
-        storage_object[key] = value
-        self._data.set(storage_object)
+        self._set(key, value)
 
     def __delattr__(self, key: str) -> None:
-        storage_object = self._data.get({}).copy()
-        if key in storage_object:
-            del storage_object[key]
-            self._data.set(storage_object)
-        else:
-            raise AttributeError(f"{self!r} object has no attribute {key!r}")
+        self._delete(key)
 
 
 class Local:
@@ -116,16 +142,25 @@ class Local:
             with self._thread_lock:
                 yield self._storage
 
+    # Context variable storage is safe to use from any thread without the
+    # lock (each thread runs in its own context), so it skips _lock_storage.
+
     def __getattr__(self, key):
+        if not self._thread_critical:
+            return self._storage._get(key)
         with self._lock_storage() as storage:
             return getattr(storage, key)
 
     def __setattr__(self, key, value):
         if key in ("_local", "_storage", "_thread_critical", "_thread_lock"):
             return super().__setattr__(key, value)
+        if not self._thread_critical:
+            return self._storage._set(key, value)
         with self._lock_storage() as storage:
             setattr(storage, key, value)
 
     def __delattr__(self, key):
+        if not self._thread_critical:
+            return self._storage._delete(key)
         with self._lock_storage() as storage:
             delattr(storage, key)
@@ -6,9 +6,10 @@ import inspect
 import os
 import sys
 import threading
+import time
 import warnings
 import weakref
-from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -41,15 +42,19 @@ _P = ParamSpec("_P")
 _R = TypeVar("_R")
 
 
+_MISSING = object()
+
+
 def _restore_context(context: contextvars.Context) -> None:
     # Check for changes in contextvars, and set them to the current
     # context for downstream consumers
-    for cvar in context:
-        cvalue = context.get(cvar)
-        try:
-            if cvar.get() != cvalue:
-                cvar.set(cvalue)
-        except LookupError:
+    current = contextvars.copy_context()
+    # Contexts share structure, so when nothing was set in ``context`` since
+    # it was copied from the current one this is an identity check
+    if context == current:
+        return
+    for cvar, cvalue in context.items():
+        if current.get(cvar, _MISSING) is not cvalue:
             cvar.set(cvalue)
 
 
@@ -373,6 +378,106 @@ class AsyncToSync(Generic[_P, _R]):
             context[0] = contextvars.copy_context()
 
 
+class ExecutorStats:
+    """
+    Counters for the calls SyncToAsync sends to one executor.
+
+    ``queued`` is the number of calls submitted but not yet started (the
+    queue depth), ``active`` the number currently running in a thread. Wait
+    time runs from submission until a thread picks the call up.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.queued = 0
+        self.active = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def submit(self) -> "_Call":
+        with self._lock:
+            self.calls += 1
+            self.queued += 1
+        return _Call(self)
+
+    def snapshot(self) -> Dict[str, Union[int, float]]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "queued": self.queued,
+                "active": self.active,
+                "wait_seconds": self.wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+                "run_seconds": self.run_seconds,
+            }
+
+
+class _Call:
+    """
+    One call's passage through an executor; see ExecutorStats.
+    """
+
+    __slots__ = ("stats", "submitted_at", "started")
+
+    def __init__(self, stats: ExecutorStats) -> None:
+        self.stats = stats
+        self.submitted_at = time.perf_counter()
+        self.started = False
+
+    def run(self, func: Callable[[], _R]) -> _R:
+        stats = self.stats
+        started_at = time.perf_counter()
+        wait = started_at - self.submitted_at
+        with stats._lock:
+            if not self.started:
+                self.started = True
+                stats.queued -= 1
+            stats.active += 1
+            stats.wait_seconds += wait
+            if wait > stats.max_wait_seconds:
+                stats.max_wait_seconds = wait
+        try:
+            return func()
+        finally:
+            with stats._lock:
+                stats.active -= 1
+                stats.run_seconds += time.perf_counter() - started_at
+
+    def abandon(self) -> None:
+        # A call cancelled before a thread picked it up never runs.
+        if self.started:
+            return
+        with self.stats._lock:
+            if not self.started:
+                self.started = True
+                self.stats.queued -= 1
+
+
+def register_executor(name: str, executor: Executor) -> None:
+    """
+    Make ``executor`` available to ``sync_to_async(..., executor=name)``.
+    """
+    SyncToAsync.named_executors[name] = executor
+
+
+def set_default_executor(executor: Optional[Executor]) -> None:
+    """
+    Run non-thread-sensitive calls that don't name an executor on
+    ``executor`` instead of the event loop's default one.
+    """
+    SyncToAsync.default_executor = executor
+
+
+def executor_stats() -> Dict[str, Dict[str, Union[int, float]]]:
+    """
+    A snapshot of ExecutorStats per executor label: "thread_sensitive",
+    "default", "custom" (an executor object passed in) or a registered name.
+    """
+    return {label: stats.snapshot() for label, stats in list(SyncToAsync.stats.items())}
+
+
 class SyncToAsync(Generic[_P, _R]):
     """
     Utility class which turns a synchronous callable into an awaitable that
@@ -392,7 +497,11 @@ class SyncToAsync(Generic[_P, _R]):
 
     If executor is passed in, that will be used instead of the loop's default executor.
     In order to pass in an executor, thread_sensitive must be set to False, otherwise
-    a TypeError will be raised.
+    a TypeError will be raised. The executor may also be given as the name it was
+    registered under with register_executor(); it is looked up on every call.
+
+    Every call is counted in SyncToAsync.stats (see ExecutorStats), keyed by
+    the executor it ran on.
     """
 
     # Storage for main event loop references
@@ -419,11 +528,20 @@ class SyncToAsync(Generic[_P, _R]):
         weakref.WeakKeyDictionary()
     )
 
+    # Executors registered by name (see register_executor) and the one used
+    # instead of the loop's default (see set_default_executor)
+    named_executors: "Dict[str, Executor]" = {}
+    default_executor: Optional[Executor] = None
+
+    # ExecutorStats per executor label
+    stats: "Dict[str, ExecutorStats]" = {}
+    _stats_lock = threading.Lock()
+
     def __init__(
         self,
         func: Callable[_P, _R],
         thread_sensitive: bool = True,
-        executor: Optional["ThreadPoolExecutor"] = None,
+        executor: Optional[Union[Executor, str]] = None,
     ) -> None:
         if (
             not callable(func)
@@ -449,6 +567,7 @@ class SyncToAsync(Generic[_P, _R]):
 
         # Work out what thread to run the code in
         if self._thread_sensitive:
+            label = "thread_sensitive"
             current_thread_executor = getattr(AsyncToSync.executors, "current", None)
             if current_thread_executor:
                 # If we have a parent sync thread above somewhere, use that
@@ -477,8 +596,20 @@ class SyncToAsync(Generic[_P, _R]):
                 executor = self.single_thread_executor
                 self.deadlock_context.set(True)
         else:
-            # Use the passed in executor, or the loop's default if it is None
+            # Use the passed in (or named) executor, or the configured default,
+            # or the loop's default if that is None too
             executor = self._executor
+            if isinstance(executor, str):
+                label = executor
+                try:
+                    executor = self.named_executors[label]
+                except KeyError:
+                    raise LookupError(f"No executor registered as {label!r}") from None
+            elif executor is None:
+                label = "default"
+                executor = self.default_executor
+            else:
+                label = "custom"
 
         context = contextvars.copy_context()
         child = functools.partial(self.func, *args, **kwargs)
@@ -486,17 +617,25 @@ class SyncToAsync(Generic[_P, _R]):
         task_context: List[asyncio.Task[Any]] = []
 
         # Run the code in the right thread
-        exec_coro = loop.run_in_executor(
-            executor,
-            functools.partial(
-                self.thread_handler,
-                loop,
-                sys.exc_info(),
-                task_context,
-                func,
-                child,
-            ),
-        )
+        call = self._stats_for(label).submit()
+        try:
+            exec_coro = loop.run_in_executor(
+                executor,
+                functools.partial(
+                    call.run,
+                    functools.partial(
+                        self.thread_handler,
+                        loop,
+                        sys.exc_info(),
+                        task_context,
+                        func,
+                        child,
+                    ),
+                ),
+            )
+        except BaseException:
+            call.abandon()
+            raise
         ret: _R
         try:
             ret = await asyncio.shield(exec_coro)
@@ -518,11 +657,20 @@ class SyncToAsync(Generic[_P, _R]):
                 exec_coro.cancel()
             ret = await exec_coro
         finally:
+            call.abandon()
             _restore_context(context)
             self.deadlock_context.set(False)
 
         return ret
 
+    @classmethod
+    def _stats_for(cls, label: str) -> ExecutorStats:
+        stats = cls.stats.get(label)
+        if stats is None:
+            with cls._stats_lock:
+                stats = cls.stats.setdefault(label, ExecutorStats())
+        return stats
+
     def __get__(
         self, parent: Any, objtype: Any
     ) -> Callable[_P, Coroutine[Any, Any, _R]]:
@@ -610,7 +758,7 @@ def async_to_sync(
 def sync_to_async(
     *,
     thread_sensitive: bool = True,
-    executor: Optional["ThreadPoolExecutor"] = None,
+    executor: Optional[Union["Executor", str]] = None,
 ) -> Callable[[Callable[_P, _R]], Callable[_P, Coroutine[Any, Any, _R]]]:
     ...
 
@@ -620,7 +768,7 @@ def sync_to_async(
     func: Callable[_P, _R],
     *,
     thread_sensitive: bool = True,
-    executor: Optional["ThreadPoolExecutor"] = None,
+    executor: Optional[Union["Executor", str]] = None,
 ) -> Callable[_P, Coroutine[Any, Any, _R]]:
     ...
 
@@ -629,7 +777,7 @@ def sync_to_async(
     func: Optional[Callable[_P, _R]] = None,
     *,
     thread_sensitive: bool = True,
-    executor: Optional["ThreadPoolExecutor"] = None,
+    executor: Optional[Union["Executor", str]] = None,
 ) -> Union[
     Callable[[Callable[_P, _R]], Callable[_P, Coroutine[Any, Any, _R]]],
     Callable[_P, Coroutine[Any, Any, _R]],
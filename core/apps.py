@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "core"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import executors, queryhooks
+
+        executors.configure()
+        connection_created.connect(queryhooks.install, dispatch_uid='core.queryhooks.install')
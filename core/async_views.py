@@ -0,0 +1,55 @@
+"""
+Async read endpoints.
+
+DRF's APIView is synchronous, so under ASGI every request to it is
+handed to a worker thread for its whole lifetime. AsyncAPIView is a plain
+Django async view that keeps DRF's pieces that matter for the read
+endpoints (authentication classes, ``request.query_params``, renderers,
+APIException handling) and leaves the event loop only for the JWT user
+lookup and the queries themselves. Every handler requires an
+authenticated user, like IsAuthenticated on the sync views.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    content = b'' if data is None else renderer.render(data)
+    return HttpResponse(
+        content, status=status, headers=headers, content_type=renderer.media_type
+    )
+
+
+class AsyncAPIView(View):
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        handler = getattr(self, method, None) if method in self.http_method_names else None
+        if handler is None:
+            return json_response(
+                {"detail": f'Method "{request.method}" not allowed.'},
+                status.HTTP_405_METHOD_NOT_ALLOWED,
+                {'Allow': ', '.join(self._allowed_methods())},
+            )
+
+        request = Request(
+            request,
+            authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+        )
+        try:
+            # Authenticating looks the user up in the database.
+            user = await sync_to_async(lambda: request.user)()
+            if not user.is_authenticated:
+                raise NotAuthenticated()
+            return await handler(request, *args, **kwargs)
+        except APIException as exc:
+            headers = None
+            if isinstance(exc, (NotAuthenticated, AuthenticationFailed)) and request.authenticators:
+                challenge = request.authenticators[0].authenticate_header(request)
+                headers = {'WWW-Authenticate': challenge} if challenge else None
+            return json_response({"detail": exc.detail}, exc.status_code, headers)
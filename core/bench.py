@@ -0,0 +1,14 @@
+"""
+Helpers shared by the benchmark and load test commands.
+"""
+import math
+
+
+def percentile(values, p):
+    """
+    Nearest-rank percentile of ``values``; 0.0 for an empty list.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
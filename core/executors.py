@@ -0,0 +1,65 @@
+"""
+Thread pools for sync_to_async, built from settings.ASYNC_EXECUTORS.
+
+'default' replaces the event loop's default executor, which runs
+sync_to_async(..., thread_sensitive=False) calls that don't name a pool.
+Any other entry is registered by name, so CPU-bound work can be kept off
+the pool used for blocking I/O:
+
+    await sync_to_async(serialize, thread_sensitive=False, executor='serialization')()
+
+Thread-sensitive calls (the ORM) still run on asgiref's per-request
+thread; their counters are reported under "thread_sensitive".
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import executor_stats, register_executor, set_default_executor
+from django.conf import settings
+
+
+executors = {}
+
+
+def configure():
+    for name, options in settings.ASYNC_EXECUTORS.items():
+        if name in executors:
+            continue
+        executor = ThreadPoolExecutor(thread_name_prefix=f'sync-{name}', **options)
+        executors[name] = executor
+        if name == 'default':
+            set_default_executor(executor)
+        else:
+            register_executor(name, executor)
+
+
+METRICS = (
+    ('calls', 'counter', 'Calls submitted through sync_to_async.'),
+    ('queued', 'gauge', 'Calls waiting for a thread.'),
+    ('active', 'gauge', 'Calls running in a thread.'),
+    ('wait_seconds', 'counter', 'Time calls spent waiting for a thread.'),
+    ('max_wait_seconds', 'gauge', 'Longest time a call waited for a thread.'),
+    ('run_seconds', 'counter', 'Time calls spent running.'),
+)
+
+
+def render_metrics():
+    """
+    The executor counters in the Prometheus text format.
+    """
+    stats = sorted(executor_stats().items())
+    lines = [
+        '# HELP studycircle_sync_executor_max_workers Threads in each configured pool.',
+        '# TYPE studycircle_sync_executor_max_workers gauge',
+    ]
+    for name, executor in sorted(executors.items()):
+        lines.append(
+            f'studycircle_sync_executor_max_workers{{executor="{name}"}} {executor._max_workers}'
+        )
+    for field, kind, help_text in METRICS:
+        name = f'studycircle_sync_executor_{field}'
+        if kind == 'counter':
+            name += '_total'
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for label, values in stats:
+            lines.append(f'{name}{{executor="{label}"}} {values[field]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,204 @@
+"""
+Live group activity over Server-Sent Events and WebSockets.
+
+    GET /api/live/groups/<group_id>/   text/event-stream
+    WS  /ws/groups/<group_id>/
+
+Both are served straight from the ASGI application (core/asgi.py) rather
+than through Django's request handling, so an open stream holds no
+worker thread. Callers authenticate with their JWT access token, in an
+``Authorization: Bearer`` header or, since EventSource and browser
+WebSockets can't set headers, a ``token`` query parameter, and must be
+members of the group. The token and membership are checked again every
+LIVE_KEEPALIVE_SECONDS, and the stream is closed once the token has
+expired or the user has left the group. Events are the ones published to the group id
+through core.pubsub: ``doubt_created``, ``reply_created`` and
+``solution_marked``, carrying only ``doubt_id`` (and ``reply_id`` where
+there is one); clients fetch the doubt from the REST API. A reconnecting
+client should re-read the doubt list once; missed events aren't
+replayed.
+"""
+import asyncio
+import json
+import re
+from functools import partial
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .pubsub import hub
+
+
+SSE_PATH = re.compile(r'^/api/live/groups/(\d+)/$')
+WEBSOCKET_PATH = re.compile(r'^/ws/groups/(\d+)/$')
+
+# Close code for a refused WebSocket; servers answer the handshake with 403.
+WEBSOCKET_FORBIDDEN = 4403
+
+
+def _token(scope):
+    for name, value in scope.get('headers', ()):
+        if name == b'authorization':
+            scheme, _, token = value.decode('latin-1').partition(' ')
+            if scheme.lower() == 'bearer' and token:
+                return token
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    return query.get('token', [None])[0]
+
+
+def _authorize(token, group_id):
+    """
+    The id of the token's user if they are a member of the group.
+    """
+    from groups_app import membership
+
+    if not token:
+        return None
+    try:
+        user_id = AccessToken(token)[jwt_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+    try:
+        return user_id if membership.is_member(user_id, group_id) else None
+    finally:
+        close_old_connections()
+
+
+async def _wait_for(receive, message_type):
+    while (await receive())['type'] != message_type:
+        pass
+
+
+async def _stream(subscription, receive, disconnect_type, send_event, send_keepalive, authorize):
+    """
+    Forward the subscription's events until the client disconnects,
+    sending a keepalive after LIVE_KEEPALIVE_SECONDS without one. Every
+    LIVE_KEEPALIVE_SECONDS ``authorize()`` is awaited again; returns True
+    if the stream ended because it returned None.
+    """
+    loop = asyncio.get_running_loop()
+    interval = settings.LIVE_KEEPALIVE_SECONDS
+    recheck_at = loop.time() + interval
+    disconnected = asyncio.ensure_future(_wait_for(receive, disconnect_type))
+    next_event = asyncio.ensure_future(subscription.get())
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {next_event, disconnected},
+                timeout=max(0, recheck_at - loop.time()),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnected in done:
+                return False
+            if next_event in done:
+                await send_event(next_event.result())
+                next_event = asyncio.ensure_future(subscription.get())
+            if loop.time() >= recheck_at:
+                if await authorize() is None:
+                    return True
+                recheck_at = loop.time() + interval
+                if next_event not in done:
+                    await send_keepalive()
+    except OSError:
+        # The server reports a client that went away mid-send this way.
+        return False
+    finally:
+        hub.unsubscribe(subscription)
+        disconnected.cancel()
+        next_event.cancel()
+
+
+async def _reject(send, status, detail):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps({'detail': detail}).encode()})
+
+
+async def server_sent_events(scope, receive, send, group_id):
+    if scope['method'] != 'GET':
+        await _reject(send, 405, 'Method not allowed.')
+        return
+    authorize = partial(sync_to_async(_authorize), _token(scope), group_id)
+    if await authorize() is None:
+        await _reject(send, 403, 'A valid token for a member of this group is required.')
+        return
+
+    subscription = hub.subscribe(group_id)
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            # Stop nginx buffering the stream.
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+
+    async def send_event(event):
+        body = f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+        await send({'type': 'http.response.body', 'body': body.encode(), 'more_body': True})
+
+    async def send_keepalive():
+        await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+
+    revoked = await _stream(
+        subscription, receive, 'http.disconnect', send_event, send_keepalive, authorize
+    )
+    if revoked:
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+async def websocket(scope, receive, send, group_id):
+    if (await receive())['type'] != 'websocket.connect':
+        return
+    authorize = partial(sync_to_async(_authorize), _token(scope), group_id)
+    if await authorize() is None:
+        await send({'type': 'websocket.close', 'code': WEBSOCKET_FORBIDDEN})
+        return
+
+    subscription = hub.subscribe(group_id)
+    await send({'type': 'websocket.accept'})
+
+    async def send_event(event):
+        await send({'type': 'websocket.send', 'text': json.dumps(event)})
+
+    async def send_keepalive():
+        # WebSocket servers ping on their own.
+        pass
+
+    revoked = await _stream(
+        subscription, receive, 'websocket.disconnect', send_event, send_keepalive, authorize
+    )
+    if revoked:
+        await send({'type': 'websocket.close', 'code': WEBSOCKET_FORBIDDEN})
+
+
+def route(django_application):
+    """
+    Wrap the Django ASGI application to serve the live endpoints.
+    """
+    async def application(scope, receive, send):
+        if scope['type'] == 'http':
+            match = SSE_PATH.match(scope['path'])
+            if match:
+                return await server_sent_events(scope, receive, send, int(match.group(1)))
+        elif scope['type'] == 'websocket':
+            match = WEBSOCKET_PATH.match(scope['path'])
+            if match:
+                return await websocket(scope, receive, send, int(match.group(1)))
+            await receive()
+            await send({'type': 'websocket.close'})
+            return
+        return await django_application(scope, receive, send)
+
+    return application
@@ -0,0 +1,92 @@
+import asyncio
+import contextvars
+import time
+
+from asgiref.local import Local
+from asgiref.sync import _restore_context, async_to_sync, sync_to_async
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmarks for the vendored asgiref: Local attribute set/get, "
+        "context restore after a thread hop, and sync/async round trips."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--keys',
+            type=int,
+            default=20,
+            help="Other attributes set on the Local (and context variables set) around each case.",
+        )
+
+    def handle(self, *args, **options):
+        self.iterations = options['iterations']
+        self.repeat = options['repeat']
+        keys = options['keys']
+
+        local = Local()
+        for i in range(keys):
+            setattr(local, f'key{i}', i)
+        cvars = [contextvars.ContextVar(f'bench{i}') for i in range(keys)]
+        for var in cvars:
+            var.set(object())
+
+        def local_set():
+            local.value = 1
+
+        def local_get():
+            return local.key0
+
+        def thread_work():
+            local.value = 2
+
+        to_async = sync_to_async(thread_work, thread_sensitive=False)
+
+        async def round_trips(n):
+            for _ in range(n):
+                await to_async()
+
+        async def async_work():
+            local.value = 3
+
+        to_sync = async_to_sync(async_work)
+
+        self.stdout.write(f"{'case':<32} {'us/op':>8}")
+        self.report('local set', local_set)
+        self.report('local get', local_get)
+
+        # What a thread hands back: the context it was given, with or
+        # without a variable set in it.
+        unchanged = contextvars.copy_context()
+        changed = contextvars.copy_context()
+        changed.run(cvars[0].set, object())
+        self.report('restore context (unchanged)', lambda: _restore_context(unchanged))
+        self.report('restore context (one changed)', lambda: _restore_context(changed))
+        self.report(
+            'sync_to_async round trip',
+            lambda n: asyncio.run(round_trips(n)),
+            iterations=max(1, self.iterations // 10),
+            batched=True,
+        )
+        self.report(
+            'async_to_sync round trip', to_sync, iterations=max(1, self.iterations // 10)
+        )
+
+    def report(self, name, func, iterations=None, batched=False):
+        iterations = iterations or self.iterations
+        best = min(self._time(func, iterations, batched) for _ in range(self.repeat))
+        self.stdout.write(f"{name:<32} {best / iterations * 1e6:>8.3f}")
+
+    @staticmethod
+    def _time(func, iterations, batched):
+        start = time.perf_counter()
+        if batched:
+            func(iterations)
+        else:
+            for _ in range(iterations):
+                func()
+        return time.perf_counter() - start
@@ -0,0 +1,143 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models import F
+
+from core.bench import percentile
+from groups_app.models import Group, GroupMember, Doubt, DoubtReply
+
+
+# SQLite as configured before the database profile: rollback journal,
+# deferred transactions and Python's default 5 second busy wait.
+LEGACY_SQLITE_OPTIONS = {'init_command': 'PRAGMA journal_mode=DELETE;'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent write load test against a throwaway copy of the configured "
+        "database: writer threads add doubt replies (insert plus counter "
+        "update, as DoubtReplyCreateView does) while reader threads list them. "
+        "On SQLite the configured profile is compared with the legacy defaults."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writes', type=int, default=200, help="Writes per writer thread.")
+        parser.add_argument(
+            '--profile',
+            choices=['configured', 'legacy', 'both'],
+            default='both',
+            help="SQLite only: which connection options to test.",
+        )
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        sqlite = connection.vendor == 'sqlite'
+        tmpdir = None
+        if sqlite:
+            # Concurrency needs a real file; the default test database is
+            # in memory.
+            tmpdir = tempfile.mkdtemp()
+            settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(tmpdir, 'load.sqlite3')
+        else:
+            options['profile'] = 'configured'
+
+        profiles = ['configured', 'legacy'] if options['profile'] == 'both' else [options['profile']]
+        configured_options = dict(settings_dict['OPTIONS'])
+
+        old_name = settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.stdout.write(
+                f"{'profile':<11} {'writes/s':>9} {'errors':>7} {'write p50':>10} "
+                f"{'write p99':>10} {'reads/s':>8} {'read p99':>9}"
+            )
+            for profile in profiles:
+                connections.close_all()
+                settings_dict['OPTIONS'] = (
+                    configured_options if profile == 'configured' else dict(LEGACY_SQLITE_OPTIONS)
+                )
+                self.report(profile, self.run(options))
+        finally:
+            settings_dict['OPTIONS'] = configured_options
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if tmpdir:
+                shutil.rmtree(tmpdir, ignore_errors=True)
+
+    def run(self, options):
+        user = User.objects.create_user(f'load{time.monotonic_ns()}')
+        group = Group.objects.create(name='Load test', created_by=user, members_count=1)
+        GroupMember.objects.create(group=group, user=user)
+        doubt = Doubt.objects.create(group=group, asked_by=user, title='Load', body='test')
+
+        results = {'write': [], 'read': [], 'errors': 0}
+        lock = threading.Lock()
+        writing = threading.Event()
+        writing.set()
+
+        def writer():
+            latencies, errors = [], 0
+            try:
+                for i in range(options['writes']):
+                    start = time.perf_counter()
+                    try:
+                        with transaction.atomic():
+                            DoubtReply.objects.create(doubt_id=doubt.id, user_id=user.id, text=f'r{i}')
+                            Doubt.objects.filter(id=doubt.id).update(reply_count=F('reply_count') + 1)
+                    except OperationalError:
+                        errors += 1
+                        continue
+                    latencies.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+            with lock:
+                results['write'] += latencies
+                results['errors'] += errors
+
+        def reader():
+            latencies = []
+            try:
+                while writing.is_set():
+                    start = time.perf_counter()
+                    try:
+                        list(DoubtReply.objects.filter(doubt_id=doubt.id).order_by('-id')[:20])
+                    except OperationalError:
+                        continue
+                    latencies.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+            with lock:
+                results['read'] += latencies
+
+        writers = [threading.Thread(target=writer) for _ in range(options['writers'])]
+        readers = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        start = time.perf_counter()
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        writing.clear()
+        elapsed = time.perf_counter() - start
+        for thread in readers:
+            thread.join()
+
+        results['elapsed'] = elapsed
+        return results
+
+    def report(self, profile, results):
+        elapsed = results['elapsed']
+        self.stdout.write(
+            f"{profile:<11} {len(results['write']) / elapsed:>9.0f} {results['errors']:>7} "
+            f"{percentile(results['write'], 50) * 1000:>8.2f}ms "
+            f"{percentile(results['write'], 99) * 1000:>8.2f}ms "
+            f"{len(results['read']) / elapsed:>8.0f} "
+            f"{percentile(results['read'], 99) * 1000:>7.2f}ms"
+        )
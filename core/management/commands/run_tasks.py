@@ -0,0 +1,77 @@
+import multiprocessing
+import signal
+import socket
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import tasks
+
+
+def _worker_main(index, batch_size, stop):
+    # The parent turns Ctrl-C into `stop`; let running tasks finish.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    django.setup()
+    tasks.work(name=f'{socket.gethostname()}:worker-{index}', batch_size=batch_size, stop=stop)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background tasks (core/tasks.py) in a pool of worker "
+        "processes until interrupted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=2,
+            help="Worker processes; 1 runs tasks in this process.",
+        )
+        parser.add_argument('--batch-size', type=int, default=10, help="Tasks leased per claim.")
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Run the tasks that are due in this process, then exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            count = tasks.work(batch_size=options['batch_size'], once=True)
+            self.stdout.write(f"Ran {count} task(s).")
+            return
+
+        stop = multiprocessing.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+        if options['processes'] <= 1:
+            try:
+                tasks.work(batch_size=options['batch_size'], stop=stop)
+            except KeyboardInterrupt:
+                pass
+            return
+
+        # Forked children must open their own database connections.
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(
+                target=_worker_main,
+                args=(index, options['batch_size'], stop),
+                name=f'task-worker-{index}',
+            )
+            for index in range(options['processes'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"Started {len(workers)} task workers.")
+
+        try:
+            while not stop.is_set() and any(worker.is_alive() for worker in workers):
+                stop.wait(1)
+        except KeyboardInterrupt:
+            pass
+        stop.set()
+        self.stdout.write("Stopping after the running tasks finish...")
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,102 @@
+"""
+In-process request metrics in the Prometheus text exposition format.
+
+QueryMetricsMiddleware (core/middleware.py) records one observation per
+request; MetricsView (core/views.py) renders the registry. Values are per
+process, so scrape every worker.
+"""
+import threading
+from collections import defaultdict
+
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+
+def _labels(**labels):
+    pairs = ','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for k, v in labels.items()
+    )
+    return '{' + pairs + '}'
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.requests = defaultdict(int)
+        self.db_seconds = defaultdict(float)
+        self.durations = {}
+        self.queries = {}
+
+    def observe(self, view, method, status, duration, query_count, db_time):
+        key = (view, method)
+        with self._lock:
+            self.requests[(view, method, status)] += 1
+            self.db_seconds[key] += db_time
+            if key not in self.durations:
+                self.durations[key] = Histogram(DURATION_BUCKETS)
+                self.queries[key] = Histogram(QUERY_BUCKETS)
+            self.durations[key].observe(duration)
+            self.queries[key].observe(query_count)
+
+    def render(self):
+        with self._lock:
+            lines = [
+                '# HELP studycircle_requests_total Requests handled, by view and status.',
+                '# TYPE studycircle_requests_total counter',
+            ]
+            for (view, method, status), value in sorted(self.requests.items()):
+                labels = _labels(view=view, method=method, status=status)
+                lines.append(f'studycircle_requests_total{labels} {value}')
+
+            lines += [
+                '# HELP studycircle_db_duration_seconds_total Time spent in database queries.',
+                '# TYPE studycircle_db_duration_seconds_total counter',
+            ]
+            for (view, method), value in sorted(self.db_seconds.items()):
+                labels = _labels(view=view, method=method)
+                lines.append(f'studycircle_db_duration_seconds_total{labels} {value:.6f}')
+
+            lines += self._histogram(
+                'studycircle_request_duration_seconds', 'Request wall time.', self.durations
+            )
+            lines += self._histogram(
+                'studycircle_db_queries', 'Database queries per request.', self.queries
+            )
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _histogram(name, help_text, histograms):
+        lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (view, method), hist in sorted(histograms.items()):
+            for bound, value in zip(hist.buckets, hist.counts):
+                labels = _labels(view=view, method=method, le=bound)
+                lines.append(f'{name}_bucket{labels} {value}')
+            labels = _labels(view=view, method=method, le='+Inf')
+            lines.append(f'{name}_bucket{labels} {hist.total}')
+            labels = _labels(view=view, method=method)
+            lines.append(f'{name}_sum{labels} {hist.sum:.6f}')
+            lines.append(f'{name}_count{labels} {hist.total}')
+        return lines
+
+
+registry = Registry()
@@ -0,0 +1,133 @@
+"""
+Request instrumentation.
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import registry
+from .querycheck import detect_n_plus_one
+from .queryhooks import observe_queries
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """
+    Query hook (core/queryhooks.py) that counts and times every query.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.duration += elapsed
+            self.statements.append((sql, elapsed))
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class InstrumentingMiddleware:
+    """
+    Base for middleware that wraps the rest of the request handling in
+    ``instrument(request)``. It runs natively for both sync and async
+    views, so it doesn't force async views onto a worker thread. The
+    context manager yields an object whose ``response`` is set before it
+    exits; by default it does nothing else, so the middleware just passes
+    requests through.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.instrument(request) as capture:
+            capture.response = self.get_response(request)
+        return capture.response
+
+    async def __acall__(self, request):
+        with self.instrument(request) as capture:
+            capture.response = await self.get_response(request)
+        return capture.response
+
+    @contextmanager
+    def instrument(self, request):
+        yield SimpleNamespace(response=None)
+
+
+class QueryMetricsMiddleware(InstrumentingMiddleware):
+    """
+    Records wall time, query count and database time for every request
+    and logs the SQL of requests that run more than QUERY_BUDGET queries.
+    """
+
+    @contextmanager
+    def instrument(self, request):
+        capture = SimpleNamespace(response=None)
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with observe_queries(recorder):
+            yield capture
+        duration = time.perf_counter() - start
+
+        view = view_label(request)
+        query_count = len(recorder.statements)
+        registry.observe(
+            view, request.method, capture.response.status_code, duration, query_count,
+            recorder.duration,
+        )
+
+        budget = settings.QUERY_BUDGET
+        if budget is not None and query_count > budget:
+            logger.warning(
+                "%s %s (%s) ran %d queries, over the budget of %d:\n%s",
+                request.method,
+                request.path,
+                view,
+                query_count,
+                budget,
+                '\n'.join(f'  {elapsed * 1000:.2f}ms  {sql}' for sql, elapsed in recorder.statements),
+            )
+
+
+class NPlusOneMiddleware(InstrumentingMiddleware):
+    """
+    Checks requests for repeated query shapes (see core/querycheck.py).
+    NPLUSONE_MODE picks 'raise', 'log' or 'off'; NPLUSONE_SAMPLE_RATE is
+    the fraction of requests checked.
+    """
+
+    @contextmanager
+    def instrument(self, request):
+        capture = SimpleNamespace(response=None)
+        mode = settings.NPLUSONE_MODE
+        if mode == 'off' or random.random() >= settings.NPLUSONE_SAMPLE_RATE:
+            yield capture
+            return
+
+        label = f'{request.method} {request.path}'
+        with detect_n_plus_one(mode=mode, label=label):
+            yield capture
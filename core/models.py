@@ -0,0 +1,52 @@
+from django.db import models
+from django.utils import timezone
+
+
+class StoredBlob(models.Model):
+    """
+    One file written by core.storage.ContentAddressedStorage, with the
+    number of saves still pointing at it.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
+
+
+class Task(models.Model):
+    """
+    A queued call of a function registered with core.tasks.task. Rows are
+    deleted once the call succeeds; failed ones are kept for inspection.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    # Set while a worker holds the task; a lapsed lease makes it claimable again.
+    leased_until = models.DateTimeField(null=True, blank=True)
+    lease_token = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='core_task_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
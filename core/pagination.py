@@ -0,0 +1,120 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+# Largest primary key a 64-bit signed integer column holds.
+MAX_PK = 2 ** 63 - 1
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first keyset pagination on ``(created_at, id)``.
+
+    Each page is a range scan starting just after the last row of the
+    previous page, so the cost of a request does not grow with how far
+    back a client has scrolled. Cursors are opaque base64 strings.
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    time_field = 'created_at'
+    id_field = 'id'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_rows(list(self.page_queryset(queryset, request)))
+
+    def page_queryset(self, queryset, request):
+        """
+        The lazy queryset for the requested page, one row longer than the
+        page. Evaluate it (synchronously or with ``async for``) and pass
+        the rows to ``paginate_rows``.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(f'-{self.time_field}', f'-{self.id_field}')
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(
+                Q(**{f'{self.time_field}__lt': created_at})
+                | Q(**{self.time_field: created_at, f'{self.id_field}__lt': pk})
+            )
+
+        # Fetch one extra row to learn whether there is a next page.
+        return queryset[:self.page_size + 1]
+
+    def paginate_rows(self, rows):
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = self.get_position(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            return row[self.time_field], row[self.id_field]
+        return getattr(row, self.time_field), getattr(row, self.id_field)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = self.encode_cursor(self.next_position)
+        return self.request.build_absolute_uri(
+            f'{self.request.path}?{params.urlencode()}'
+        )
+
+    def encode_cursor(self, position):
+        created_at, pk = position
+        raw = json.dumps([created_at.isoformat(), pk]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            created_at, pk = json.loads(base64.urlsafe_b64decode(padded))
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (TypeError, ValueError, OverflowError):
+            raise NotFound(self.invalid_cursor_message)
+        # Out-of-range ids would overflow the database's integer binding.
+        if created_at is None or not 1 <= pk <= MAX_PK:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
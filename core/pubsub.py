@@ -0,0 +1,170 @@
+"""
+In-process publish/subscribe for live updates.
+
+``publish(key, kind, data)`` may be called from any thread (sync views
+run in worker threads); each subscriber gets the event on its own event
+loop through a bounded queue. A subscriber that falls LIVE_QUEUE_SIZE
+events behind loses the oldest ones rather than holding up publishers.
+
+A server running several worker processes sets LIVE_BROKER_DIR to a
+directory the processes share. Each process then binds a Unix datagram
+socket there and sends every event it publishes to the other sockets, so
+subscribers connected to any process see it. Delivery is best effort:
+events for a peer whose socket buffer is full, or that don't fit in a
+datagram, are dropped, and sockets left behind by dead processes are
+removed on the first failed send. Keep event data small (ids, say) and
+let clients fetch the rest.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+logger = logging.getLogger(__name__)
+
+MAX_DATAGRAM = 65536
+
+
+class Subscription:
+    def __init__(self, key, maxsize):
+        self.key = key
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def _offer(self, event):
+        # Runs on the subscriber's loop.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class LocalBroker:
+    """
+    Relays events between the processes on one host; see the module
+    docstring.
+    """
+
+    def __init__(self, directory, deliver, name=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f'{name or os.getpid()}.sock')
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.receiver.bind(self.path)
+        self.sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sender.setblocking(False)
+        self.deliver = deliver
+        threading.Thread(target=self._receive, name='pubsub-broker', daemon=True).start()
+
+    def send(self, message):
+        for name in os.listdir(self.directory):
+            peer = os.path.join(self.directory, name)
+            if not name.endswith('.sock') or peer == self.path:
+                continue
+            try:
+                self.sender.sendto(message, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(peer)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                logger.warning("Dropped a live event for busy peer %s", peer)
+            except OSError as e:
+                # EMSGSIZE for an event over the datagram limit, for one.
+                logger.warning("Dropped a live event for peer %s: %s", peer, e)
+
+    def _receive(self):
+        while True:
+            message = self.receiver.recv(MAX_DATAGRAM)
+            try:
+                key, event = json.loads(message)
+            except ValueError:
+                continue
+            self.deliver(key, event)
+
+
+class Hub:
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+        self._broker = None
+        self._broker_pid = None
+
+    def _get_broker(self):
+        directory = settings.LIVE_BROKER_DIR
+        if not directory:
+            return None
+        # A forked worker needs its own socket.
+        with self._lock:
+            if self._broker_pid != os.getpid():
+                self._broker = LocalBroker(directory, self.deliver)
+                self._broker_pid = os.getpid()
+            return self._broker
+
+    def subscribe(self, key):
+        """
+        Subscribe the running event loop to events published under key.
+        """
+        self._get_broker()
+        subscription = Subscription(key, settings.LIVE_QUEUE_SIZE)
+        with self._lock:
+            self._subscriptions[key].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.key)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.key]
+
+    def subscriber_count(self, key):
+        with self._lock:
+            return len(self._subscriptions.get(key, ()))
+
+    def deliver(self, key, event):
+        """
+        Hand an event to this process's subscribers.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(key, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:
+                # The subscriber's loop has closed.
+                self.unsubscribe(subscription)
+
+    def publish(self, key, event):
+        self.deliver(key, event)
+        broker = self._get_broker()
+        if broker is not None:
+            broker.send(json.dumps([key, event], cls=DjangoJSONEncoder).encode())
+
+
+hub = Hub()
+
+
+def publish(key, kind, data):
+    """
+    Publish ``{"type": kind, "data": data}`` to subscribers of key.
+    ``data`` must be JSON-serializable.
+    """
+    # Round-trip through JSON so every process sees the same event.
+    event = json.loads(json.dumps({'type': kind, 'data': data}, cls=DjangoJSONEncoder))
+    hub.publish(key, event)
@@ -0,0 +1,106 @@
+"""
+N+1 query detection.
+
+Every SELECT run inside ``detect_n_plus_one()`` is reduced to a
+fingerprint (literals, parameters and IN lists normalized away), and the
+block fails if one fingerprint runs more than NPLUSONE_THRESHOLD times,
+which is what a per-row lookup in a serializer or loop looks like.
+
+Use the context manager or NPlusOneAssertionsMixin (core/testing.py) in
+tests, or NPlusOneMiddleware (core/middleware.py) to check requests: it
+raises under ``manage.py test`` and logs on a sample of requests in
+production.
+"""
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .queryhooks import observe_queries
+
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAM = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN \(\?(?:, \?)*\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+def fingerprint(sql):
+    """
+    Normalize a statement so queries that differ only in their values
+    compare equal.
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PARAM.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class QueryShapeCounter:
+    """
+    Query hook (core/queryhooks.py) counting SELECTs by fingerprint.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.examples = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip()[:6].upper() == 'SELECT':
+            shape = fingerprint(sql)
+            self.counts[shape] += 1
+            self.examples.setdefault(shape, sql)
+        return execute(sql, params, many, context)
+
+    def repeated(self):
+        """
+        ``(count, example sql)`` for each shape over the threshold, most
+        repeated first.
+        """
+        return sorted(
+            (
+                (count, self.examples[shape])
+                for shape, count in self.counts.items()
+                if count > self.threshold
+            ),
+            reverse=True,
+        )
+
+    def report(self):
+        return '\n'.join(f'  {count}x  {sql}' for count, sql in self.repeated())
+
+
+@contextmanager
+def detect_n_plus_one(threshold=None, mode='raise', label='block'):
+    """
+    Count the SELECTs run in the block by shape. On exit, raise
+    NPlusOneError (``mode='raise'``) or log a warning (``mode='log'``) if
+    any shape ran more than ``threshold`` times. The threshold defaults to
+    NPLUSONE_THRESHOLD and can be changed on the yielded counter.
+    """
+    if threshold is None:
+        threshold = settings.NPLUSONE_THRESHOLD
+    counter = QueryShapeCounter(threshold)
+    with observe_queries(counter):
+        yield counter
+
+    if not counter.repeated():
+        return
+    message = (
+        f"Possible N+1 in {label}: statements repeated more than "
+        f"{counter.threshold} times:\n{counter.report()}"
+    )
+    if mode == 'raise':
+        raise NPlusOneError(message)
+    logger.warning(message)
@@ -0,0 +1,51 @@
+"""
+Query hooks that follow a request into sync_to_async threads.
+
+``connection.execute_wrapper`` only affects the connection object it is
+entered on, and connections are per thread, so a wrapper entered on the
+event loop's thread never sees the queries an async view runs through
+sync_to_async. Instead one dispatcher is installed on every connection,
+and it calls the hooks that ``observe_queries`` put in a context
+variable. sync_to_async runs its function in a copy of the caller's
+context, so queries made in worker threads reach the hooks of the
+request that made them.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import connections
+
+
+_hooks = ContextVar('query_hooks', default=())
+
+
+def _dispatch(execute, sql, params, many, context):
+    hooks = _hooks.get()
+    for hook in reversed(hooks):
+        execute = partial(hook, execute)
+    return execute(sql, params, many, context)
+
+
+def install(connection, **kwargs):
+    """
+    Add the dispatcher to a connection; a ``connection_created`` receiver.
+    """
+    if _dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_dispatch)
+
+
+@contextmanager
+def observe_queries(hook):
+    """
+    Call ``hook`` as an ``execute_wrapper`` for every query run in this
+    context, in this thread or any sync_to_async thread it hands off to.
+    """
+    # Connections of this thread opened before the receiver was connected.
+    for connection in connections.all(initialized_only=True):
+        install(connection)
+    token = _hooks.set(_hooks.get() + (hook,))
+    try:
+        yield hook
+    finally:
+        _hooks.reset(token)
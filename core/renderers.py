@@ -0,0 +1,68 @@
+"""
+orjson-backed JSON renderer and parser for DRF.
+
+Both fall back to DRF's stdlib implementations when orjson isn't
+installed, or when a request needs something orjson doesn't do
+(indented output for the browsable API, non-UTF-8 request bodies).
+Enable them with FAST_JSON=1 (see core/settings.py).
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+from rest_framework.utils.mediatypes import parse_header_parameters
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renders JSON with orjson, matching JSONRenderer's compact output.
+    """
+    options = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self._default, option=self.options)
+        # Keep JSONRenderer's guarantee that output is a strict JavaScript
+        # subset.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+    @staticmethod
+    def _default(obj):
+        # Decimals, lazy translation strings, querysets etc. go through the
+        # same conversions as DRF's encoder.
+        return encoders.JSONEncoder().default(obj)
+
+
+class ORJSONParser(JSONParser):
+    """
+    Parses UTF-8 JSON request bodies with orjson.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if media_type:
+            _, params = parse_header_parameters(media_type)
+            encoding = params.get('charset', encoding)
+        if encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
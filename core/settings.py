@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,14 +45,19 @@ INSTALLED_APPS = [
     'corsheaders',
 
     # Local apps
+    'core',
     'accounts',
     'social',
     'groups_app',
+    'search',
+    'notifications',
 ]
 
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',   # this line is added
+    'core.middleware.QueryMetricsMiddleware',
+    'core.middleware.NPlusOneMiddleware',
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -82,14 +89,104 @@ WSGI_APPLICATION = "core.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+#
+# DB_ENGINE picks the profile: 'sqlite' (default) or 'postgres'.
+#
+# Connections are closed after every request by default. Persistent
+# connections (DB_CONN_MAX_AGE) only suit WSGI deployments: under ASGI each
+# request runs in a new context and would leave its connection open. The
+# Postgres pool (DB_POOL=1) hands connections back on close instead, so it
+# is safe under either.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '0'))
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get('DB_NAME', 'studycircle'),
+            "USER": os.environ.get('DB_USER', 'studycircle'),
+            "PASSWORD": os.environ.get('DB_PASSWORD', ''),
+            "HOST": os.environ.get('DB_HOST', 'localhost'),
+            "PORT": os.environ.get('DB_PORT', '5432'),
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
+    }
+    if os.environ.get('DB_POOL', '0') == '1':
+        # Django's native pool (needs psycopg[pool]) replaces persistent
+        # connections, which must stay off when it is enabled.
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            "max_size": int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+            "timeout": int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        }
+else:
+    # Applied on every new connection. WAL lets readers run alongside the
+    # single writer; busy_timeout makes a blocked writer wait instead of
+    # failing with "database is locked"; synchronous=NORMAL is durable in
+    # WAL mode except for the last commits before a power loss.
+    SQLITE_PRAGMAS = (
+        'PRAGMA journal_mode=WAL;'
+        f"PRAGMA busy_timeout={int(os.environ.get('DB_BUSY_TIMEOUT_MS', '5000'))};"
+        'PRAGMA synchronous=NORMAL;'
+        f"PRAGMA mmap_size={int(os.environ.get('DB_MMAP_SIZE', str(128 * 1024 * 1024)))};"
+        # Negative sizes are KiB: 20 MB of page cache per connection.
+        'PRAGMA cache_size=-20000;'
+        'PRAGMA temp_store=MEMORY;'
+    )
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get('DB_NAME', BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "init_command": SQLITE_PRAGMAS,
+                # Take the write lock when a transaction starts, so two
+                # transactions that read and then write can't deadlock.
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory is per process; point this at a shared backend (Redis,
+# Memcached, database) when running several workers.
 
-DATABASES = {
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
 
+# Seconds a user's cached group ids (groups_app/membership.py) stay valid.
+MEMBERSHIP_CACHE_TIMEOUT = 300
+
+# Seconds a cached list response (groups_app/response_cache.py) is kept.
+# Writes bump generation counters, so this only bounds memory use.
+RESPONSE_CACHE_TIMEOUT = 600
+
+# Requests running more queries than this log a warning with their SQL
+# (core/middleware.py). None disables the check.
+QUERY_BUDGET = 50
+
+# N+1 detection (core/querycheck.py): a request fails ('raise') or logs a
+# warning ('log') when one SELECT shape runs more than NPLUSONE_THRESHOLD
+# times. Only NPLUSONE_SAMPLE_RATE of requests are checked. Under
+# ``manage.py test`` every request is checked and fails.
+TESTING = sys.argv[1:2] == ['test']
+NPLUSONE_MODE = os.environ.get('NPLUSONE_MODE', 'raise' if TESTING else 'log')
+NPLUSONE_THRESHOLD = 5
+NPLUSONE_SAMPLE_RATE = float(
+    os.environ.get('NPLUSONE_SAMPLE_RATE', '1.0' if DEBUG or TESTING else '0.01')
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -127,6 +224,19 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+MEDIA_URL = "media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Uploads are stored once per distinct content (core/storage.py).
+STORAGES = {
+    "default": {"BACKEND": "core.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+FILE_UPLOAD_HANDLERS = [
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "core.storage.HashingTemporaryFileUploadHandler",
+]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -140,6 +250,58 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+}
+
+# Opt in to orjson rendering/parsing (core/renderers.py) with FAST_JSON=1.
+if os.environ.get('FAST_JSON') == '1':
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = (
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    )
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = (
+        'core.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    )
+
+
+# Home feed fan-out (see social/feed.py). Posts in groups larger than this
+# are pulled at read time instead of being written to every member's feed.
+FEED_FANOUT_MAX_GROUP_SIZE = 1000
+# With FEED_FANOUT_ASYNC the fan-out is a background task.
+FEED_FANOUT_ASYNC = False
+
+# Post image variants (see social/images.py): name -> longest side in
+# pixels, encoded as WebP. Generated by a background task after the post
+# is saved unless IMAGE_VARIANTS_ASYNC=0.
+IMAGE_VARIANTS = {'thumb': 320, 'medium': 1280}
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_VARIANTS_ASYNC = os.environ.get('IMAGE_VARIANTS_ASYNC', '1') == '1'
+
+# Background tasks (core/tasks.py), run by `manage.py run_tasks`. With
+# TASKS_EAGER=1 they run inline when enqueued, for development without a
+# worker.
+TASKS_EAGER = os.environ.get('TASKS_EAGER', '0') == '1'
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 10  # seconds before the first retry; doubles per attempt
+TASK_LEASE_SECONDS = 300
+TASK_POLL_INTERVAL = 1.0
+
+# Live group updates over SSE/WebSocket (core/live.py, core/pubsub.py).
+# Point LIVE_BROKER_DIR at a directory shared by the server's worker
+# processes on one host to deliver events across them.
+LIVE_BROKER_DIR = os.environ.get('LIVE_BROKER_DIR') or None
+LIVE_KEEPALIVE_SECONDS = 15
+LIVE_QUEUE_SIZE = 100
+
+# Thread pools for sync_to_async (core/executors.py). 'default' replaces the
+# event loop's default executor; other names are separate pools for
+# sync_to_async(..., thread_sensitive=False, executor='<name>').
+ASYNC_EXECUTORS = {
+    'default': {'max_workers': int(os.environ.get('ASYNC_DEFAULT_WORKERS', '32'))},
+    'serialization': {'max_workers': int(os.environ.get('ASYNC_SERIALIZATION_WORKERS', '4'))},
 }
 
 
@@ -0,0 +1,128 @@
+"""
+Content-addressed media storage.
+
+Every file is stored once under the SHA-256 of its bytes, keeping the
+directory and extension of the name it was saved as:
+
+    posts/slide.png -> posts/3f/3fa1...c9.png
+
+Saving bytes that are already stored only adds a reference to the blob's
+core.models.StoredBlob row; delete() drops one reference and removes the
+file with the last one. The digest is taken in the same pass that copies
+the content into the media directory. Uploads Django spools to disk are
+hashed by HashingTemporaryFileUploadHandler as their chunks arrive, so
+they are neither read again nor copied: a new blob is moved into place
+and a duplicate is left for Django to clean up.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from django.db.models import F
+
+from .models import StoredBlob
+
+
+class HashingTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    TemporaryFileUploadHandler that also sets ``sha256`` on the file.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.digest.hexdigest()
+        return file
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # _save names the file after its content; equal bytes share a name.
+        return name
+
+    def blob_name(self, name, digest):
+        directory = posixpath.dirname(name)
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(directory, digest[:2], f'{digest}{extension}')
+
+    def _spool(self, content):
+        """
+        Copy content to a temporary file in the media directory, hashing
+        it on the way. Returns (path, hex digest, size).
+        """
+        os.makedirs(self.location, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, path = tempfile.mkstemp(dir=self.location, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path, digest.hexdigest(), size
+
+    def _save(self, name, content):
+        spooled = None
+        if getattr(content, 'sha256', None) and hasattr(content, 'temporary_file_path'):
+            source, digest, size = content.temporary_file_path(), content.sha256, content.size
+        else:
+            source, digest, size = spooled = self._spool(content)
+
+        name = self.blob_name(name, digest)
+        path = self.path(name)
+        try:
+            # The row lock serializes this with delete() of the same blob,
+            # so a file is never removed while a new reference moves in.
+            with transaction.atomic():
+                blob, created = StoredBlob.objects.select_for_update().get_or_create(
+                    name=name, defaults={'size': size, 'ref_count': 1}
+                )
+                if not created:
+                    StoredBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    file_move_safe(source, path, allow_overwrite=True)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(path, self.file_permissions_mode)
+        finally:
+            if spooled and os.path.exists(spooled[0]):
+                os.remove(spooled[0])
+        return name
+
+    def add_reference(self, name):
+        """
+        Count another reference to a stored blob, for a row that reuses a
+        name instead of saving the bytes again. Returns False if the name
+        isn't a blob of this storage.
+        """
+        return StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1) > 0
+
+    def delete(self, name):
+        with transaction.atomic():
+            blob = StoredBlob.objects.select_for_update().filter(name=name).first()
+            if blob is not None and blob.ref_count > 1:
+                StoredBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+                return
+            if blob is not None:
+                blob.delete()
+            # Files saved before this storage was configured have no row.
+            super().delete(name)
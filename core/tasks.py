@@ -0,0 +1,159 @@
+"""
+Database-backed background tasks.
+
+Decorate a function with ``@task`` and call ``func.enqueue(*args)`` to
+have a worker (``manage.py run_tasks``) call it later; arguments must be
+JSON-serializable. The row is a core.models.Task, so enqueueing inside a
+transaction only takes effect if the transaction commits.
+
+Workers lease due tasks for TASK_LEASE_SECONDS. Where the database has
+``SELECT ... FOR UPDATE SKIP LOCKED`` workers skip rows another worker is
+claiming; on SQLite, which has one writer at a time anyway, a task is
+claimed by a conditional UPDATE that only one worker can win. A task
+whose worker died becomes due again when its lease lapses. Failures are
+retried after TASK_RETRY_DELAY seconds, doubling per attempt, until the
+task's max_attempts. With TASKS_EAGER set, enqueue() calls the function
+inline instead.
+"""
+import logging
+import os
+import socket
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+
+logger = logging.getLogger(__name__)
+
+
+def task(func=None, *, max_attempts=None):
+    """
+    Register a function as a task, named after its import path.
+    """
+    def register(func):
+        func.task_name = f'{func.__module__}.{func.__qualname__}'
+        func.max_attempts = max_attempts or settings.TASK_MAX_ATTEMPTS
+        func.enqueue = lambda *args, **kwargs: enqueue(func, *args, **kwargs)
+        return func
+
+    if func is None:
+        return register
+    return register(func)
+
+
+def enqueue(func, *args, run_at=None, **kwargs):
+    """
+    Queue a call of a registered task. Returns the Task row, or None when
+    TASKS_EAGER ran it inline.
+    """
+    if settings.TASKS_EAGER:
+        func(*args, **kwargs)
+        return None
+    return Task.objects.create(
+        name=func.task_name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=func.max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def _due(now):
+    return Task.objects.filter(
+        Q(status=Task.PENDING, run_at__lte=now) | Q(status=Task.RUNNING, leased_until__lt=now)
+    )
+
+
+def claim(worker, limit=10):
+    """
+    Lease up to ``limit`` due tasks for ``worker``, oldest first.
+    """
+    now = timezone.now()
+    token = f'{worker}:{uuid.uuid4().hex[:8]}'
+    lease = {
+        'status': Task.RUNNING,
+        'leased_until': now + timedelta(seconds=settings.TASK_LEASE_SECONDS),
+        'lease_token': token,
+        'attempts': F('attempts') + 1,
+    }
+
+    # A task whose worker died on its last attempt won't be run again.
+    Task.objects.filter(
+        status=Task.RUNNING, leased_until__lt=now, attempts__gte=F('max_attempts')
+    ).update(status=Task.FAILED, last_error="Lease expired on the last attempt.")
+
+    due = _due(now).order_by('run_at', 'id')
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            Task.objects.filter(id__in=ids).update(**lease)
+    else:
+        ids = list(due.values_list('id', flat=True)[:limit])
+        # Re-checks due-ness, so a worker that lost the race updates nothing.
+        _due(now).filter(id__in=ids).update(**lease)
+
+    return list(Task.objects.filter(id__in=ids, lease_token=token).order_by('run_at', 'id'))
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=settings.TASK_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def run(task_row):
+    """
+    Call a leased task and record the outcome. Returns True on success.
+    """
+    mine = Task.objects.filter(id=task_row.id, lease_token=task_row.lease_token)
+    try:
+        func = import_string(task_row.name)
+        if getattr(func, 'task_name', None) != task_row.name:
+            raise LookupError(f"{task_row.name} is not a registered task.")
+        func(*task_row.args, **task_row.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Task %s (%s) failed", task_row.id, task_row.name)
+        if task_row.attempts >= task_row.max_attempts:
+            mine.update(status=Task.FAILED, last_error=error, leased_until=None)
+        else:
+            mine.update(
+                status=Task.PENDING,
+                last_error=error,
+                leased_until=None,
+                run_at=timezone.now() + _retry_delay(task_row.attempts),
+            )
+        return False
+
+    mine.delete()
+    return True
+
+
+def work(name=None, batch_size=10, once=False, stop=None):
+    """
+    Run due tasks until ``stop`` (a threading or multiprocessing Event) is
+    set, or, with ``once``, until none are due. Returns the number run.
+    """
+    name = name or f'{socket.gethostname()}:{os.getpid()}'
+    count = 0
+    while not (stop and stop.is_set()):
+        close_old_connections()
+        leased = claim(name, batch_size)
+        for task_row in leased:
+            run(task_row)
+            count += 1
+        if not leased:
+            if once:
+                break
+            if stop:
+                stop.wait(settings.TASK_POLL_INTERVAL)
+            else:
+                time.sleep(settings.TASK_POLL_INTERVAL)
+    return count
@@ -0,0 +1,66 @@
+"""
+Test helpers shared by the app test suites.
+"""
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .querycheck import detect_n_plus_one
+
+
+# "SCAN <table>" without "USING ... INDEX" is a full table scan.
+FULL_SCAN = re.compile(r'^SCAN (\S+)$')
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+class QueryPlanAssertionsMixin:
+    """
+    Assertions over SQLite's EXPLAIN QUERY PLAN for the queries a block runs.
+    """
+
+    def assertQueriesUseIndexes(self, func, allow_sort=False):
+        """
+        Run ``func`` and fail if any SELECT it issues scans a whole table
+        (or, unless ``allow_sort``, sorts in a temporary b-tree).
+        """
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN checks are SQLite-specific.')
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = func()
+
+        with connection.cursor() as cursor:
+            for query in ctx.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                # captured SQL has parameters inlined; re-running it through
+                # EXPLAIN is enough to see the plan.
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = [row[-1] for row in cursor.fetchall()]
+                for step in plan:
+                    self.assertIsNone(
+                        FULL_SCAN.match(step.strip()),
+                        f'Full table scan in plan {plan} for query: {sql}',
+                    )
+                    if not allow_sort:
+                        self.assertNotIn(
+                            TEMP_SORT, step, f'Sort without index in plan {plan} for query: {sql}'
+                        )
+        return result
+
+
+class NPlusOneAssertionsMixin:
+    """
+    Fail any test in which one SELECT shape runs more than
+    ``n_plus_one_threshold`` times (NPLUSONE_THRESHOLD if None), whether
+    through a request or not. Queries run by setUpTestData aren't counted.
+    """
+    n_plus_one_threshold = None
+
+    def setUp(self):
+        super().setUp()
+        self.n_plus_one = self.enterContext(
+            detect_n_plus_one(self.n_plus_one_threshold, label=self.id())
+        )
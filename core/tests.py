@@ -0,0 +1,619 @@
+import asyncio
+import hashlib
+import json
+import queue
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from asgiref.local import Local
+from asgiref.sync import async_to_sync, executor_stats, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.db import connection
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from groups_app import membership
+from groups_app.models import Group, GroupMember
+
+from . import executors, live, pubsub, tasks
+from .bench import percentile
+from .metrics import registry
+from .middleware import InstrumentingMiddleware, NPlusOneMiddleware
+from .models import StoredBlob, Task
+from .querycheck import NPlusOneError, detect_n_plus_one, fingerprint
+from .renderers import ORJSONParser, ORJSONRenderer
+from .storage import ContentAddressedStorage
+from .testing import NPlusOneAssertionsMixin
+
+
+class PercentileTests(SimpleTestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([3, 1, 2], 0), 1)
+        self.assertEqual(percentile([], 95), 0.0)
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """
+    The orjson renderer and parser are drop-in replacements for DRF's.
+    """
+
+    data = {
+        'id': 1,
+        'name': 'Physics   é',
+        'created_at': '2026-10-17T14:27:44.123456Z',
+        'score': Decimal('1.50'),
+        'tags': ['a', None, True],
+        'nested': {'count': 2.5},
+    }
+
+    def test_render_matches_json_renderer(self):
+        self.assertEqual(
+            ORJSONRenderer().render(self.data),
+            JSONRenderer().render(self.data),
+        )
+
+    def test_indented_output_falls_back(self):
+        media_type = 'application/json; indent=4'
+        self.assertEqual(
+            ORJSONRenderer().render(self.data, media_type),
+            JSONRenderer().render(self.data, media_type),
+        )
+
+    def test_native_datetimes(self):
+        value = {'at': datetime(2026, 10, 17, tzinfo=dt_timezone.utc)}
+        self.assertEqual(ORJSONRenderer().render(value), b'{"at":"2026-10-17T00:00:00+00:00"}')
+
+    def test_parse(self):
+        body = JSONRenderer().render({'a': [1, 'bé']})
+        self.assertEqual(
+            ORJSONParser().parse(BytesIO(body)),
+            JSONParser().parse(BytesIO(body)),
+        )
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"a":'))
+
+
+class QueryMetricsTests(TestCase):
+    """
+    The metrics middleware records every request and the endpoint exposes
+    the results to staff only.
+    """
+
+    def setUp(self):
+        registry.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='alice', password='pw')
+        self.admin = User.objects.create_user(username='root', password='pw', is_staff=True)
+
+    def test_records_requests_per_view(self):
+        self.client.force_authenticate(self.user)
+        self.client.get(reverse('profile'))
+        self.client.get(reverse('profile'))
+
+        self.assertEqual(registry.requests[('profile', 'GET', 200)], 2)
+        self.assertEqual(registry.queries[('profile', 'GET')].total, 2)
+        self.assertGreater(registry.queries[('profile', 'GET')].sum, 0)
+
+    async def test_async_views_record_queries_run_in_worker_threads(self):
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        for name in ('group_list_create', 'group_list_async'):
+            await cache.aclear()
+            response = await self.async_client.get(reverse(name), headers=headers)
+            self.assertEqual(response.status_code, 200)
+
+        sync_queries = registry.queries[('group_list_create', 'GET')].sum
+        self.assertGreater(sync_queries, 0)
+        self.assertEqual(registry.queries[('group_list_async', 'GET')].sum, sync_queries)
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+        self.client.get(reverse('profile'))
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('studycircle_requests_total{view="profile",method="GET",status="200"} 1', body)
+        self.assertIn('studycircle_db_queries_bucket{view="profile",method="GET",le="+Inf"} 1', body)
+        self.assertIn('# TYPE studycircle_request_duration_seconds histogram', body)
+
+    @override_settings(QUERY_BUDGET=0)
+    def test_logs_sql_over_query_budget(self):
+        self.client.force_authenticate(self.user)
+
+        with self.assertLogs('core.middleware', level='WARNING') as logs:
+            self.client.get(reverse('profile'))
+
+        self.assertIn('over the budget of 0', logs.output[0])
+        self.assertIn('accounts_userprofile', logs.output[0])
+
+
+def per_row_lookup_view(request):
+    names = [User.objects.get(id=pk).username for pk in User.objects.values_list('id', flat=True)]
+    return HttpResponse(', '.join(names))
+
+
+class InstrumentingMiddlewareTests(SimpleTestCase):
+    def test_passes_sync_and_async_requests_through_by_default(self):
+        request = RequestFactory().get('/')
+        response = HttpResponse('ok')
+
+        self.assertIs(InstrumentingMiddleware(lambda request: response)(request), response)
+
+        async def get_response(request):
+            return response
+
+        self.assertIs(async_to_sync(InstrumentingMiddleware(get_response))(request), response)
+
+
+class NPlusOneDetectionTests(TestCase):
+    """
+    Repeated query shapes are caught by the context manager and middleware.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([User(username=f'user{i}') for i in range(10)])
+
+    def test_fingerprint_normalizes_values(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 3 AND name = 'it''s'"),
+            fingerprint("SELECT *  FROM t WHERE id = %s AND name = %s"),
+        )
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            'SELECT * FROM t WHERE id IN (...)',
+        )
+
+    def test_raises_on_repeated_lookups(self):
+        with self.assertRaisesMessage(NPlusOneError, '10x  SELECT'):
+            with detect_n_plus_one(threshold=5):
+                for pk in User.objects.values_list('id', flat=True):
+                    User.objects.get(id=pk)
+
+    def test_single_batched_query_passes(self):
+        with detect_n_plus_one(threshold=5) as counter:
+            list(User.objects.filter(id__in=list(User.objects.values_list('id', flat=True))))
+        self.assertEqual(counter.repeated(), [])
+
+    def test_log_mode_warns(self):
+        with self.assertLogs('core.querycheck', level='WARNING'):
+            with detect_n_plus_one(threshold=1, mode='log'):
+                User.objects.get(username='user0')
+                User.objects.get(username='user1')
+
+    @override_settings(NPLUSONE_MODE='raise', NPLUSONE_THRESHOLD=0, NPLUSONE_SAMPLE_RATE=1.0)
+    def test_middleware_raises_in_raise_mode(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.first())
+
+        with self.assertRaises(NPlusOneError):
+            client.get(reverse('profile'))
+
+    def test_requests_fail_under_the_test_runner(self):
+        middleware = NPlusOneMiddleware(per_row_lookup_view)
+
+        with self.assertRaises(NPlusOneError):
+            middleware(RequestFactory().get('/users/'))
+
+    def test_mixin_fails_a_test_that_runs_an_n_plus_one_view(self):
+        class Probe(NPlusOneAssertionsMixin, unittest.TestCase):
+            def test_view(self):
+                per_row_lookup_view(RequestFactory().get('/users/'))
+
+        result = unittest.TestResult()
+        Probe('test_view').run(result)
+
+        self.assertEqual(len(result.failures), 1)
+        self.assertIn('NPlusOneError: Possible N+1', result.failures[0][1])
+
+
+class SyncExecutorTests(SimpleTestCase):
+    """
+    sync_to_async calls run on the configured pools and are counted.
+    """
+
+    def test_named_executor_from_settings(self):
+        before = executor_stats().get('serialization', {}).get('calls', 0)
+
+        thread_name = async_to_sync(
+            sync_to_async(
+                lambda: threading.current_thread().name,
+                thread_sensitive=False,
+                executor='serialization',
+            )
+        )()
+
+        self.assertTrue(thread_name.startswith('sync-serialization'))
+        stats = executor_stats()['serialization']
+        self.assertEqual(stats['calls'], before + 1)
+        self.assertEqual(stats['queued'], 0)
+        self.assertEqual(stats['active'], 0)
+        self.assertGreaterEqual(stats['max_wait_seconds'], 0)
+
+    def test_default_executor_replaces_loop_default(self):
+        thread_name = async_to_sync(
+            sync_to_async(lambda: threading.current_thread().name, thread_sensitive=False)
+        )()
+        self.assertTrue(thread_name.startswith('sync-default'))
+
+    def test_counts_active_calls(self):
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        async def run():
+            task = asyncio.ensure_future(
+                sync_to_async(block, thread_sensitive=False, executor='serialization')()
+            )
+            await sync_to_async(started.wait, thread_sensitive=False)(5)
+            active = executor_stats()['serialization']['active']
+            release.set()
+            await task
+            return active
+
+        self.assertEqual(async_to_sync(run)(), 1)
+        self.assertEqual(executor_stats()['serialization']['active'], 0)
+
+    def test_unknown_executor_name(self):
+        with self.assertRaisesMessage(LookupError, "No executor registered as 'nope'"):
+            async_to_sync(sync_to_async(lambda: None, thread_sensitive=False, executor='nope'))()
+
+    def test_metrics_output(self):
+        async_to_sync(sync_to_async(lambda: None, thread_sensitive=False))()
+        body = executors.render_metrics()
+
+        self.assertIn('studycircle_sync_executor_max_workers{executor="serialization"} 4', body)
+        self.assertIn('# TYPE studycircle_sync_executor_queued gauge', body)
+        self.assertIn('studycircle_sync_executor_calls_total{executor="default"}', body)
+
+
+class AsgirefLocalTests(SimpleTestCase):
+    """
+    Local keeps contextvars semantics with per-key storage, and changes made
+    across a thread hop are copied back.
+    """
+
+    def test_set_get_delete(self):
+        local = Local()
+        local.get = 1
+        local.other = 2
+        self.assertEqual(local.get, 1)
+
+        del local.get
+        self.assertFalse(hasattr(local, 'get'))
+        self.assertEqual(local.other, 2)
+        with self.assertRaises(AttributeError):
+            del local.get
+
+    def test_tasks_see_parent_values_but_not_siblings(self):
+        local = Local()
+        local.value = 'parent'
+
+        async def child(name):
+            seen = local.value
+            local.value = name
+            await asyncio.sleep(0)
+            return seen, local.value
+
+        async def main():
+            results = await asyncio.gather(child('a'), child('b'))
+            return results, local.value
+
+        results, after = async_to_sync(main)()
+        self.assertEqual(results, [('parent', 'a'), ('parent', 'b')])
+        self.assertEqual(after, 'parent')
+
+    def test_thread_hops_propagate_changes(self):
+        local = Local()
+        local.untouched = 'x'
+
+        def in_thread():
+            local.value = 'from thread'
+
+        async def main():
+            await sync_to_async(in_thread)()
+            return local.value, local.untouched
+
+        self.assertEqual(async_to_sync(main)(), ('from thread', 'x'))
+
+    def test_thread_critical_local_is_per_thread(self):
+        local = Local(thread_critical=True)
+        local.value = 'main'
+
+        def in_thread():
+            return hasattr(local, 'value')
+
+        async def main():
+            return await sync_to_async(in_thread, thread_sensitive=False)()
+
+        self.assertFalse(async_to_sync(main)())
+        self.assertEqual(local.value, 'main')
+
+
+class DatabaseProfileTests(TestCase):
+    """
+    The SQLite profile's pragmas run on every connection.
+    """
+
+    def test_sqlite_pragmas_applied(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("SQLite profile only")
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)  # MEMORY
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.storage = ContentAddressedStorage(location=self.enterContext(tempfile.TemporaryDirectory()))
+
+    def test_equal_content_is_stored_once(self):
+        first = self.storage.save('posts/a.PNG', ContentFile(b'slide'))
+        second = self.storage.save('posts/b.png', ContentFile(b'slide'))
+        other = self.storage.save('posts/c.png', ContentFile(b'other slide'))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertTrue(first.startswith('posts/') and first.endswith('.png'))
+        self.assertEqual(StoredBlob.objects.get(name=first).ref_count, 2)
+
+    def test_file_is_deleted_with_its_last_reference(self):
+        name = self.storage.save('posts/a.png', ContentFile(b'slide'))
+        self.storage.save('posts/b.png', ContentFile(b'slide'))
+
+        self.storage.delete(name)
+        self.assertTrue(self.storage.exists(name))
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(StoredBlob.objects.filter(name=name).exists())
+
+    def test_spooled_upload_uses_digest_from_upload_handler(self):
+        upload = TemporaryUploadedFile('a.png', 'image/png', 5, None)
+        upload.write(b'slide')
+        upload.flush()
+        upload.sha256 = hashlib.sha256(b'slide').hexdigest()
+
+        name = self.storage.save('posts/a.png', upload)
+
+        self.assertEqual(name, self.storage.save('posts/b.png', ContentFile(b'slide')))
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), b'slide')
+
+
+CALLS = []
+
+
+@tasks.task
+def record_call(value):
+    CALLS.append(value)
+
+
+@tasks.task(max_attempts=2)
+def always_fails():
+    raise RuntimeError("boom")
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueued_task_runs_once_and_is_removed(self):
+        record_call.enqueue('a')
+
+        self.assertEqual(tasks.work(once=True), 1)
+        self.assertEqual(CALLS, ['a'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_leased_task_is_not_claimed_again_until_lease_lapses(self):
+        record_call.enqueue('a')
+
+        self.assertEqual(len(tasks.claim('w1')), 1)
+        self.assertEqual(tasks.claim('w2'), [])
+        Task.objects.update(leased_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(tasks.claim('w2')), 1)
+
+    def test_failures_are_retried_with_backoff_then_kept(self):
+        always_fails.enqueue()
+
+        tasks.work(once=True)
+        row = Task.objects.get()
+        self.assertEqual((row.status, row.attempts), (Task.PENDING, 1))
+        self.assertGreater(row.run_at, timezone.now())
+        self.assertIn('RuntimeError: boom', row.last_error)
+
+        Task.objects.update(run_at=timezone.now())
+        tasks.work(once=True)
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+    def test_unregistered_names_are_not_called(self):
+        Task.objects.create(name='os.getcwd', max_attempts=1)
+
+        tasks.work(once=True)
+        self.assertIn('not a registered task', Task.objects.get().last_error)
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode_runs_inline(self):
+        self.assertIsNone(record_call.enqueue('b'))
+        self.assertEqual(CALLS, ['b'])
+
+
+class PubSubTests(SimpleTestCase):
+    async def test_events_published_from_threads_reach_subscribers(self):
+        hub = pubsub.Hub()
+        subscription = hub.subscribe(1)
+        other = hub.subscribe(2)
+
+        await asyncio.to_thread(hub.publish, 1, {'type': 'doubt_created'})
+
+        event = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual(event, {'type': 'doubt_created'})
+        self.assertTrue(other.queue.empty())
+        hub.unsubscribe(subscription)
+        self.assertEqual(hub.subscriber_count(1), 0)
+
+    @override_settings(LIVE_QUEUE_SIZE=2)
+    async def test_slow_subscriber_loses_oldest_events(self):
+        hub = pubsub.Hub()
+        subscription = hub.subscribe(1)
+
+        for n in range(3):
+            hub.publish(1, n)
+        await asyncio.sleep(0)
+
+        self.assertEqual([await subscription.get(), await subscription.get()], [1, 2])
+        self.assertEqual(subscription.dropped, 1)
+
+    def test_local_broker_relays_between_processes(self):
+        received = queue.Queue()
+        with tempfile.TemporaryDirectory() as directory:
+            sender = pubsub.LocalBroker(directory, lambda *event: None, name='a')
+            pubsub.LocalBroker(directory, lambda *event: received.put(event), name='b')
+
+            sender.send(json.dumps([7, {'type': 'reply_created'}]).encode())
+
+            self.assertEqual(received.get(timeout=1), (7, {'type': 'reply_created'}))
+
+
+    def test_local_broker_drops_events_too_big_for_a_datagram(self):
+        with tempfile.TemporaryDirectory() as directory:
+            sender = pubsub.LocalBroker(directory, lambda *event: None, name='a')
+            pubsub.LocalBroker(directory, lambda *event: None, name='b')
+
+            with self.assertLogs('core.pubsub', 'WARNING'):
+                sender.send(b'x' * (4 * 1024 * 1024))
+
+class LiveUpdatesTests(TransactionTestCase):
+    """
+    The SSE and WebSocket routes in front of the Django ASGI application.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='pw')
+        self.group = Group.objects.create(name='Physics', created_by=self.alice)
+        GroupMember.objects.create(group=self.group, user=self.alice)
+        membership.invalidate(self.alice.id)
+        self.token = str(AccessToken.for_user(self.alice))
+        self.app = live.route(None)
+
+    async def connect(self, scope, first_message):
+        incoming, outgoing = asyncio.Queue(), asyncio.Queue()
+        await incoming.put(first_message)
+        task = asyncio.create_task(self.app(scope, incoming.get, outgoing.put))
+        return task, incoming, outgoing
+
+    async def test_server_sent_events(self):
+        task, incoming, outgoing = await self.connect({
+            'type': 'http', 'method': 'GET', 'path': f'/api/live/groups/{self.group.id}/',
+            'headers': [], 'query_string': f'token={self.token}'.encode(),
+        }, {'type': 'http.request', 'body': b''})
+
+        start = await asyncio.wait_for(outgoing.get(), 5)
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream'), start['headers'])
+        await outgoing.get()  # retry interval
+
+        pubsub.publish(self.group.id, 'doubt_created', {'id': 1})
+        message = await asyncio.wait_for(outgoing.get(), 1)
+        self.assertEqual(message['body'], b'event: doubt_created\ndata: {"id": 1}\n\n')
+
+        await incoming.put({'type': 'http.disconnect'})
+        await asyncio.wait_for(task, 1)
+        self.assertEqual(pubsub.hub.subscriber_count(self.group.id), 0)
+
+    async def test_websocket_refuses_non_members(self):
+        bob = await User.objects.acreate(username='bob')
+        task, _, outgoing = await self.connect({
+            'type': 'websocket', 'path': f'/ws/groups/{self.group.id}/',
+            'headers': [(b'authorization', f'Bearer {AccessToken.for_user(bob)}'.encode())],
+            'query_string': b'',
+        }, {'type': 'websocket.connect'})
+
+        message = await asyncio.wait_for(outgoing.get(), 5)
+        self.assertEqual(message, {'type': 'websocket.close', 'code': live.WEBSOCKET_FORBIDDEN})
+        await task
+
+    async def test_websocket_sends_events(self):
+        task, incoming, outgoing = await self.connect({
+            'type': 'websocket', 'path': f'/ws/groups/{self.group.id}/',
+            'headers': [], 'query_string': f'token={self.token}'.encode(),
+        }, {'type': 'websocket.connect'})
+        self.assertEqual(await asyncio.wait_for(outgoing.get(), 5), {'type': 'websocket.accept'})
+
+        pubsub.publish(self.group.id, 'solution_marked', {'doubt_id': 3, 'reply_id': 4})
+        message = await asyncio.wait_for(outgoing.get(), 1)
+        self.assertEqual(json.loads(message['text']), {
+            'type': 'solution_marked', 'data': {'doubt_id': 3, 'reply_id': 4},
+        })
+
+        await incoming.put({'type': 'websocket.disconnect', 'code': 1000})
+        await asyncio.wait_for(task, 1)
+
+    @override_settings(LIVE_KEEPALIVE_SECONDS=0.05)
+    async def test_websocket_closes_when_the_user_leaves_the_group(self):
+        task, _, outgoing = await self.connect({
+            'type': 'websocket', 'path': f'/ws/groups/{self.group.id}/',
+            'headers': [], 'query_string': f'token={self.token}'.encode(),
+        }, {'type': 'websocket.connect'})
+        self.assertEqual(await asyncio.wait_for(outgoing.get(), 5), {'type': 'websocket.accept'})
+
+        await GroupMember.objects.filter(user=self.alice).adelete()
+        await sync_to_async(membership.invalidate)(self.alice.id)
+
+        message = await asyncio.wait_for(outgoing.get(), 5)
+        self.assertEqual(message, {'type': 'websocket.close', 'code': live.WEBSOCKET_FORBIDDEN})
+        await asyncio.wait_for(task, 1)
+        self.assertEqual(pubsub.hub.subscriber_count(self.group.id), 0)
+
+    @override_settings(LIVE_KEEPALIVE_SECONDS=0.05)
+    async def test_server_sent_events_end_when_the_token_expires(self):
+        # Token expiry is checked against this clock, not the wall clock.
+        now = [timezone.now()]
+        self.enterContext(mock.patch('rest_framework_simplejwt.tokens.aware_utcnow', lambda: now[0]))
+        token = AccessToken.for_user(self.alice)
+        task, _, outgoing = await self.connect({
+            'type': 'http', 'method': 'GET', 'path': f'/api/live/groups/{self.group.id}/',
+            'headers': [(b'authorization', f'Bearer {token}'.encode())], 'query_string': b'',
+        }, {'type': 'http.request', 'body': b''})
+        self.assertEqual((await asyncio.wait_for(outgoing.get(), 5))['status'], 200)
+        await outgoing.get()  # retry interval
+
+        # The first recheck passes while the token is valid.
+        self.assertEqual(await asyncio.wait_for(outgoing.get(), 5), {
+            'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True,
+        })
+
+        now[0] += token.lifetime
+        await asyncio.wait_for(task, 5)
+        messages = [outgoing.get_nowait() for _ in range(outgoing.qsize())]
+        self.assertEqual(messages[-1], {'type': 'http.response.body', 'body': b''})
@@ -16,13 +16,22 @@ Including another URLconf
 """
 
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
+from .views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('accounts.urls')),
     path('api/social/', include('social.urls')),
     path('api/groups/', include('groups_app.urls')),
+    path('api/search/', include('search.urls')),
+    path('api/notifications/', include('notifications.urls')),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]
 
+# Uploaded media; served by the web server in production.
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
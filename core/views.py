@@ -0,0 +1,19 @@
+from django.http import HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from . import executors
+from .metrics import registry
+
+
+class MetricsView(APIView):
+    """
+    GET: request metrics in the Prometheus text format (staff only).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(
+            registry.render() + executors.render_metrics(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class GroupsAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "groups_app"
+
+    def ready(self):
+        from django.db.models.signals import post_delete
+
+        from . import similarity
+        from .models import Doubt
+
+        post_delete.connect(
+            similarity.on_doubt_deleted,
+            sender=Doubt,
+            dispatch_uid='groups_app.similarity.on_doubt_deleted',
+        )
@@ -0,0 +1,374 @@
+import json
+import time
+import tracemalloc
+from itertools import count
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import F
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.bench import percentile
+from groups_app.models import Group, GroupMember, Doubt, DoubtReply
+from social.models import FriendRequest, Friendship
+
+from .seed_data import SEED_PASSWORD, seed
+
+
+# URL namespaces that aren't part of the API.
+SKIPPED_NAMESPACES = {'admin'}
+
+
+class Context:
+    """
+    Ids from the seeded dataset plus helpers for scenarios that need fresh
+    rows on every iteration.
+    """
+
+    def __init__(self, created):
+        self.users = User.objects.in_bulk(created['users'])
+        self.user = self.users[created['users'][0]]
+        self.other = self.users[created['users'][1]]
+        self.groups = created['groups']
+        self.members = created['members']
+        self.doubts = created['doubts']
+        self.posts = created['posts']
+        self.refresh = str(RefreshToken.for_user(self.user))
+        self.admin = User.objects.create_user('bench-admin', is_staff=True)
+        self._fresh = count()
+        self.outsiders = [
+            u.id for u in User.objects.bulk_create(
+                [User(username=f'bench-outsider{n}') for n in range(50)]
+            )
+        ]
+
+        self.group = Group.objects.get(id=self.groups[0])
+        self.creator = self.group.created_by
+        self.member = self.users[min(self.members[self.group.id])]
+        self.friendly = self.users[
+            Friendship.objects.values_list('user_id', flat=True).order_by('user_id').first()
+            or self.user.id
+        ]
+        assigned = Doubt.objects.filter(directed_to__isnull=False).values_list(
+            'directed_to_id', flat=True
+        ).first()
+        self.assignee = self.users.get(assigned, self.user)
+        self.answerable = list(
+            DoubtReply.objects.values_list('doubt_id', 'doubt__asked_by_id', 'id').order_by('id')
+        )
+
+    def fresh_user(self):
+        n = next(self._fresh)
+        return User.objects.create_user(f'bench-fresh{n}', password=SEED_PASSWORD)
+
+    def pick(self, sequence, i):
+        return sequence[i % len(sequence)]
+
+
+# Each scenario takes the context and the iteration number and returns
+# (method, url kwargs, data, user). Any setup happens before the request
+# is timed. A user of None sends the request unauthenticated.
+def _register(ctx, i):
+    return 'post', {}, {
+        'username': f'bench-register{i}', 'email': f'r{i}@example.com', 'password': SEED_PASSWORD,
+    }, None
+
+
+def _send_friend_request(ctx, i):
+    return 'post', {}, {'receiver_id': ctx.pick(list(ctx.users), i)}, ctx.fresh_user()
+
+
+def _respond_friend_request(ctx, i):
+    fr = FriendRequest.objects.create(sender=ctx.fresh_user(), receiver=ctx.user)
+    return 'post', {'pk': fr.id}, {'action': 'accept'}, ctx.user
+
+
+def _join_group(ctx, i):
+    return 'post', {'group_id': ctx.pick(ctx.groups, i)}, {}, ctx.fresh_user()
+
+
+def _leave_group(ctx, i):
+    user = ctx.fresh_user()
+    group_id = ctx.pick(ctx.groups, i)
+    GroupMember.objects.create(group_id=group_id, user=user)
+    Group.objects.filter(id=group_id).update(members_count=F('members_count') + 1)
+    return 'post', {'group_id': group_id}, {}, user
+
+
+def _bulk_membership(ctx, i):
+    key = 'add' if i % 2 == 0 else 'remove'
+    return 'post', {'group_id': ctx.group.id}, {key: ctx.outsiders}, ctx.creator
+
+
+def _doubt_reply(ctx, i):
+    doubt = Doubt.objects.only('group_id').get(id=ctx.pick(ctx.doubts, i))
+    member = ctx.users[min(ctx.members[doubt.group_id])]
+    return 'post', {'doubt_id': doubt.id}, {'text': f'bench reply {i}'}, member
+
+
+def _mark_solution(ctx, i):
+    doubt_id, asker_id, reply_id = ctx.pick(ctx.answerable, i)
+    return 'post', {'doubt_id': doubt_id}, {'reply_id': reply_id}, ctx.users[asker_id]
+
+
+SCENARIOS = {
+    'register': _register,
+    'token_obtain_pair': lambda ctx, i: (
+        'post', {}, {'username': ctx.user.username, 'password': SEED_PASSWORD}, None
+    ),
+    'token_refresh': lambda ctx, i: ('post', {}, {'refresh': ctx.refresh}, None),
+    'profile': lambda ctx, i: ('get', {}, None, ctx.user),
+
+    'send_friend_request': _send_friend_request,
+    'pending_friend_requests': lambda ctx, i: ('get', {}, None, ctx.user),
+    'respond_friend_request': _respond_friend_request,
+    'friends_list': lambda ctx, i: ('get', {}, None, ctx.friendly),
+    'mutual_friends': lambda ctx, i: ('get', {'user_id': ctx.other.id}, None, ctx.friendly),
+    'post_list_create': [
+        lambda ctx, i: ('get', {}, None, ctx.user),
+        lambda ctx, i: (
+            'post', {}, {'content': f'bench post {i}', 'group_id': ctx.group.id}, ctx.member
+        ),
+    ],
+    'feed': lambda ctx, i: ('get', {}, None, ctx.member),
+    'comment_create': lambda ctx, i: (
+        'post', {'post_id': ctx.pick(ctx.posts, i)}, {'text': f'bench comment {i}'}, ctx.user
+    ),
+    'post_reaction': lambda ctx, i: (
+        'post', {'post_id': ctx.pick(ctx.posts, i)}, {'reaction': 'helpful'}, ctx.user
+    ),
+
+    'group_list_create': [
+        lambda ctx, i: ('get', {}, None, ctx.user),
+        lambda ctx, i: ('post', {}, {'name': f'Bench group {i}'}, ctx.user),
+    ],
+    'user_groups': lambda ctx, i: ('get', {}, None, ctx.member),
+    'join_group': _join_group,
+    'leave_group': _leave_group,
+    'bulk_membership': _bulk_membership,
+    'doubt_list_create': [
+        lambda ctx, i: ('get', {}, None, ctx.member),
+        lambda ctx, i: (
+            'post', {}, {
+                'group_id': ctx.group.id,
+                'title': f'bench doubt {i} about momentum',
+                'body': 'How does the integral of force relate to momentum?',
+            }, ctx.member,
+        ),
+    ],
+    'my_assigned_doubts': lambda ctx, i: ('get', {}, None, ctx.assignee),
+    'doubt_detail': lambda ctx, i: (
+        'get', {'doubt_id': ctx.pick(ctx.doubts, i)}, None, ctx.user
+    ),
+    'doubt_reply': _doubt_reply,
+    'mark_solution': _mark_solution,
+
+    'notifications': lambda ctx, i: ('get', {}, None, ctx.member),
+    'notifications_unread_count': lambda ctx, i: ('get', {}, None, ctx.member),
+    'notifications_mark_read': lambda ctx, i: ('post', {}, {}, ctx.member),
+
+    'search': lambda ctx, i: ('get', {}, {'q': 'force momentum'}, ctx.user),
+    'metrics': lambda ctx, i: ('get', {}, None, ctx.admin),
+
+    'group_list_async': lambda ctx, i: ('get', {}, None, ctx.user),
+    'doubt_list_async': lambda ctx, i: ('get', {}, None, ctx.member),
+    'post_list_async': lambda ctx, i: ('get', {}, None, ctx.user),
+    'friends_list_async': lambda ctx, i: ('get', {}, None, ctx.friendly),
+}
+
+
+def _scenario_list():
+    for name, scenarios in SCENARIOS.items():
+        if not isinstance(scenarios, list):
+            scenarios = [scenarios]
+        for scenario in scenarios:
+            yield name, scenario
+
+
+def api_url_names(patterns=None):
+    """
+    Names of every routed URL in the project, skipping SKIPPED_NAMESPACES.
+    """
+    names = set()
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace in SKIPPED_NAMESPACES:
+                continue
+            names |= api_url_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_benchmarks(ctx, iterations=50, memory_samples=5, warm_cache=False, only=None):
+    """
+    Drive every scenario ``iterations`` times and return one result dict
+    per scenario.
+    """
+    client = APIClient()
+    results = []
+    for name, scenario in _scenario_list():
+        if only and name not in only:
+            continue
+        timings, queries, peaks, statuses = [], [], [], {}
+        for i in range(iterations):
+            method, kwargs, data, user = scenario(ctx, i)
+            client.force_authenticate(user)
+            url = reverse(name, kwargs=kwargs)
+            send = getattr(client, method)
+            fmt = {'format': 'json'} if method != 'get' else {}
+            if not warm_cache:
+                cache.clear()
+
+            trace = i < memory_samples
+            if trace:
+                tracemalloc.start()
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                start = time.perf_counter()
+                response = send(url, data, **fmt)
+                elapsed = time.perf_counter() - start
+            if trace:
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            else:
+                # Only untraced requests count towards latency.
+                timings.append(elapsed)
+
+            queries.append(counter.count)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        timings = timings or [0.0]
+        results.append({
+            'endpoint': f'{method.upper()} {name}',
+            'requests': iterations,
+            'p50_ms': round(percentile(timings, 50) * 1000, 3),
+            'p95_ms': round(percentile(timings, 95) * 1000, 3),
+            'p99_ms': round(percentile(timings, 99) * 1000, 3),
+            'queries_mean': round(sum(queries) / len(queries), 2),
+            'queries_max': max(queries),
+            'peak_kib': round(max(peaks) / 1024, 1) if peaks else None,
+            'statuses': statuses,
+        })
+    client.force_authenticate(None)
+    return results
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and benchmark every API endpoint: "
+        "latency percentiles, queries per request and peak allocated memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help="Requests per endpoint.")
+        parser.add_argument(
+            '--memory-samples',
+            type=int,
+            default=5,
+            help="Leading requests per endpoint run under tracemalloc (excluded from latency).",
+        )
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--doubts', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help="Keep the cache between requests instead of measuring cold responses.",
+        )
+        parser.add_argument('--only', nargs='*', help="Benchmark only these URL names.")
+        parser.add_argument('--json', dest='json_path', help="Write the results to this file.")
+        parser.add_argument(
+            '--baseline',
+            help="Results file from an earlier --json run to compare against.",
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help="Allowed relative p95 growth against --baseline (default 0.25).",
+        )
+
+    def handle(self, *args, **options):
+        missing = api_url_names() - set(SCENARIOS)
+        if missing:
+            self.stderr.write(f"No benchmark scenario for: {', '.join(sorted(missing))}")
+
+        counts = {name: options[name] for name in ('users', 'groups', 'doubts', 'posts')}
+        counts['replies'] = counts['doubts'] * 3
+        counts['comments'] = counts['posts'] * 3
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            ctx = Context(seed(counts, seed=options['seed']))
+            results = run_benchmarks(
+                ctx,
+                iterations=max(options['iterations'], options['memory_samples'] + 1),
+                memory_samples=options['memory_samples'],
+                warm_cache=options['warm_cache'],
+                only=options['only'],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.report(results)
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(results, f, indent=2)
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def report(self, results):
+        header = (
+            f"{'endpoint':<32} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'queries':>8} {'peak KiB':>9}  statuses"
+        )
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for r in results:
+            statuses = ' '.join(f'{code}x{n}' for code, n in sorted(r['statuses'].items()))
+            self.stdout.write(
+                f"{r['endpoint']:<32} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+                f"{r['queries_mean']:>8.1f} {r['peak_kib'] or 0:>9.1f}  {statuses}"
+            )
+
+    def compare(self, results, baseline_path, tolerance):
+        with open(baseline_path) as f:
+            baseline = {r['endpoint']: r for r in json.load(f)}
+
+        regressions = []
+        for r in results:
+            before = baseline.get(r['endpoint'])
+            if before is None:
+                continue
+            if r['queries_max'] > before['queries_max']:
+                regressions.append(
+                    f"{r['endpoint']}: queries {before['queries_max']} -> {r['queries_max']}"
+                )
+            if r['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+                regressions.append(
+                    f"{r['endpoint']}: p95 {before['p95_ms']}ms -> {r['p95_ms']}ms"
+                )
+
+        if regressions:
+            raise CommandError("Regressions against baseline:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
@@ -0,0 +1,114 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import ORJSONRenderer
+from groups_app.models import Group, Doubt
+from groups_app.serializers import (
+    GroupSerializer,
+    DoubtSummarySerializer,
+    groups_from_values,
+    doubt_summaries_from_values,
+)
+
+
+def _user(i):
+    return User(id=i, username=f'user{i}', email=f'user{i}@example.com')
+
+
+def _user_values(prefix, user):
+    return {
+        f'{prefix}__id': user.id if user else None,
+        f'{prefix}__username': user.username if user else None,
+        f'{prefix}__email': user.email if user else None,
+    }
+
+
+def group_fixtures(rows):
+    now = timezone.now()
+    groups = []
+    values = []
+    for i in range(rows):
+        creator = _user(i)
+        group = Group(
+            id=i, name=f'Group {i}', description='Weekly study group',
+            created_by=creator, created_at=now, members_count=i % 50,
+        )
+        groups.append(group)
+        values.append({
+            'id': group.id, 'name': group.name, 'description': group.description,
+            'created_at': now, 'members_count': group.members_count,
+            **_user_values('created_by', creator),
+        })
+    return groups, values
+
+
+def doubt_fixtures(rows):
+    now = timezone.now()
+    doubts = []
+    values = []
+    for i in range(rows):
+        group = Group(id=i % 20, name=f'Group {i % 20}')
+        asker = _user(i)
+        helper = _user(i + 1) if i % 2 else None
+        doubt = Doubt(
+            id=i, title=f'Doubt {i}', body='How does this work?', group=group,
+            asked_by=asker, directed_to=helper, status='open', created_at=now,
+            reply_count=i % 7,
+        )
+        doubt.has_solution = bool(i % 3)
+        doubts.append(doubt)
+        values.append({
+            'id': doubt.id, 'title': doubt.title, 'body': doubt.body,
+            'group__id': group.id, 'group__name': group.name,
+            'status': doubt.status, 'created_at': now,
+            'reply_count': doubt.reply_count, 'has_solution': doubt.has_solution,
+            **_user_values('asked_by', asker),
+            **_user_values('directed_to', helper),
+        })
+    return doubts, values
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-row cost of ModelSerializer + JSONRenderer with the "
+        "values()-based list builders + ORJSONRenderer. Uses in-memory rows, "
+        "so database time is excluded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+        cases = [
+            ('groups', group_fixtures(rows), GroupSerializer, groups_from_values),
+            ('doubts', doubt_fixtures(rows), DoubtSummarySerializer, doubt_summaries_from_values),
+        ]
+        renderers = [('json', JSONRenderer()), ('orjson', ORJSONRenderer())]
+
+        self.stdout.write(f"{'resource':<8} {'path':<11} {'renderer':<8} {'us/row':>8}")
+        for name, (objects, values), serializer_class, build in cases:
+            paths = [
+                ('serializer', lambda: serializer_class(objects, many=True).data),
+                ('values', lambda: build(values)),
+            ]
+            for path, make_data in paths:
+                for renderer_name, renderer in renderers:
+                    best = min(
+                        self._time(lambda: renderer.render(make_data())) for _ in range(repeat)
+                    )
+                    self.stdout.write(
+                        f"{name:<8} {path:<11} {renderer_name:<8} {best / rows * 1e6:>8.2f}"
+                    )
+
+    @staticmethod
+    def _time(func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
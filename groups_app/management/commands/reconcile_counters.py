@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from groups_app.models import Group, GroupMember, Doubt, DoubtReply
+from social.models import Post, PostInteraction
+
+
+# (model, counter field, counted model, foreign key on the counted model)
+COUNTERS = [
+    (Group, 'members_count', GroupMember, 'group'),
+    (Doubt, 'reply_count', DoubtReply, 'doubt'),
+    (Post, 'interactions_count', PostInteraction, 'post'),
+]
+
+
+def actual_count(counted_model, fk):
+    rows = (
+        counted_model.objects.filter(**{fk: OuterRef('pk')})
+        .order_by()
+        .values(fk)
+        .annotate(n=Count('*'))
+        .values('n')
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized counters that have drifted from the rows they count."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Report drifted rows without fixing them.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Number of rows to fix per UPDATE.",
+        )
+
+    def handle(self, *args, **options):
+        for model, field, counted_model, fk in COUNTERS:
+            label = f"{model.__name__}.{field}"
+            drifted = list(
+                model.objects.annotate(actual=actual_count(counted_model, fk))
+                .exclude(**{field: F('actual')})
+                .values_list('pk', flat=True)
+            )
+
+            if not options['dry_run']:
+                batch_size = options['batch_size']
+                for start in range(0, len(drifted), batch_size):
+                    with transaction.atomic():
+                        model.objects.filter(
+                            pk__in=drifted[start:start + batch_size]
+                        ).update(**{field: actual_count(counted_model, fk)})
+
+            verb = "drifted" if options['dry_run'] else "fixed"
+            self.stdout.write(f"{label}: {len(drifted)} {verb}")
@@ -0,0 +1,217 @@
+import random
+from collections import Counter
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import UserProfile
+from groups_app.models import Group, GroupMember, Doubt, DoubtReply
+from social import feed
+from social.models import FriendRequest, Friendship, Post, Comment, PostInteraction
+
+
+SEED_PASSWORD = 'studycircle'
+
+DEFAULT_COUNTS = {
+    'users': 200,
+    'groups': 20,
+    'members_per_group': 30,
+    'doubts': 1000,
+    'replies': 3000,
+    'posts': 500,
+    'comments': 1500,
+    'reactions': 1500,
+    'friendships': 600,
+    'pending_requests': 100,
+}
+
+WORDS = (
+    'force energy momentum integral derivative matrix vector graph tree array '
+    'pointer recursion thermodynamics entropy reaction molecule cell protein '
+    'theorem proof limit series probability variance algorithm complexity'
+).split()
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def _pairs(rng, population, count):
+    """
+    Return up to ``count`` distinct unordered pairs from ``population``.
+    """
+    pairs = set()
+    attempts = 0
+    while len(pairs) < count and attempts < count * 10:
+        a, b = rng.sample(population, 2)
+        pairs.add((min(a, b), max(a, b)))
+        attempts += 1
+    return sorted(pairs)
+
+
+@transaction.atomic
+def seed(counts=None, seed=0, prefix='seed'):
+    """
+    Create a synthetic dataset and return the created ids by kind. Every
+    user's password is SEED_PASSWORD.
+    """
+    counts = {**DEFAULT_COUNTS, **(counts or {})}
+    rng = random.Random(seed)
+    password = make_password(SEED_PASSWORD)
+
+    users = User.objects.bulk_create(
+        [
+            User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', password=password)
+            for i in range(counts['users'])
+        ]
+    )
+    user_ids = [u.id for u in users]
+    UserProfile.objects.bulk_create([UserProfile(user_id=uid) for uid in user_ids])
+
+    groups = Group.objects.bulk_create(
+        [
+            Group(name=f'Group {i}', description=_text(rng, 8), created_by_id=rng.choice(user_ids))
+            for i in range(counts['groups'])
+        ]
+    )
+    members = {}
+    memberships = []
+    for group in groups:
+        size = min(counts['members_per_group'], len(user_ids))
+        members[group.id] = set(rng.sample(user_ids, size)) | {group.created_by_id}
+        memberships.extend(GroupMember(group=group, user_id=uid) for uid in members[group.id])
+    GroupMember.objects.bulk_create(memberships, batch_size=1000)
+    for group in groups:
+        group.members_count = len(members[group.id])
+    Group.objects.bulk_update(groups, ['members_count'])
+
+    doubts = []
+    for _ in range(counts['doubts']):
+        group = rng.choice(groups)
+        group_members = sorted(members[group.id])
+        doubts.append(
+            Doubt(
+                group=group,
+                asked_by_id=rng.choice(group_members),
+                directed_to_id=rng.choice(group_members) if rng.random() < 0.3 else None,
+                title=_text(rng, 6),
+                body=_text(rng, 30),
+            )
+        )
+    doubts = Doubt.objects.bulk_create(doubts, batch_size=500)
+
+    replies = []
+    for _ in range(counts['replies'] if doubts else 0):
+        doubt = rng.choice(doubts)
+        replies.append(
+            DoubtReply(
+                doubt=doubt,
+                user_id=rng.choice(sorted(members[doubt.group_id])),
+                text=_text(rng, 20),
+            )
+        )
+    replies = DoubtReply.objects.bulk_create(replies, batch_size=500)
+    reply_counts = Counter(reply.doubt_id for reply in replies)
+    for doubt in doubts:
+        doubt.reply_count = reply_counts[doubt.id]
+    Doubt.objects.bulk_update(doubts, ['reply_count'], batch_size=500)
+    solved = {}
+    for reply in replies:
+        if rng.random() < 0.2:
+            solved[reply.doubt_id] = reply.id
+    DoubtReply.objects.filter(id__in=solved.values()).update(is_solution=True)
+    Doubt.objects.filter(id__in=solved.keys()).update(status='answered')
+
+    friend_pairs = _pairs(rng, user_ids, counts['friendships'])
+    FriendRequest.objects.bulk_create(
+        [FriendRequest(sender_id=a, receiver_id=b, status='accepted') for a, b in friend_pairs],
+        batch_size=1000,
+    )
+    Friendship.objects.bulk_create(
+        [Friendship(user_id=a, friend_id=b) for a, b in friend_pairs]
+        + [Friendship(user_id=b, friend_id=a) for a, b in friend_pairs],
+        batch_size=1000,
+    )
+    friends = set(friend_pairs)
+    pending = [
+        (a, b) for a, b in _pairs(rng, user_ids, counts['pending_requests'] * 2)
+        if (a, b) not in friends
+    ][:counts['pending_requests']]
+    FriendRequest.objects.bulk_create(
+        [FriendRequest(sender_id=b, receiver_id=a) for a, b in pending], batch_size=1000
+    )
+
+    posts = []
+    for _ in range(counts['posts']):
+        group = rng.choice(groups) if rng.random() < 0.7 else None
+        author = rng.choice(sorted(members[group.id])) if group else rng.choice(user_ids)
+        posts.append(
+            Post(
+                author_id=author,
+                group=group,
+                content=_text(rng, 40),
+                post_type=rng.choice(['question', 'tip', 'project']),
+            )
+        )
+    posts = Post.objects.bulk_create(posts, batch_size=500)
+
+    Comment.objects.bulk_create(
+        [
+            Comment(post=rng.choice(posts), user_id=rng.choice(user_ids), text=_text(rng, 12))
+            for _ in range(counts['comments'] if posts else 0)
+        ],
+        batch_size=500,
+    )
+    reactions = {
+        (rng.choice(posts).id, rng.choice(user_ids)) for _ in range(counts['reactions'] if posts else 0)
+    }
+    PostInteraction.objects.bulk_create(
+        [
+            PostInteraction(post_id=post_id, user_id=uid, reaction=rng.choice(['helpful', 'not_clear']))
+            for post_id, uid in reactions
+        ],
+        batch_size=1000,
+    )
+    interaction_counts = Counter(post_id for post_id, _ in reactions)
+    for post in posts:
+        post.interactions_count = interaction_counts[post.id]
+    Post.objects.bulk_update(posts, ['interactions_count'], batch_size=500)
+
+    for post in posts:
+        feed.fan_out_post(post.id)
+
+    return {
+        'users': user_ids,
+        'groups': [g.id for g in groups],
+        'members': members,
+        'doubts': [d.id for d in doubts],
+        'posts': [p.id for p in posts],
+    }
+
+
+class Command(BaseCommand):
+    help = "Seed the database with a synthetic dataset for development and benchmarks."
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_COUNTS.items():
+            parser.add_argument(
+                f"--{name.replace('_', '-')}",
+                type=int,
+                default=default,
+                help=f"Number of {name.replace('_', ' ')} (default {default}).",
+            )
+        parser.add_argument('--seed', type=int, default=0, help="Random seed.")
+        parser.add_argument(
+            '--prefix',
+            default='seed',
+            help="Username prefix; use a new one to seed the same database twice.",
+        )
+
+    def handle(self, *args, **options):
+        counts = {name: options[name] for name in DEFAULT_COUNTS}
+        created = seed(counts, seed=options['seed'], prefix=options['prefix'])
+        for kind in ('users', 'groups', 'doubts', 'posts'):
+            self.stdout.write(f"{kind}: {len(created[kind])}")
+        self.stdout.write(f"Every seeded user's password is '{SEED_PASSWORD}'.")
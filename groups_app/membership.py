@@ -0,0 +1,35 @@
+"""
+Cached group membership for permission checks.
+
+Each user's group ids are cached as one frozenset in Django's cache, so
+"is this user a member of that group" costs no queries once warm. Views
+that change memberships call ``invalidate`` after their transaction;
+changes made elsewhere (e.g. the admin) show up once the entry expires
+after MEMBERSHIP_CACHE_TIMEOUT seconds.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import GroupMember
+
+
+def _key(user_id):
+    return f'groups:membership:{user_id}'
+
+
+def group_ids(user_id):
+    ids = cache.get(_key(user_id))
+    if ids is None:
+        ids = frozenset(
+            GroupMember.objects.filter(user_id=user_id).values_list('group_id', flat=True)
+        )
+        cache.set(_key(user_id), ids, settings.MEMBERSHIP_CACHE_TIMEOUT)
+    return ids
+
+
+def is_member(user_id, group_id):
+    return int(group_id) in group_ids(user_id)
+
+
+def invalidate(*user_ids):
+    cache.delete_many([_key(user_id) for user_id in user_ids])
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Group = apps.get_model("groups_app", "Group")
+    GroupMember = apps.get_model("groups_app", "GroupMember")
+    Doubt = apps.get_model("groups_app", "Doubt")
+    DoubtReply = apps.get_model("groups_app", "DoubtReply")
+
+    members = (
+        GroupMember.objects.filter(group=OuterRef("pk"))
+        .order_by()
+        .values("group")
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    Group.objects.update(members_count=Coalesce(Subquery(members), 0))
+
+    replies = (
+        DoubtReply.objects.filter(doubt=OuterRef("pk"))
+        .order_by()
+        .values("doubt")
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    Doubt.objects.update(reply_count=Coalesce(Subquery(replies), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups_app", "0002_doubt_doubtreply"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="group",
+            name="members_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="doubt",
+            name="reply_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups_app", "0003_group_members_count_doubt_reply_count"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="doubt",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="groups_doubt_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="doubt",
+            index=models.Index(
+                fields=["group", "-created_at", "-id"], name="groups_doubt_group_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="doubt",
+            index=models.Index(
+                fields=["directed_to", "-created_at", "-id"],
+                name="groups_doubt_directed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="doubtreply",
+            index=models.Index(
+                fields=["doubt", "created_at"], name="groups_reply_doubt_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="doubtreply",
+            index=models.Index(
+                condition=models.Q(("is_solution", True)),
+                fields=["doubt"],
+                name="groups_reply_solution_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="group",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="groups_group_created_idx"
+            ),
+        ),
+    ]
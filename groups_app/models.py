@@ -7,6 +7,13 @@ class Group(models.Model):
     description = models.TextField(blank=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained by the join/leave views; see the reconcile_counters command.
+    members_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='groups_group_created_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -43,6 +50,17 @@ class Doubt(models.Model):
         default='open'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained by DoubtReplyCreateView; see the reconcile_counters command.
+    reply_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # Each index matches one list endpoint's filter plus its
+        # newest-first (created_at, id) keyset ordering.
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='groups_doubt_created_idx'),
+            models.Index(fields=['group', '-created_at', '-id'], name='groups_doubt_group_idx'),
+            models.Index(fields=['directed_to', '-created_at', '-id'], name='groups_doubt_directed_idx'),
+        ]
 
     def __str__(self):
         return f"[{self.group.name}] {self.title}"
@@ -55,6 +73,17 @@ class DoubtReply(models.Model):
     is_solution = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['doubt', 'created_at'], name='groups_reply_doubt_idx'),
+            # At most one reply per doubt is a solution, so keep only those.
+            models.Index(
+                fields=['doubt'],
+                condition=models.Q(is_solution=True),
+                name='groups_reply_solution_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"Reply by {self.user.username}"
 
@@ -0,0 +1,117 @@
+"""
+Versioned response caching for the group and doubt list endpoints.
+
+Every cached response is keyed by the request's path and query string
+plus the current generation number of each scope it depends on:
+
+    'groups'        the group list (names, member counts)
+    'doubts'        the unfiltered doubt list
+    'group:<id>'    the doubt list of one group
+
+Writes bump the generations they affect instead of deleting keys, so
+stale entries are simply never looked up again and expire on their own.
+The generation numbers also form the ETag, which lets an unchanged list
+be answered with 304 Not Modified before any cached body is read.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.async_views import json_response
+
+
+def _gen_key(scope):
+    return f'groups:gen:{scope}'
+
+
+def _initial_generation():
+    # Start from the clock rather than 1 so a generation that was evicted
+    # and recreated can't collide with one that is still cached.
+    return time.time_ns()
+
+
+def generations(scopes):
+    keys = [_gen_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _initial_generation(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+async def agenerations(scopes):
+    keys = [_gen_key(scope) for scope in scopes]
+    found = await cache.aget_many(keys)
+    for key in keys:
+        if key not in found:
+            await cache.aadd(key, _initial_generation(), timeout=None)
+            found[key] = await cache.aget(key)
+    return [found[key] for key in keys]
+
+
+def bump(*scopes):
+    for scope in scopes:
+        try:
+            cache.incr(_gen_key(scope))
+        except ValueError:
+            cache.set(_gen_key(scope), _initial_generation(), timeout=None)
+
+
+def bump_group(group_id):
+    """
+    Invalidate the doubt lists that show doubts of this group.
+    """
+    bump('doubts', f'group:{group_id}')
+
+
+def _etag(request, gens):
+    params = sorted(request.query_params.lists())
+    # The host is part of the key because paginated bodies embed absolute
+    # "next" links.
+    material = repr((request.get_host(), request.path, params, gens))
+    return hashlib.sha1(material.encode()).hexdigest()
+
+
+def cached_response(request, scopes, build):
+    """
+    Return the cached data for this request, or ``build()`` it and cache
+    it. ``build`` must return plain response data that does not depend on
+    who is asking.
+    """
+    digest = _etag(request, generations(scopes))
+    etag = f'"{digest}"'
+
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if etag in request.headers.get('If-None-Match', ''):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    key = f'groups:response:{digest}'
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+    return Response(data, status=status.HTTP_200_OK, headers=headers)
+
+
+async def acached_response(request, scopes, build):
+    """
+    ``cached_response`` for async views; ``build`` is a coroutine function.
+    """
+    digest = _etag(request, await agenerations(scopes))
+    etag = f'"{digest}"'
+
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if etag in request.headers.get('If-None-Match', ''):
+        return json_response(None, status.HTTP_304_NOT_MODIFIED, headers)
+
+    key = f'groups:response:{digest}'
+    data = await cache.aget(key)
+    if data is None:
+        data = await build()
+        await cache.aset(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+    return json_response(data, status.HTTP_200_OK, headers)
@@ -7,14 +7,17 @@ from accounts.serializers import UserSerializer
 
 class GroupSerializer(serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
-    members_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Group
         fields = ['id', 'name', 'description', 'created_by', 'created_at', 'members_count']
+        read_only_fields = ['members_count']
 
-    def get_members_count(self, obj):
-        return GroupMember.objects.filter(group=obj).count()
+
+class GroupSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Group
+        fields = ['id', 'name']
 
 
 class GroupMemberSerializer(serializers.ModelSerializer):
@@ -53,3 +56,108 @@ class DoubtSerializer(serializers.ModelSerializer):
             'replies',
         ]
 
+
+
+class DoubtSummarySerializer(serializers.ModelSerializer):
+    """
+    Compact doubt representation for list endpoints: the group is reduced
+    to id/name and replies to a count plus a solved flag. Expects the
+    queryset from views.doubt_summary_queryset.
+    """
+    asked_by = UserSerializer(read_only=True)
+    directed_to = UserSerializer(read_only=True)
+    group = GroupSummarySerializer(read_only=True)
+    has_solution = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Doubt
+        fields = [
+            'id',
+            'title',
+            'body',
+            'group',
+            'asked_by',
+            'directed_to',
+            'status',
+            'created_at',
+            'reply_count',
+            'has_solution',
+        ]
+        read_only_fields = ['reply_count']
+
+
+# Fast paths for the read-only list endpoints. They read ``values()`` rows
+# instead of model instances and build the same output as the serializers
+# above, skipping per-field serializer dispatch. Each *_VALUES tuple lists
+# the columns its builder needs.
+
+_datetime = serializers.DateTimeField()
+
+
+def _user(row, prefix):
+    if row[f'{prefix}__id'] is None:
+        return None
+    return {
+        'id': row[f'{prefix}__id'],
+        'username': row[f'{prefix}__username'],
+        'email': row[f'{prefix}__email'],
+    }
+
+
+def _user_values(prefix):
+    return (f'{prefix}__id', f'{prefix}__username', f'{prefix}__email')
+
+
+GROUP_VALUES = (
+    'id', 'name', 'description', 'created_at', 'members_count',
+    *_user_values('created_by'),
+)
+
+
+def groups_from_values(rows):
+    """
+    Same output as ``GroupSerializer(many=True).data`` for GROUP_VALUES rows.
+    """
+    to_datetime = _datetime.to_representation
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'description': row['description'],
+            'created_by': _user(row, 'created_by'),
+            'created_at': to_datetime(row['created_at']),
+            'members_count': row['members_count'],
+        }
+        for row in rows
+    ]
+
+
+DOUBT_SUMMARY_VALUES = (
+    'id', 'title', 'body', 'group__id', 'group__name', 'status', 'created_at',
+    'reply_count', 'has_solution',
+    *_user_values('asked_by'),
+    *_user_values('directed_to'),
+)
+
+
+def doubt_summaries_from_values(rows):
+    """
+    Same output as ``DoubtSummarySerializer(many=True).data`` for
+    DOUBT_SUMMARY_VALUES rows of views.doubt_summary_queryset().
+    """
+    to_datetime = _datetime.to_representation
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'body': row['body'],
+            'group': {'id': row['group__id'], 'name': row['group__name']},
+            'asked_by': _user(row, 'asked_by'),
+            'directed_to': _user(row, 'directed_to'),
+            'status': row['status'],
+            'created_at': to_datetime(row['created_at']),
+            'reply_count': row['reply_count'],
+            'has_solution': row['has_solution'],
+        }
+        for row in rows
+    ]
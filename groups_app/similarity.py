@@ -0,0 +1,224 @@
+"""
+In-process duplicate detection for doubts.
+
+Each group gets a MinHash/LSH index over the word sets of its answered
+doubts. Asking a new doubt looks up candidates that share an LSH band
+with it and ranks them by estimated Jaccard similarity, which costs a
+few hundred hash operations instead of a database scan.
+
+The index is per process: it is loaded lazily per group, updated in
+place when a solution is marked here, and refreshed after
+REFRESH_SECONDS to pick up answers marked by other processes. A refresh
+reads the ids of the group's answered doubts and only computes
+signatures for the ones it hasn't indexed. Loading and refreshing hold
+a lock for that group alone, and lookups keep using the current index
+while another request refreshes it.
+"""
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+
+from .models import Doubt
+
+
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+# Candidates must estimate at least this Jaccard similarity to be returned.
+THRESHOLD = 0.3
+LIMIT = 5
+REFRESH_SECONDS = 300
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20251117)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+STOP_WORDS = frozenset(
+    'a an and are as at be by can do does for from how i in is it me my of on or '
+    'the this to what when where which who why with you'.split()
+)
+
+
+def tokens(text):
+    return {t for t in TOKEN.findall(text.lower()) if t not in STOP_WORDS}
+
+
+def _hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'big')
+
+
+def signature(words):
+    if not words:
+        return None
+    hashes = [_hash(word) for word in words]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def bands(sig):
+    for band in range(BANDS):
+        yield band, sig[band * ROWS:(band + 1) * ROWS]
+
+
+def estimate_similarity(sig, other):
+    return sum(x == y for x, y in zip(sig, other)) / NUM_PERM
+
+
+class GroupIndex:
+    """
+    LSH buckets and signatures for one group's answered doubts.
+    """
+
+    def __init__(self):
+        self.loaded_at = time.monotonic()
+        self.entries = {}
+        self.buckets = defaultdict(set)
+
+    def add(self, doubt_id, title, sig):
+        self.discard(doubt_id)
+        self.entries[doubt_id] = (title, sig)
+        for key in bands(sig):
+            self.buckets[key].add(doubt_id)
+
+    def discard(self, doubt_id):
+        entry = self.entries.pop(doubt_id, None)
+        if entry is None:
+            return
+        for key in bands(entry[1]):
+            self.buckets[key].discard(doubt_id)
+
+    def query(self, sig, limit, threshold):
+        candidates = set()
+        for key in bands(sig):
+            candidates |= self.buckets.get(key, set())
+
+        matches = []
+        for doubt_id in candidates:
+            title, other = self.entries[doubt_id]
+            similarity = estimate_similarity(sig, other)
+            if similarity >= threshold:
+                matches.append((similarity, doubt_id, title))
+        matches.sort(key=lambda m: (-m[0], -m[1]))
+        return matches[:limit]
+
+
+# Doubts whose rows a refresh reads per query.
+REFRESH_BATCH = 500
+
+
+def _signatures(rows):
+    for doubt_id, title, body in rows:
+        sig = signature(tokens(f'{title} {body}'))
+        if sig is not None:
+            yield doubt_id, title, sig
+
+
+class SimilarityIndex:
+    def __init__(self):
+        self._groups = {}
+        self._group_locks = {}
+        # Guards the two dicts and every GroupIndex; held only briefly.
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._groups.clear()
+
+    def _group(self, group_id):
+        with self._lock:
+            index = self._groups.get(group_id)
+            group_lock = self._group_locks.setdefault(group_id, threading.Lock())
+        if index is not None and time.monotonic() - index.loaded_at < REFRESH_SECONDS:
+            return index
+
+        if index is None:
+            group_lock.acquire()
+        elif not group_lock.acquire(blocking=False):
+            # Another request is refreshing it.
+            return index
+        try:
+            with self._lock:
+                index = self._groups.get(group_id)
+            if index is None:
+                return self._load(group_id)
+            if time.monotonic() - index.loaded_at >= REFRESH_SECONDS:
+                self._refresh(group_id, index)
+            return index
+        finally:
+            group_lock.release()
+
+    def _load(self, group_id):
+        index = GroupIndex()
+        answered = Doubt.objects.filter(
+            group_id=group_id, status='answered'
+        ).values_list('id', 'title', 'body')
+        for doubt_id, title, sig in _signatures(answered.iterator()):
+            index.add(doubt_id, title, sig)
+        with self._lock:
+            self._groups[group_id] = index
+        return index
+
+    def _refresh(self, group_id, index):
+        # Taken first, so a doubt add() indexes meanwhile isn't discarded.
+        with self._lock:
+            known = set(index.entries)
+        answered = Doubt.objects.filter(group_id=group_id, status='answered')
+        current = set(answered.values_list('id', flat=True))
+        new_ids = sorted(current - known)
+
+        added = []
+        for start in range(0, len(new_ids), REFRESH_BATCH):
+            rows = answered.filter(id__in=new_ids[start:start + REFRESH_BATCH])
+            added.extend(_signatures(rows.values_list('id', 'title', 'body')))
+
+        with self._lock:
+            for doubt_id in known - current:
+                index.discard(doubt_id)
+            for doubt_id, title, sig in added:
+                index.add(doubt_id, title, sig)
+            index.loaded_at = time.monotonic()
+
+    def add(self, doubt):
+        """
+        Index a doubt that has just been answered.
+        """
+        sig = signature(tokens(f'{doubt.title} {doubt.body}'))
+        if sig is None:
+            return
+        index = self._group(doubt.group_id)
+        with self._lock:
+            index.add(doubt.id, doubt.title, sig)
+
+    def discard(self, doubt):
+        with self._lock:
+            index = self._groups.get(doubt.group_id)
+            if index is not None:
+                index.discard(doubt.id)
+
+    def similar(self, group_id, title, body, limit=LIMIT, threshold=THRESHOLD):
+        """
+        Return up to ``limit`` answered doubts in the group that look like
+        the given question, most similar first.
+        """
+        sig = signature(tokens(f'{title} {body}'))
+        if sig is None:
+            return []
+        index = self._group(group_id)
+        with self._lock:
+            matches = index.query(sig, limit, threshold)
+        return [
+            {"id": doubt_id, "title": doubt_title, "similarity": round(similarity, 2)}
+            for similarity, doubt_id, doubt_title in matches
+        ]
+
+
+index = SimilarityIndex()
+
+
+def on_doubt_deleted(sender, instance, **kwargs):
+    index.discard(instance)
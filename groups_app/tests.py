@@ -1,3 +1,825 @@
-from django.test import TestCase
+import base64
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.testing import QueryPlanAssertionsMixin
+
+from . import similarity
+from .models import Group, GroupMember, Doubt, DoubtReply
+from .serializers import (
+    GroupSerializer,
+    DoubtSummarySerializer,
+    GROUP_VALUES,
+    DOUBT_SUMMARY_VALUES,
+    groups_from_values,
+    doubt_summaries_from_values,
+)
+from .views import doubt_summary_queryset
+
+
+class GroupListQueryCountTests(TestCase):
+    """
+    The group list endpoints must not issue per-row queries.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='alice', password='pw')
+        creators = User.objects.bulk_create(
+            [User(username=f'creator{i}') for i in range(50)]
+        )
+        groups = Group.objects.bulk_create(
+            [
+                Group(name=f'Group {i}', created_by=creators[i % len(creators)])
+                for i in range(1000)
+            ]
+        )
+        GroupMember.objects.bulk_create(
+            [GroupMember(group=g, user=g.created_by) for g in groups]
+            + [GroupMember(group=g, user=cls.user) for g in groups[::2]]
+        )
+        call_command('reconcile_counters', stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_group_list_query_budget(self):
+        groups = []
+        url = reverse('group_list_create') + '?page_size=100'
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            groups.extend(response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(len(groups), 1000)
+        counts = {g['name']: g['members_count'] for g in groups}
+        self.assertEqual(counts['Group 0'], 2)
+        self.assertEqual(counts['Group 1'], 1)
+        self.assertIn('username', groups[0]['created_by'])
+
+    def test_user_groups_query_budget(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('user_groups'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 500)
+        # The member count covers every member, not just the requesting user.
+        self.assertTrue(all(g['members_count'] == 2 for g in response.data))
+
+
+class DoubtPaginationTests(TestCase):
+    """
+    Doubt lists are paged with opaque (created_at, id) cursors.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='alice', password='pw')
+        cls.group = Group.objects.create(name='Physics', created_by=cls.user)
+        other = Group.objects.create(name='Maths', created_by=cls.user)
+        cls.doubts = Doubt.objects.bulk_create(
+            [
+                Doubt(group=cls.group, asked_by=cls.user, title=f'Doubt {i}', body='?')
+                for i in range(25)
+            ]
+            + [Doubt(group=other, asked_by=cls.user, title='Elsewhere', body='?')]
+        )
+        # Rows sharing a timestamp must still page without gaps or repeats.
+        tied = timezone.now()
+        Doubt.objects.filter(id__in=[d.id for d in cls.doubts[5:15]]).update(created_at=tied)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def fetch_all(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(d['id'] for d in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_pages_cover_group_once_in_order(self):
+        url = reverse('doubt_list_create') + f'?group_id={self.group.id}&page_size=4'
+        ids = self.fetch_all(url)
+
+        expected = list(
+            Doubt.objects.filter(group=self.group)
+            .order_by('-created_at', '-id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_default_page_size(self):
+        response = self.client.get(reverse('doubt_list_create'))
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('doubt_list_create') + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_with_an_out_of_range_id(self):
+        for pk in ('1e400', str(2 ** 63), '0', '-1'):
+            raw = f'["2025-01-01T00:00:00+00:00", {pk}]'.encode()
+            cursor = base64.urlsafe_b64encode(raw).decode().rstrip('=')
+            response = self.client.get(reverse('doubt_list_create'), {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, pk)
+
+
+class DoubtRepresentationTests(TestCase):
+    """
+    Lists return doubt summaries; the full thread comes from the detail view.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='alice', password='pw')
+        cls.helper = User.objects.create_user(username='bob', password='pw')
+        cls.group = Group.objects.create(name='Physics', created_by=cls.user)
+        GroupMember.objects.create(group=cls.group, user=cls.user)
+        GroupMember.objects.create(group=cls.group, user=cls.helper)
+        cls.doubts = Doubt.objects.bulk_create(
+            [
+                Doubt(
+                    group=cls.group,
+                    asked_by=cls.user,
+                    directed_to=cls.helper,
+                    title=f'Doubt {i}',
+                    body='?',
+                )
+                for i in range(10)
+            ]
+        )
+        DoubtReply.objects.bulk_create(
+            [DoubtReply(doubt=d, user=cls.helper, text='Try this') for d in cls.doubts]
+            + [DoubtReply(doubt=cls.doubts[0], user=cls.user, text='Thanks', is_solution=True)]
+        )
+        call_command('reconcile_counters', stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_returns_summaries_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('doubt_list_create'))
+
+        summaries = {d['id']: d for d in response.data['results']}
+        first = summaries[self.doubts[0].id]
+        self.assertEqual(first['group'], {'id': self.group.id, 'name': 'Physics'})
+        self.assertEqual(first['reply_count'], 2)
+        self.assertTrue(first['has_solution'])
+        self.assertFalse(summaries[self.doubts[1].id]['has_solution'])
+        self.assertNotIn('replies', first)
+
+    def test_assigned_returns_summaries_in_one_query(self):
+        self.client.force_authenticate(self.helper)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('my_assigned_doubts'))
+
+        self.assertEqual(len(response.data), 10)
+        self.assertIn('reply_count', response.data[0])
+
+    def test_detail_returns_thread(self):
+        doubt = self.doubts[0]
+        response = self.client.get(reverse('doubt_detail', args=[doubt.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['group']['members_count'], 2)
+        self.assertEqual([r['text'] for r in response.data['replies']], ['Try this', 'Thanks'])
+
+    def test_detail_not_found(self):
+        response = self.client.get(reverse('doubt_detail', args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+
+class CounterTests(TestCase):
+    """
+    Counter columns are maintained by the write views and reconciled on demand.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='alice', password='pw')
+        cls.user = User.objects.create_user(username='bob', password='pw')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(reverse('group_list_create'), {'name': 'Physics'})
+        self.group = Group.objects.get(id=response.data['id'])
+        self.client.force_authenticate(self.user)
+
+    def test_create_join_and_leave(self):
+        self.assertEqual(self.group.members_count, 1)
+
+        self.client.post(reverse('join_group', args=[self.group.id]))
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.members_count, 2)
+
+        response = self.client.post(reverse('join_group', args=[self.group.id]))
+        self.assertEqual(response.status_code, 400)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.members_count, 2)
+
+        self.client.post(reverse('leave_group', args=[self.group.id]))
+        response = self.client.post(reverse('leave_group', args=[self.group.id]))
+        self.assertEqual(response.status_code, 400)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.members_count, 1)
+
+    def test_reply_increments_reply_count(self):
+        doubt = Doubt.objects.create(group=self.group, asked_by=self.owner, title='?', body='?')
+        self.client.post(reverse('join_group', args=[self.group.id]))
+
+        self.client.post(reverse('doubt_reply', args=[doubt.id]), {'text': 'Try this'})
+        self.client.post(reverse('doubt_reply', args=[doubt.id]), {'text': 'Or this'})
+
+        doubt.refresh_from_db()
+        self.assertEqual(doubt.reply_count, 2)
+
+    def test_reconcile_counters(self):
+        doubt = Doubt.objects.create(group=self.group, asked_by=self.owner, title='?', body='?')
+        DoubtReply.objects.create(doubt=doubt, user=self.owner, text='!')
+        Group.objects.filter(id=self.group.id).update(members_count=7)
+
+        out = StringIO()
+        call_command('reconcile_counters', '--dry-run', stdout=out)
+        self.assertIn('Group.members_count: 1 drifted', out.getvalue())
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.members_count, 7)
+
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn('Doubt.reply_count: 1 fixed', out.getvalue())
+        self.group.refresh_from_db()
+        doubt.refresh_from_db()
+        self.assertEqual(self.group.members_count, 1)
+        self.assertEqual(doubt.reply_count, 1)
+
+
+class QueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    """
+    Every list endpoint's queries are answered from an index.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='alice', password='pw')
+        cls.helper = User.objects.create_user(username='bob', password='pw')
+        cls.group = Group.objects.create(name='Physics', created_by=cls.user)
+        GroupMember.objects.create(group=cls.group, user=cls.user)
+        doubts = Doubt.objects.bulk_create(
+            [
+                Doubt(group=cls.group, asked_by=cls.user, directed_to=cls.helper, title='?', body='?')
+                for _ in range(30)
+            ]
+        )
+        DoubtReply.objects.bulk_create(
+            [DoubtReply(doubt=d, user=cls.helper, text='!', is_solution=True) for d in doubts]
+        )
+        cls.doubt = doubts[0]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_all_pages(self, url):
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            url = response.data['next']
+
+    def test_doubt_lists(self):
+        base = reverse('doubt_list_create') + '?page_size=10'
+        self.assertQueriesUseIndexes(lambda: self.get_all_pages(base))
+        self.assertQueriesUseIndexes(
+            lambda: self.get_all_pages(f'{base}&group_id={self.group.id}')
+        )
+
+    def test_assigned_doubts(self):
+        self.client.force_authenticate(self.helper)
+        self.assertQueriesUseIndexes(lambda: self.client.get(reverse('my_assigned_doubts')))
+
+    def test_doubt_detail(self):
+        self.assertQueriesUseIndexes(
+            lambda: self.client.get(reverse('doubt_detail', args=[self.doubt.id]))
+        )
+
+    def test_group_lists(self):
+        self.assertQueriesUseIndexes(
+            lambda: self.get_all_pages(reverse('group_list_create') + '?page_size=1')
+        )
+        # Ordering the user's groups sorts the (small) membership result.
+        self.assertQueriesUseIndexes(
+            lambda: self.client.get(reverse('user_groups')), allow_sort=True
+        )
+
+
+class SimilarDoubtTests(TestCase):
+    """
+    Creating a doubt returns similar answered doubts from the same group.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='alice', password='pw')
+        cls.group = Group.objects.create(name='Physics', created_by=cls.user)
+        cls.other = Group.objects.create(name='Maths', created_by=cls.user)
+        GroupMember.objects.create(group=cls.group, user=cls.user)
+        cls.answered = Doubt.objects.create(
+            group=cls.group, asked_by=cls.user, status='answered',
+            title='Range of a projectile launched at an angle',
+            body='How do I calculate the horizontal range of a projectile launched at 45 degrees?'
+        )
+        Doubt.objects.create(
+            group=cls.group, asked_by=cls.user,
+            title='Range of a projectile launched at an angle',
+            body='Still open, so never suggested.'
+        )
+        Doubt.objects.create(
+            group=cls.other, asked_by=cls.user, status='answered',
+            title='Range of a projectile launched at an angle', body='Other group.'
+        )
+        Doubt.objects.create(
+            group=cls.group, asked_by=cls.user, status='answered',
+            title='Ohm law', body='Why does current depend on resistance?'
+        )
+
+    def setUp(self):
+        similarity.index.clear()
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def ask(self, title, body):
+        response = self.client.post(
+            reverse('doubt_list_create'),
+            {'group_id': self.group.id, 'title': title, 'body': body},
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.data['similar_doubts']
+
+    def test_returns_similar_answered_doubts(self):
+        similar = self.ask(
+            'Projectile range at an angle',
+            'How to calculate the horizontal range of a projectile launched at 30 degrees?',
+        )
+        self.assertEqual([d['id'] for d in similar], [self.answered.id])
+        self.assertGreaterEqual(similar[0]['similarity'], similarity.THRESHOLD)
+
+    def test_unrelated_question(self):
+        self.assertEqual(self.ask('Photosynthesis', 'What do chloroplasts do?'), [])
+
+    def test_marking_a_solution_indexes_the_doubt(self):
+        self.ask('warm up', 'load the index')
+        doubt = Doubt.objects.create(
+            group=self.group, asked_by=self.user,
+            title='Photosynthesis in leaves', body='What do chloroplasts do in leaves?'
+        )
+        reply = DoubtReply.objects.create(doubt=doubt, user=self.user, text='They make sugar.')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('mark_solution', args=[doubt.id]), {'reply_id': reply.id})
+
+        similar = self.ask('Photosynthesis in leaves', 'What do chloroplasts do?')
+        self.assertEqual([d['id'] for d in similar], [doubt.id])
+
+        doubt.delete()
+        self.assertEqual(self.ask('Photosynthesis in leaves', 'What do chloroplasts do?'), [])
+
+
+    def test_refresh_only_signs_doubts_it_has_not_indexed(self):
+        self.ask('warm up', 'load the index')
+        # Changes made by another process, which this index hasn't seen.
+        doubt = Doubt.objects.create(
+            group=self.group, asked_by=self.user, status='answered',
+            title='Photosynthesis in leaves', body='What do chloroplasts do in leaves?'
+        )
+        Doubt.objects.filter(id=self.answered.id).update(status='closed')
+
+        self.enterContext(mock.patch.object(similarity, 'REFRESH_SECONDS', 0))
+        sign = self.enterContext(
+            mock.patch.object(similarity, 'signature', wraps=similarity.signature)
+        )
+        similar = self.ask('Photosynthesis in leaves', 'What do chloroplasts do?')
+        # The question and the newly answered doubt.
+        self.assertEqual(sign.call_count, 2)
+        self.assertEqual([d['id'] for d in similar], [doubt.id])
+
+        self.assertEqual(self.ask(
+            'Projectile range at an angle',
+            'How to calculate the horizontal range of a projectile launched at 30 degrees?',
+        ), [])
+
+class BulkMembershipTests(TestCase):
+    """
+    Whole classes are added to or removed from a group in one request.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='teacher', password='pw')
+        cls.students = User.objects.bulk_create(
+            [User(username=f'student{i}') for i in range(5000)]
+        )
+        cls.group = Group.objects.create(name='Physics', created_by=cls.owner, members_count=1)
+        GroupMember.objects.create(group=cls.group, user=cls.owner)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = reverse('bulk_membership', args=[self.group.id])
+
+    def test_import_a_whole_class(self):
+        ids = [s.id for s in self.students]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {'add': ids}, format='json')
+
+        # No per-user queries: a few lookups plus batched inserts (SQLite
+        # caps each INSERT at 999 parameters).
+        self.assertLess(len(ctx), 30)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['added'], 5000)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.members_count, 5001)
+        self.assertEqual(GroupMember.objects.filter(group=self.group).count(), 5001)
+
+    def test_per_user_outcomes(self):
+        first, second, third = [s.id for s in self.students[:3]]
+        GroupMember.objects.create(group=self.group, user_id=first)
+        Group.objects.filter(id=self.group.id).update(members_count=2)
+
+        response = self.client.post(
+            self.url,
+            {'add': [first, second, second, 0], 'remove': [self.owner.id, third]},
+            format='json',
+        )
+
+        self.assertEqual(response.data['added'], 1)
+        self.assertEqual(response.data['removed'], 1)
+        self.assertEqual(
+            [(r['user_id'], r['result']) for r in response.data['results']],
+            [
+                (first, 'already_member'),
+                (second, 'added'),
+                (0, 'user_not_found'),
+                (self.owner.id, 'removed'),
+                (third, 'not_member'),
+            ],
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.members_count, 2)
+
+    def test_only_creator(self):
+        self.client.force_authenticate(self.students[0])
+        response = self.client.post(self.url, {'add': [self.students[1].id]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_invalid_payload(self):
+        response = self.client.post(self.url, {'add': 'everyone'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, {'add': [1], 'remove': [1]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        for ids in ([True], [1.0], [str(self.students[0].id)]):
+            response = self.client.post(self.url, {'add': ids}, format='json')
+            self.assertEqual(response.status_code, 400, ids)
+
+    def test_rows_skipped_for_a_concurrent_join_are_not_counted(self):
+        first, second = [s.id for s in self.students[:2]]
+        bulk_create = GroupMember.objects.bulk_create
+
+        def join_first(objs, **kwargs):
+            # As JoinGroupView would, between the membership read and the insert.
+            GroupMember.objects.create(group=self.group, user_id=first)
+            Group.objects.filter(id=self.group.id).update(members_count=F('members_count') + 1)
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(GroupMember.objects, 'bulk_create', join_first):
+            response = self.client.post(self.url, {'add': [first, second]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.members_count, 3)
+
+
+class MembershipCacheTests(TestCase):
+    """
+    Membership checks on the write path are answered from the cache.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='alice', password='pw')
+        cls.user = User.objects.create_user(username='bob', password='pw')
+        cls.group = Group.objects.create(name='Physics', created_by=cls.owner, members_count=1)
+        GroupMember.objects.create(group=cls.group, user=cls.owner)
+        cls.doubt = Doubt.objects.create(group=cls.group, asked_by=cls.owner, title='?', body='?')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def membership_queries(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = method(url, data)
+        return response, [q for q in ctx.captured_queries if 'groups_app_groupmember' in q['sql']]
+
+    def test_warm_cache_checks_cost_no_queries(self):
+        reply_url = reverse('doubt_reply', args=[self.doubt.id])
+        response, queries = self.membership_queries(self.client.post, reply_url, {'text': 'Hi'})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(len(queries), 1)
+
+        # Joining invalidates the cached "not a member" answer.
+        self.client.post(reverse('join_group', args=[self.group.id]))
+
+        response, queries = self.membership_queries(self.client.post, reply_url, {'text': 'Hi'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.membership_queries(self.client.post, reply_url, {'text': 'Again'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(queries, [])
+
+        response, queries = self.membership_queries(
+            self.client.post,
+            reverse('doubt_list_create'),
+            {'group_id': self.group.id, 'title': '?', 'body': '?'},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(queries, [])
+
+    def test_leave_and_bulk_invalidate(self):
+        self.client.post(reverse('join_group', args=[self.group.id]))
+        self.client.post(reverse('leave_group', args=[self.group.id]))
+        response = self.client.post(reverse('doubt_reply', args=[self.doubt.id]), {'text': 'Hi'})
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(self.owner)
+        self.client.post(
+            reverse('bulk_membership', args=[self.group.id]), {'add': [self.user.id]}, format='json'
+        )
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('doubt_reply', args=[self.doubt.id]), {'text': 'Hi'})
+        self.assertEqual(response.status_code, 201)
+
+
+class ResponseCacheTests(TestCase):
+    """
+    List responses are cached per generation and revalidated with ETags.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='alice', password='pw')
+        cls.group = Group.objects.create(name='Physics', created_by=cls.user, members_count=1)
+        GroupMember.objects.create(group=cls.group, user=cls.user)
+        cls.doubt = Doubt.objects.create(group=cls.group, asked_by=cls.user, title='?', body='?')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('doubt_list_create') + f'?group_id={self.group.id}'
+
+    def test_repeat_reads_skip_the_orm(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_bump_the_group_generation(self):
+        etag = self.client.get(self.url)['ETag']
+        other_group = self.client.get(reverse('doubt_list_create') + '?group_id=0')['ETag']
+
+        self.client.post(reverse('doubt_reply', args=[self.doubt.id]), {'text': 'Hi'})
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['reply_count'], 1)
+        # Other groups' lists are untouched by the write.
+        response = self.client.get(
+            reverse('doubt_list_create') + '?group_id=0', HTTP_IF_NONE_MATCH=other_group
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_group_id_spellings_share_a_generation(self):
+        padded = reverse('doubt_list_create') + f'?group_id=0{self.group.id}'
+        etag = self.client.get(padded)['ETag']
+
+        self.client.post(reverse('doubt_reply', args=[self.doubt.id]), {'text': 'Hi'})
+
+        response = self.client.get(padded, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['reply_count'], 1)
+        response = self.client.get(reverse('doubt_list_create') + '?group_id=abc')
+        self.assertEqual(response.status_code, 400)
+
+    def test_membership_changes_bump_group_list(self):
+        other = User.objects.create_user(username='bob', password='pw')
+        etag = self.client.get(reverse('group_list_create'))['ETag']
+
+        self.client.force_authenticate(other)
+        self.client.post(reverse('join_group', args=[self.group.id]))
+
+        response = self.client.get(reverse('group_list_create'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['members_count'], 2)
+
+
+    def test_leaving_a_group_one_is_not_in_keeps_the_group_list(self):
+        other = User.objects.create_user(username='bob', password='pw')
+        etag = self.client.get(reverse('group_list_create'))['ETag']
+
+        self.client.force_authenticate(other)
+        response = self.client.post(reverse('leave_group', args=[self.group.id]))
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse('group_list_create'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+class FastSerializationTests(TestCase):
+    """
+    The values()-based list builders match the serializers field for field.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='alice', email='a@example.com', password='pw')
+        cls.helper = User.objects.create_user(username='bob', password='pw')
+        cls.group = Group.objects.create(
+            name='Physics', description='Mechanics', created_by=cls.user, members_count=2
+        )
+        cls.directed = Doubt.objects.create(
+            group=cls.group, asked_by=cls.user, directed_to=cls.helper,
+            title='Torque', body='Why?', reply_count=1
+        )
+        cls.open = Doubt.objects.create(group=cls.group, asked_by=cls.helper, title='Work', body='How?')
+        DoubtReply.objects.create(doubt=cls.directed, user=cls.helper, text='!', is_solution=True)
+
+    def test_groups(self):
+        groups = Group.objects.order_by('id')
+        self.assertEqual(
+            groups_from_values(groups.values(*GROUP_VALUES)),
+            GroupSerializer(groups.select_related('created_by'), many=True).data,
+        )
+
+    def test_doubt_summaries(self):
+        doubts = doubt_summary_queryset().order_by('id')
+        self.assertEqual(
+            doubt_summaries_from_values(doubts.values(*DOUBT_SUMMARY_VALUES)),
+            DoubtSummarySerializer(doubts, many=True).data,
+        )
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BenchmarkHarnessTests(TestCase):
+    """
+    Every API endpoint has a benchmark scenario and every scenario succeeds
+    against seeded data.
+    """
+
+    def setUp(self):
+        cache.clear()
+        similarity.index.clear()
+
+    def test_seed_data_creates_consistent_dataset(self):
+        call_command('seed_data', users=20, groups=3, doubts=30, posts=20, stdout=StringIO())
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Doubt.objects.count(), 30)
+
+        out = StringIO()
+        call_command('reconcile_counters', dry_run=True, stdout=out)
+        self.assertEqual(out.getvalue().count(': 0 drifted'), 3)
+
+    def test_every_url_has_a_scenario_that_succeeds(self):
+        from .management.commands.bench_api import (
+            SCENARIOS, Context, api_url_names, run_benchmarks
+        )
+        from .management.commands.seed_data import seed
+
+        self.assertEqual(api_url_names() - set(SCENARIOS), set())
+
+        ctx = Context(seed({
+            'users': 20, 'groups': 3, 'doubts': 30, 'replies': 60, 'posts': 20,
+            'comments': 20, 'reactions': 20, 'friendships': 20, 'pending_requests': 5,
+        }))
+        results = run_benchmarks(ctx, iterations=2, memory_samples=1)
+
+        for result in results:
+            self.assertTrue(
+                all(200 <= code < 300 for code in result['statuses']),
+                f"{result['endpoint']} returned {result['statuses']}",
+            )
+            self.assertIsNotNone(result['peak_kib'])
+
+
+class AsyncListViewTests(TestCase):
+    """
+    The async list endpoints return the same payloads as the sync ones.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='alice', password='pw')
+        cls.group = Group.objects.create(name='Physics', created_by=cls.user, members_count=1)
+        GroupMember.objects.create(group=cls.group, user=cls.user)
+        Group.objects.bulk_create([Group(name=f'G{i}', created_by=cls.user) for i in range(25)])
+        Doubt.objects.bulk_create(
+            [Doubt(group=cls.group, asked_by=cls.user, title=f'D{i}', body='?') for i in range(5)]
+        )
+        cls.token = str(AccessToken.for_user(cls.user))
+
+    def setUp(self):
+        cache.clear()
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def sync_data(self, name, params=None):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.get(reverse(name), params).json()
+
+    async def test_group_list_matches_sync_view(self):
+        response = await self.async_client.get(reverse('group_list_async'), headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 20)
+        self.assertIn('ETag', response)
+        self.assertEqual(
+            response.json()['results'],
+            (await sync_to_async(self.sync_data)('group_list_create'))['results'],
+        )
+
+    async def test_doubt_list_follows_cursor_and_filters_by_group(self):
+        url = reverse('doubt_list_async')
+        first = await self.async_client.get(
+            url, {'group_id': self.group.id, 'page_size': 3}, headers=self.headers
+        )
+        second = await self.async_client.get(first.json()['next'], headers=self.headers)
+
+        titles = [d['title'] for d in first.json()['results'] + second.json()['results']]
+        self.assertEqual(titles, ['D4', 'D3', 'D2', 'D1', 'D0'])
+        self.assertIsNone(second.json()['next'])
+        self.assertEqual(
+            first.json()['results'],
+            (await sync_to_async(self.sync_data)(
+                'doubt_list_create', {'group_id': self.group.id, 'page_size': 3}
+            ))['results'],
+        )
+
+    async def test_etag_returns_not_modified(self):
+        url = reverse('group_list_async')
+        first = await self.async_client.get(url, headers=self.headers)
+        second = await self.async_client.get(
+            url, headers={**self.headers, 'If-None-Match': first['ETag']}
+        )
+        self.assertEqual(second.status_code, 304)
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get(reverse('group_list_async'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+
+        response = await self.async_client.get(
+            reverse('group_list_async'), headers={'Authorization': 'Bearer nope'}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    async def test_rejects_other_methods(self):
+        response = await self.async_client.post(reverse('group_list_async'), headers=self.headers)
+        self.assertEqual(response.status_code, 405)
@@ -5,10 +5,14 @@ from .views import (
     UserGroupsView,
     JoinGroupView,
     LeaveGroupView,
+    BulkMembershipView,
     DoubtListCreateView,
     MyAssignedDoubtsView,
+    DoubtDetailView,
     DoubtReplyCreateView,
     MarkSolutionView,
+    AsyncGroupListView,
+    AsyncDoubtListView,
 )
 
 
@@ -17,10 +21,16 @@ urlpatterns = [
     path('groups/my/', UserGroupsView.as_view(), name='user_groups'),
     path('groups/<int:group_id>/join/', JoinGroupView.as_view(), name='join_group'),
     path('groups/<int:group_id>/leave/', LeaveGroupView.as_view(), name='leave_group'),
+    path('groups/<int:group_id>/members/bulk/', BulkMembershipView.as_view(), name='bulk_membership'),
 
     # Doubts
     path('doubts/', DoubtListCreateView.as_view(), name='doubt_list_create'),
     path('doubts/assigned/', MyAssignedDoubtsView.as_view(), name='my_assigned_doubts'),
+    path('doubts/<int:doubt_id>/', DoubtDetailView.as_view(), name='doubt_detail'),
     path('doubts/<int:doubt_id>/reply/', DoubtReplyCreateView.as_view(), name='doubt_reply'),
     path('doubts/<int:doubt_id>/solution/', MarkSolutionView.as_view(), name='mark_solution'),
+
+    # Async read endpoints
+    path('async/groups/', AsyncGroupListView.as_view(), name='group_list_async'),
+    path('async/doubts/', AsyncDoubtListView.as_view(), name='doubt_list_async'),
 ]
@@ -1,30 +1,92 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Prefetch
 
+from core import pubsub
+from core.async_views import AsyncAPIView
+from core.pagination import KeysetPagination
+from notifications import inbox
+from notifications.models import Notification
+
+from . import membership, response_cache, similarity
 from .models import Group, GroupMember, Doubt, DoubtReply #added DoubtListCreateView class before the GroupListCreateView class at "line 196"
 
-from .serializers import GroupSerializer, GroupMemberSerializer, DoubtSerializer, DoubtReplySerializer
+from .serializers import (
+    GroupSerializer,
+    GroupMemberSerializer,
+    DoubtSerializer,
+    DoubtReplySerializer,
+    GROUP_VALUES,
+    DOUBT_SUMMARY_VALUES,
+    groups_from_values,
+    doubt_summaries_from_values,
+)
+
+
+def doubt_summary_queryset():
+    """
+    Doubts with everything a doubt summary needs fetched in one query.
+    Lists read it through values(*DOUBT_SUMMARY_VALUES).
+    """
+    solutions = DoubtReply.objects.filter(doubt=OuterRef('pk'), is_solution=True)
+    return Doubt.objects.select_related('group', 'asked_by', 'directed_to').annotate(
+        has_solution=Exists(solutions),
+    )
+
+
+def group_id_param(request):
+    """
+    The ``group_id`` query parameter as an int, or None if it is absent.
+    Normalised so "01" and "1" share a response-cache scope.
+    """
+    group_id = request.query_params.get('group_id')
+    if not group_id:
+        return None
+    try:
+        return int(group_id)
+    except ValueError:
+        raise ValidationError({"detail": "group_id must be an integer."})
+
+
+def is_id_list(value):
+    """
+    Whether a request value is a list of integer ids. Floats, strings and
+    booleans (``true`` would otherwise become id 1) don't count.
+    """
+    return isinstance(value, list) and all(
+        isinstance(i, int) and not isinstance(i, bool) for i in value
+    )
+
 
 class DoubtListCreateView(APIView):
     """
-    GET: list doubts (optionally filter by group_id)
+    GET: list doubt summaries newest first, one cursor page at a time (optionally filter by group_id)
     POST: create a new doubt in a group, optionally directed to a specific user.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        group_id = request.query_params.get('group_id')
+        group_id = group_id_param(request)
 
-        doubts = Doubt.objects.all().order_by('-created_at')
-        if group_id:
+        doubts = doubt_summary_queryset()
+        if group_id is not None:
             doubts = doubts.filter(group_id=group_id)
 
-        serializer = DoubtSerializer(doubts, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        def build():
+            paginator = KeysetPagination()
+            rows = paginator.paginate_queryset(
+                doubts.values(*DOUBT_SUMMARY_VALUES), request, view=self
+            )
+            return paginator.get_paginated_response(doubt_summaries_from_values(rows)).data
+
+        scope = f'group:{group_id}' if group_id is not None else 'doubts'
+        return response_cache.cached_response(request, [scope], build)
 
     def post(self, request):
         group_id = request.data.get('group_id')
@@ -48,7 +110,7 @@ class DoubtListCreateView(APIView):
             )
 
         # Check the asker is a member of the group
-        if not GroupMember.objects.filter(group=group, user=request.user).exists():
+        if not membership.is_member(request.user.id, group.id):
             return Response(
                 {"detail": "You must be a member of this group to ask a doubt."},
                 status=status.HTTP_403_FORBIDDEN
@@ -65,7 +127,7 @@ class DoubtListCreateView(APIView):
                 )
 
             # Ensure directed_to is also a member of the group
-            if not GroupMember.objects.filter(group=group, user=directed_to).exists():
+            if not membership.is_member(directed_to.id, group.id):
                 return Response(
                     {"detail": "Target user is not a member of this group."},
                     status=status.HTTP_400_BAD_REQUEST
@@ -78,9 +140,19 @@ class DoubtListCreateView(APIView):
             title=title,
             body=body
         )
+        if directed_to is not None:
+            inbox.notify.enqueue(
+                directed_to.id, Notification.DOUBT_DIRECTED, request.user.id, doubt_id=doubt.id
+            )
+        response_cache.bump_group(group.id)
 
-        serializer = DoubtSerializer(doubt)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        data = DoubtSerializer(doubt).data
+        transaction.on_commit(
+            lambda: pubsub.publish(group.id, 'doubt_created', {'doubt_id': doubt.id})
+        )
+        # Point the asker at answered doubts that look like the same question.
+        data['similar_doubts'] = similarity.index.similar(group.id, title, body)
+        return Response(data, status=status.HTTP_201_CREATED)
 
 
 class MyAssignedDoubtsView(APIView):
@@ -90,11 +162,34 @@ class MyAssignedDoubtsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        doubts = Doubt.objects.filter(
+        doubts = doubt_summary_queryset().filter(
             directed_to=request.user
-        ).order_by('-created_at')
+        ).order_by('-created_at').values(*DOUBT_SUMMARY_VALUES)
+
+        return Response(doubt_summaries_from_values(doubts), status=status.HTTP_200_OK)
+
+
+class DoubtDetailView(APIView):
+    """
+    GET: a single doubt with its full group and reply thread.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, doubt_id):
+        replies = DoubtReply.objects.select_related('user').order_by('created_at', 'id')
+        doubts = Doubt.objects.select_related(
+            'group__created_by', 'asked_by', 'directed_to'
+        ).prefetch_related(Prefetch('replies', queryset=replies))
+
+        try:
+            doubt = doubts.get(id=doubt_id)
+        except Doubt.DoesNotExist:
+            return Response(
+                {"detail": "Doubt not found."},
+                status=status.HTTP_404_NOT_FOUND
+            )
 
-        serializer = DoubtSerializer(doubts, many=True)
+        serializer = DoubtSerializer(doubt)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -122,19 +217,28 @@ class DoubtReplyCreateView(APIView):
             )
 
         # Only members of the group can reply
-        if not GroupMember.objects.filter(group=doubt.group, user=request.user).exists():
+        if not membership.is_member(request.user.id, doubt.group_id):
             return Response(
                 {"detail": "You must be a member of this group to reply."},
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        reply = DoubtReply.objects.create(
-            doubt=doubt,
-            user=request.user,
-            text=text
-        )
+        with transaction.atomic():
+            reply = DoubtReply.objects.create(
+                doubt=doubt,
+                user=request.user,
+                text=text
+            )
+            Doubt.objects.filter(id=doubt.id).update(reply_count=F('reply_count') + 1)
+            inbox.notify.enqueue(
+                doubt.asked_by_id, Notification.DOUBT_REPLY, request.user.id, doubt_id=doubt.id
+            )
+        response_cache.bump_group(doubt.group_id)
 
         serializer = DoubtReplySerializer(reply)
+        transaction.on_commit(lambda: pubsub.publish(
+            doubt.group_id, 'reply_created', {'doubt_id': doubt.id, 'reply_id': reply.id}
+        ))
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
@@ -177,6 +281,8 @@ class MarkSolutionView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        newly_marked = not reply.is_solution
+
         # Unmark previous solutions
         DoubtReply.objects.filter(doubt=doubt, is_solution=True).update(is_solution=False)
 
@@ -185,6 +291,15 @@ class MarkSolutionView(APIView):
 
         doubt.status = 'answered'
         doubt.save()
+        transaction.on_commit(lambda: similarity.index.add(doubt))
+        if newly_marked:
+            inbox.notify.enqueue(
+                reply.user_id, Notification.SOLUTION_MARKED, request.user.id, doubt_id=doubt.id
+            )
+        transaction.on_commit(lambda: pubsub.publish(
+            doubt.group_id, 'solution_marked', {'doubt_id': doubt.id, 'reply_id': reply.id}
+        ))
+        response_cache.bump_group(doubt.group_id)
 
         return Response(
             {"message": "Solution marked successfully."},
@@ -195,15 +310,20 @@ class MarkSolutionView(APIView):
 # before the previous classes were added
 class GroupListCreateView(APIView):
     """
-    GET: List all groups.
+    GET: List groups newest first, one cursor page at a time.
     POST: Create a new group.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        groups = Group.objects.all().order_by('-created_at')
-        serializer = GroupSerializer(groups, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        def build():
+            paginator = KeysetPagination()
+            rows = paginator.paginate_queryset(
+                Group.objects.values(*GROUP_VALUES), request, view=self
+            )
+            return paginator.get_paginated_response(groups_from_values(rows)).data
+
+        return response_cache.cached_response(request, ['groups'], build)
 
     def post(self, request):
         name = request.data.get('name')
@@ -215,14 +335,18 @@ class GroupListCreateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        group = Group.objects.create(
-            name=name,
-            description=description,
-            created_by=request.user
-        )
+        with transaction.atomic():
+            group = Group.objects.create(
+                name=name,
+                description=description,
+                created_by=request.user,
+                members_count=1
+            )
 
-        # Add creator as group member
-        GroupMember.objects.create(group=group, user=request.user)
+            # Add creator as group member
+            GroupMember.objects.create(group=group, user=request.user)
+        membership.invalidate(request.user.id)
+        response_cache.bump('groups')
 
         serializer = GroupSerializer(group)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -235,10 +359,10 @@ class UserGroupsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        memberships = GroupMember.objects.filter(user=request.user)
-        groups = [m.group for m in memberships]
-        serializer = GroupSerializer(groups, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        groups = Group.objects.filter(
+            id__in=GroupMember.objects.filter(user=request.user).values('group_id')
+        ).order_by('-created_at').values(*GROUP_VALUES)
+        return Response(groups_from_values(groups), status=status.HTTP_200_OK)
 
 
 class JoinGroupView(APIView):
@@ -257,15 +381,28 @@ class JoinGroupView(APIView):
             )
 
         # Check if already a member
-        existing = GroupMember.objects.filter(group=group, user=request.user).first()
-        if existing:
+        if membership.is_member(request.user.id, group.id):
+            return Response(
+                {"detail": "You are already a member of this group."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            with transaction.atomic():
+                member = GroupMember.objects.create(group=group, user=request.user)
+                Group.objects.filter(id=group.id).update(members_count=F('members_count') + 1)
+        except IntegrityError:
+            # Lost a race with a concurrent join, or the cached membership
+            # was stale.
+            membership.invalidate(request.user.id)
             return Response(
                 {"detail": "You are already a member of this group."},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        membership.invalidate(request.user.id)
+        response_cache.bump('groups')
 
-        membership = GroupMember.objects.create(group=group, user=request.user)
-        serializer = GroupMemberSerializer(membership)
+        serializer = GroupMemberSerializer(member)
 
         return Response(
             {
@@ -291,16 +428,179 @@ class LeaveGroupView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        membership = GroupMember.objects.filter(group=group, user=request.user).first()
-        if not membership:
+        with transaction.atomic():
+            deleted, _ = GroupMember.objects.filter(group=group, user=request.user).delete()
+            if deleted:
+                Group.objects.filter(id=group.id, members_count__gt=0).update(
+                    members_count=F('members_count') - 1
+                )
+        membership.invalidate(request.user.id)
+
+        if not deleted:
             return Response(
                 {"detail": "You are not a member of this group."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-
-        membership.delete()
+        response_cache.bump('groups')
 
         return Response(
             {"message": "Left group successfully."},
             status=status.HTTP_200_OK
         )
+
+
+class BulkMembershipView(APIView):
+    """
+    POST: add and/or remove many users in one transaction.
+    Body: {"add": [user ids], "remove": [user ids]}. Only the group's
+    creator can do this. Returns one outcome per requested user.
+    """
+    permission_classes = [IsAuthenticated]
+    max_users = 10000
+
+    def post(self, request, group_id):
+        add_ids = request.data.get('add', [])
+        remove_ids = request.data.get('remove', [])
+        if not is_id_list(add_ids) or not is_id_list(remove_ids):
+            return Response(
+                {"detail": "add and remove must be lists of user ids."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # dict.fromkeys drops repeated ids but keeps request order
+        add_ids = list(dict.fromkeys(add_ids))
+        remove_ids = list(dict.fromkeys(remove_ids))
+
+        if not add_ids and not remove_ids:
+            return Response(
+                {"detail": "Provide user ids to add or remove."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if len(add_ids) + len(remove_ids) > self.max_users:
+            return Response(
+                {"detail": f"At most {self.max_users} users can be changed per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if set(add_ids) & set(remove_ids):
+            return Response(
+                {"detail": "A user cannot be both added and removed."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            group = Group.objects.get(id=group_id)
+        except Group.DoesNotExist:
+            return Response(
+                {"detail": "Group not found."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if group.created_by_id != request.user.id:
+            return Response(
+                {"detail": "Only the group's creator can manage members in bulk."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        requested = add_ids + remove_ids
+        with transaction.atomic():
+            # Lock the group row so concurrent bulk calls apply their
+            # counter deltas one after another.
+            Group.objects.select_for_update().filter(id=group.id).first()
+
+            existing_users = set(
+                User.objects.filter(id__in=requested).values_list('id', flat=True)
+            )
+            members = set(
+                GroupMember.objects.filter(group=group, user_id__in=requested)
+                .values_list('user_id', flat=True)
+            )
+
+            to_add = [uid for uid in add_ids if uid in existing_users and uid not in members]
+            to_remove = [uid for uid in remove_ids if uid in members]
+
+            GroupMember.objects.bulk_create(
+                [GroupMember(group=group, user_id=uid) for uid in to_add],
+                batch_size=1000,
+                ignore_conflicts=True,
+            )
+            removed = 0
+            if to_remove:
+                removed, _ = GroupMember.objects.filter(
+                    group=group, user_id__in=to_remove
+                ).delete()
+
+            changed = bool(to_add or removed)
+            if changed:
+                # Recounted under the lock: bulk_create skips rows a
+                # concurrent join inserted, so len(to_add) can overcount.
+                Group.objects.filter(id=group.id).update(
+                    members_count=GroupMember.objects.filter(group=group).count()
+                )
+        membership.invalidate(*to_add, *to_remove)
+        if changed:
+            response_cache.bump('groups')
+
+        results = []
+        for uid in add_ids:
+            if uid not in existing_users:
+                outcome = 'user_not_found'
+            elif uid in members:
+                outcome = 'already_member'
+            else:
+                outcome = 'added'
+            results.append({"user_id": uid, "result": outcome})
+        for uid in remove_ids:
+            if uid not in existing_users:
+                outcome = 'user_not_found'
+            elif uid in members:
+                outcome = 'removed'
+            else:
+                outcome = 'not_member'
+            results.append({"user_id": uid, "result": outcome})
+
+        return Response(
+            {
+                "added": len(to_add),
+                "removed": removed,
+                "results": results
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class AsyncGroupListView(AsyncAPIView):
+    """
+    GET: the group list served from the event loop (see GroupListCreateView).
+    """
+
+    async def get(self, request):
+        async def build():
+            paginator = KeysetPagination()
+            page = paginator.page_queryset(Group.objects.values(*GROUP_VALUES), request)
+            rows = paginator.paginate_rows([row async for row in page.aiterator()])
+            return paginator.get_paginated_data(groups_from_values(rows))
+
+        return await response_cache.acached_response(request, ['groups'], build)
+
+
+class AsyncDoubtListView(AsyncAPIView):
+    """
+    GET: the doubt list served from the event loop (see DoubtListCreateView).
+    """
+
+    async def get(self, request):
+        group_id = group_id_param(request)
+
+        doubts = doubt_summary_queryset()
+        if group_id is not None:
+            doubts = doubts.filter(group_id=group_id)
+
+        async def build():
+            paginator = KeysetPagination()
+            page = paginator.page_queryset(doubts.values(*DOUBT_SUMMARY_VALUES), request)
+            rows = paginator.paginate_rows([row async for row in page.aiterator()])
+            return paginator.get_paginated_data(doubt_summaries_from_values(rows))
+
+        scope = f'group:{group_id}' if group_id is not None else 'doubts'
+        return await response_cache.acached_response(request, [scope], build)
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Notification, NotificationCounter
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'kind', 'actor', 'is_read', 'created_at')
+    list_filter = ('kind', 'is_read')
+
+
+admin.site.register(NotificationCounter)
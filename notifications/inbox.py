@@ -0,0 +1,67 @@
+"""
+Per-user notification streams.
+
+Views enqueue ``notify`` (core/tasks.py), so the write happens off the
+request path. Each notification bumps the user's NotificationCounter in
+the same transaction, and marking notifications read takes the count
+down by as many rows as changed, so the unread count is one primary key
+read. Clients fetch new notifications with ``since_id`` instead of
+re-reading the lists they concern.
+"""
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from core.tasks import task
+
+from .models import Notification, NotificationCounter
+
+
+@task
+def notify(user_id, kind, actor_id, doubt_id=None, friend_request_id=None):
+    """
+    Add a notification to the user's stream. Nothing is written when
+    users act on their own things.
+    """
+    if user_id is None or user_id == actor_id:
+        return None
+    with transaction.atomic():
+        notification = Notification.objects.create(
+            user_id=user_id,
+            kind=kind,
+            actor_id=actor_id,
+            doubt_id=doubt_id,
+            friend_request_id=friend_request_id,
+        )
+        updated = NotificationCounter.objects.filter(user_id=user_id).update(
+            unread=F('unread') + 1
+        )
+        if not updated:
+            counter, created = NotificationCounter.objects.select_for_update().get_or_create(
+                user_id=user_id, defaults={'unread': 1}
+            )
+            if not created:
+                NotificationCounter.objects.filter(user_id=user_id).update(unread=F('unread') + 1)
+    return notification.id
+
+
+def unread_count(user_id):
+    counter = NotificationCounter.objects.filter(user_id=user_id).values_list('unread', flat=True)
+    return counter.first() or 0
+
+
+def mark_read(user_id, up_to_id=None):
+    """
+    Mark the user's unread notifications read, all of them or those up
+    to and including ``up_to_id``. Returns how many changed.
+    """
+    unread = Notification.objects.filter(user_id=user_id, is_read=False)
+    if up_to_id is not None:
+        unread = unread.filter(id__lte=up_to_id)
+    with transaction.atomic():
+        changed = unread.update(is_read=True)
+        if changed:
+            NotificationCounter.objects.filter(user_id=user_id).update(
+                unread=Greatest(F('unread') - changed, Value(0))
+            )
+    return changed
@@ -0,0 +1,51 @@
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class Notification(models.Model):
+    DOUBT_DIRECTED = 'doubt_directed'
+    DOUBT_REPLY = 'doubt_reply'
+    SOLUTION_MARKED = 'solution_marked'
+    FRIEND_REQUEST = 'friend_request'
+    KINDS = [
+        (DOUBT_DIRECTED, 'Doubt directed at you'),
+        (DOUBT_REPLY, 'Reply to your doubt'),
+        (SOLUTION_MARKED, 'Your reply was marked as the solution'),
+        (FRIEND_REQUEST, 'Friend request'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=20, choices=KINDS)
+    # SET_NULL rather than CASCADE so deleting the actor or subject doesn't
+    # drop unread rows and leave NotificationCounter.unread too high.
+    actor = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    doubt = models.ForeignKey(
+        'groups_app.Doubt', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    friend_request = models.ForeignKey(
+        'social.FriendRequest', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-id'], name='notif_user_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} for {self.user_id}"
+
+
+class NotificationCounter(models.Model):
+    """
+    A user's unread notification count, kept in step with Notification.is_read
+    by notifications.inbox.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
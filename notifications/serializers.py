@@ -0,0 +1,12 @@
+from rest_framework import serializers
+
+from accounts.serializers import UserSerializer
+from .models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    actor = UserSerializer(read_only=True)
+
+    class Meta:
+        model = Notification
+        fields = ['id', 'kind', 'actor', 'doubt', 'friend_request', 'is_read', 'created_at']
@@ -0,0 +1,114 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import tasks
+from core.models import Task
+from groups_app.models import Group, GroupMember
+
+from . import inbox
+from .models import Notification
+
+
+@override_settings(TASKS_EAGER=True)
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(username='alice', password='pw')
+        cls.bob = User.objects.create_user(username='bob', password='pw')
+        cls.group = Group.objects.create(name='Physics', created_by=cls.alice, members_count=2)
+        GroupMember.objects.bulk_create([
+            GroupMember(group=cls.group, user=cls.alice),
+            GroupMember(group=cls.group, user=cls.bob),
+        ])
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_doubt_reply_and_solution_notify_the_other_user(self):
+        alice, bob = self.client_for(self.alice), self.client_for(self.bob)
+
+        doubt_id = alice.post(reverse('doubt_list_create'), {
+            'group_id': self.group.id, 'title': 'Torque', 'body': 'Why?',
+            'directed_to_id': self.bob.id,
+        }, format='json').data['id']
+        reply_id = bob.post(
+            reverse('doubt_reply', args=[doubt_id]), {'text': 'Lever arm'}, format='json'
+        ).data['id']
+        alice.post(reverse('mark_solution', args=[doubt_id]), {'reply_id': reply_id}, format='json')
+
+        bob_kinds = [n['kind'] for n in bob.get(reverse('notifications')).data['results']]
+        alice_kinds = [n['kind'] for n in alice.get(reverse('notifications')).data['results']]
+        self.assertEqual(bob_kinds, [Notification.SOLUTION_MARKED, Notification.DOUBT_DIRECTED])
+        self.assertEqual(alice_kinds, [Notification.DOUBT_REPLY])
+
+    def test_marking_the_same_solution_again_does_not_notify_again(self):
+        alice, bob = self.client_for(self.alice), self.client_for(self.bob)
+        doubt_id = alice.post(reverse('doubt_list_create'), {
+            'group_id': self.group.id, 'title': 'Torque', 'body': 'Why?',
+        }, format='json').data['id']
+        reply_id = bob.post(
+            reverse('doubt_reply', args=[doubt_id]), {'text': 'Lever arm'}, format='json'
+        ).data['id']
+
+        for _ in range(2):
+            response = alice.post(
+                reverse('mark_solution', args=[doubt_id]), {'reply_id': reply_id}, format='json'
+            )
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(
+            Notification.objects.filter(user=self.bob, kind=Notification.SOLUTION_MARKED).count(), 1
+        )
+
+    def test_friend_request_notifies_receiver(self):
+        self.client_for(self.alice).post(
+            reverse('send_friend_request'), {'receiver_id': self.bob.id}, format='json'
+        )
+
+        notification = Notification.objects.get(user=self.bob)
+        self.assertEqual(notification.kind, Notification.FRIEND_REQUEST)
+        self.assertEqual(notification.actor, self.alice)
+        self.assertIsNotNone(notification.friend_request_id)
+
+    def test_unread_count_and_mark_read(self):
+        ids = [
+            inbox.notify(self.bob.id, Notification.FRIEND_REQUEST, self.alice.id) for _ in range(3)
+        ]
+        bob = self.client_for(self.bob)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(bob.get(reverse('notifications_unread_count')).data, {'unread': 3})
+
+        response = bob.post(reverse('notifications_mark_read'), {'up_to_id': ids[1]}, format='json')
+        self.assertEqual(response.data, {'marked': 2, 'unread': 1})
+        response = bob.post(reverse('notifications_mark_read'), {}, format='json')
+        self.assertEqual(response.data, {'marked': 1, 'unread': 0})
+
+    def test_since_id_returns_only_newer_notifications(self):
+        first = inbox.notify(self.bob.id, Notification.FRIEND_REQUEST, self.alice.id)
+        second = inbox.notify(self.bob.id, Notification.FRIEND_REQUEST, self.alice.id)
+
+        data = self.client_for(self.bob).get(reverse('notifications'), {'since_id': first}).data
+
+        self.assertEqual([n['id'] for n in data['results']], [second])
+        self.assertEqual(data['last_id'], second)
+        self.assertFalse(data['has_more'])
+
+    def test_own_actions_are_not_notified(self):
+        self.assertIsNone(inbox.notify(self.alice.id, Notification.DOUBT_REPLY, self.alice.id))
+        self.assertEqual(inbox.unread_count(self.alice.id), 0)
+
+    @override_settings(TASKS_EAGER=False)
+    def test_notifications_are_written_by_the_task_worker(self):
+        self.client_for(self.alice).post(
+            reverse('send_friend_request'), {'receiver_id': self.bob.id}, format='json'
+        )
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(Task.objects.get().name, 'notifications.inbox.notify')
+
+        tasks.work(once=True)
+        self.assertEqual(inbox.unread_count(self.bob.id), 1)
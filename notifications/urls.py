@@ -0,0 +1,10 @@
+from django.urls import path
+
+from .views import NotificationListView, UnreadCountView, MarkReadView
+
+
+urlpatterns = [
+    path('', NotificationListView.as_view(), name='notifications'),
+    path('unread-count/', UnreadCountView.as_view(), name='notifications_unread_count'),
+    path('read/', MarkReadView.as_view(), name='notifications_mark_read'),
+]
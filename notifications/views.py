@@ -0,0 +1,91 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+
+from . import inbox
+from .models import Notification
+from .serializers import NotificationSerializer
+
+
+PAGE_SIZE = 50
+
+
+def _int_param(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class NotificationListView(APIView):
+    """
+    GET: the logged-in user's notifications.
+
+    Without ``since_id``, the latest PAGE_SIZE newest first. With
+    ``since_id``, up to PAGE_SIZE newer than it, oldest first; keep
+    passing ``last_id`` back while ``has_more`` is true to catch up.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        notifications = Notification.objects.filter(user=request.user).select_related('actor')
+        since_id = request.query_params.get('since_id')
+
+        if since_id is None:
+            page = list(notifications.order_by('-id')[:PAGE_SIZE])
+            last_id = page[0].id if page else None
+            has_more = False
+        else:
+            since_id = _int_param(since_id)
+            if since_id is None:
+                return Response(
+                    {"detail": "since_id must be an integer."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            page = list(notifications.filter(id__gt=since_id).order_by('id')[:PAGE_SIZE + 1])
+            has_more = len(page) > PAGE_SIZE
+            page = page[:PAGE_SIZE]
+            last_id = page[-1].id if page else since_id
+
+        return Response(
+            {
+                "results": NotificationSerializer(page, many=True).data,
+                "last_id": last_id,
+                "has_more": has_more,
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class UnreadCountView(APIView):
+    """
+    GET: how many of the logged-in user's notifications are unread.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread": inbox.unread_count(request.user.id)}, status=status.HTTP_200_OK)
+
+
+class MarkReadView(APIView):
+    """
+    POST: mark notifications read; all of them, or up to ``up_to_id``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        up_to_id = request.data.get('up_to_id')
+        if up_to_id is not None:
+            up_to_id = _int_param(up_to_id)
+            if up_to_id is None:
+                return Response(
+                    {"detail": "up_to_id must be an integer."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        marked = inbox.mark_read(request.user.id, up_to_id)
+        return Response(
+            {"marked": marked, "unread": inbox.unread_count(request.user.id)},
+            status=status.HTTP_200_OK
+        )
@@ -0,0 +1,129 @@
+from django.db import migrations
+
+# One FTS5 table indexes doubts, replies, posts and comments. The rowid is
+# derived from (object id, kind) so triggers can update and delete entries
+# by rowid instead of scanning the unindexed columns.
+CREATE_TABLE = """
+CREATE VIRTUAL TABLE search_index USING fts5(
+    title,
+    body,
+    kind UNINDEXED,
+    object_id UNINDEXED,
+    parent_id UNINDEXED,
+    group_id UNINDEXED,
+    tokenize = 'porter unicode61'
+)
+"""
+
+# (kind, rowid offset, table, indexed columns, title, body, parent, group)
+SOURCES = [
+    (
+        "doubt",
+        0,
+        "groups_app_doubt",
+        "title, body, group_id",
+        "{row}.title",
+        "{row}.body",
+        "NULL",
+        "{row}.group_id",
+    ),
+    (
+        "reply",
+        1,
+        "groups_app_doubtreply",
+        "text, doubt_id",
+        "''",
+        "{row}.text",
+        "{row}.doubt_id",
+        "(SELECT group_id FROM groups_app_doubt WHERE id = {row}.doubt_id)",
+    ),
+    (
+        "post",
+        2,
+        "social_post",
+        "content, group_id",
+        "''",
+        "{row}.content",
+        "NULL",
+        "{row}.group_id",
+    ),
+    (
+        "comment",
+        3,
+        "social_comment",
+        "text, post_id",
+        "''",
+        "{row}.text",
+        "{row}.post_id",
+        "(SELECT group_id FROM social_post WHERE id = {row}.post_id)",
+    ),
+]
+
+INSERT = "INSERT INTO search_index(rowid, title, body, kind, object_id, parent_id, group_id) "
+
+
+def select_list(kind, offset, title, body, parent, group, row):
+    return ", ".join(
+        [
+            f"{row}.id * 4 + {offset}",
+            title.format(row=row),
+            body.format(row=row),
+            f"'{kind}'",
+            f"{row}.id",
+            parent.format(row=row),
+            group.format(row=row),
+        ]
+    )
+
+
+def statements():
+    yield CREATE_TABLE
+    for kind, offset, table, indexed, title, body, parent, group in SOURCES:
+        values = select_list(kind, offset, title, body, parent, group, "new")
+        insert_new = f"{INSERT}VALUES ({values});"
+        delete_old = f"DELETE FROM search_index WHERE rowid = old.id * 4 + {offset};"
+        yield (
+            f"CREATE TRIGGER search_{kind}_ai AFTER INSERT ON {table} "
+            f"BEGIN {insert_new} END"
+        )
+        # Only re-index when indexed columns change, so counter and status
+        # updates don't rewrite the FTS row.
+        yield (
+            f"CREATE TRIGGER search_{kind}_au AFTER UPDATE OF {indexed} ON {table} "
+            f"BEGIN {delete_old} {insert_new} END"
+        )
+        yield (
+            f"CREATE TRIGGER search_{kind}_ad AFTER DELETE ON {table} "
+            f"BEGIN {delete_old} END"
+        )
+        # Backfill existing rows.
+        existing = select_list(kind, offset, title, body, parent, group, table)
+        yield f"{INSERT}SELECT {existing} FROM {table}"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in statements():
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for kind, *_ in SOURCES:
+        for suffix in ("ai", "au", "ad"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS search_{kind}_{suffix}")
+    schema_editor.execute("DROP TABLE IF EXISTS search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups_app", "0004_indexes"),
+        ("social", "0005_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,88 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from groups_app.models import Group, Doubt, DoubtReply
+from social.models import Post, Comment
+
+
+class SearchTests(TestCase):
+    """
+    The FTS5 index follows inserts, updates and deletes through triggers.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='alice', password='pw')
+        cls.physics = Group.objects.create(name='Physics', created_by=cls.user)
+        cls.maths = Group.objects.create(name='Maths', created_by=cls.user)
+        cls.title_hit = Doubt.objects.create(
+            group=cls.physics, asked_by=cls.user,
+            title='Projectile motion', body='How do I find the range?'
+        )
+        cls.body_hit = Doubt.objects.create(
+            group=cls.maths, asked_by=cls.user,
+            title='Quadratics', body='Used for projectile paths'
+        )
+        cls.reply = DoubtReply.objects.create(
+            doubt=cls.body_hit, user=cls.user, text='Think of projectiles as parabolas'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.physics, content='Notes on friction', post_type='tip'
+        )
+        cls.comment = Comment.objects.create(post=cls.post, user=cls.user, text='Great friction notes')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, **params):
+        response = self.client.get(reverse('search'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def hits(self, **params):
+        return [(r['kind'], r['id']) for r in self.search(**params)['results']]
+
+    def test_title_matches_rank_first(self):
+        hits = self.hits(q='projectile')
+        self.assertEqual(hits[0], ('doubt', self.title_hit.id))
+        self.assertIn(('doubt', self.body_hit.id), hits)
+        # Porter stemming plus prefix matching also finds "projectiles".
+        self.assertIn(('reply', self.reply.id), hits)
+
+    def test_group_scope(self):
+        self.assertEqual(self.hits(q='projectile', group_id=self.physics.id), [('doubt', self.title_hit.id)])
+        results = self.search(q='friction', group_id=self.physics.id)['results']
+        self.assertEqual(
+            {(r['kind'], r['id'], r['parent_id']) for r in results},
+            {('post', self.post.id, None), ('comment', self.comment.id, self.post.id)},
+        )
+
+    def test_updates_and_deletes_are_indexed(self):
+        self.post.content = 'Notes on momentum'
+        self.post.save()
+        self.assertEqual(self.hits(q='momentum'), [('post', self.post.id)])
+
+        self.post.delete()
+        self.assertEqual(self.hits(q='momentum'), [])
+        self.assertEqual(self.hits(q='friction'), [])
+
+    def test_pagination(self):
+        Doubt.objects.bulk_create(
+            [Doubt(group=self.physics, asked_by=self.user, title=f'Orbit {i}', body='?') for i in range(5)]
+        )
+        first = self.search(q='orbit', page_size=3)
+        self.assertEqual(len(first['results']), 3)
+        second = self.client.get(first['next']).data
+        self.assertEqual(len(second['results']), 2)
+        self.assertIsNone(second['next'])
+
+    def test_operators_are_treated_as_text(self):
+        hits = self.hits(q='friction* -( "')
+        self.assertEqual(set(hits), {('post', self.post.id), ('comment', self.comment.id)})
+
+    def test_query_required(self):
+        response = self.client.get(reverse('search'), {'q': '  '})
+        self.assertEqual(response.status_code, 400)
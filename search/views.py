@@ -0,0 +1,113 @@
+import re
+
+from django.db import connection
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+# bm25() weights for the title and body columns.
+TITLE_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+
+def build_match_query(text):
+    """
+    Turn free text into an FTS5 MATCH expression. Every word is quoted so
+    user input can't inject FTS operators; the last word matches as a
+    prefix so results show up while the user is still typing.
+    """
+    tokens = TOKEN.findall(text)
+    if not tokens:
+        return None
+    quoted = [f'"{token}"' for token in tokens]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def run_search(match, group_id=None, limit=20, offset=0):
+    sql = [
+        'SELECT kind, object_id, parent_id, group_id, title,',
+        "snippet(search_index, 1, '[', ']', '…', 16),",
+        'bm25(search_index, %s, %s) AS score',
+        'FROM search_index WHERE search_index MATCH %s',
+    ]
+    params = [TITLE_WEIGHT, BODY_WEIGHT, match]
+    if group_id is not None:
+        sql.append('AND group_id = %s')
+        params.append(group_id)
+    sql.append('ORDER BY score LIMIT %s OFFSET %s')
+    params.extend([limit, offset])
+
+    with connection.cursor() as cursor:
+        cursor.execute(' '.join(sql), params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            "kind": kind,
+            "id": object_id,
+            "parent_id": parent_id,
+            "group_id": group,
+            "title": title,
+            "snippet": snippet,
+            "score": score,
+        }
+        for kind, object_id, parent_id, group, title, snippet, score in rows
+    ]
+
+
+class SearchView(APIView):
+    """
+    GET: full-text search over doubts, replies, posts and comments,
+    best BM25 match first. Optional group_id scopes results to a group.
+    """
+    permission_classes = [IsAuthenticated]
+    page_size = 20
+    max_page_size = 100
+
+    def get(self, request):
+        if connection.vendor != 'sqlite':
+            return Response(
+                {"detail": "Search requires the SQLite FTS5 index."},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+
+        match = build_match_query(request.query_params.get('q', ''))
+        if match is None:
+            return Response(
+                {"detail": "q is required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            group_id = request.query_params.get('group_id')
+            group_id = int(group_id) if group_id else None
+            page = max(1, int(request.query_params.get('page', 1)))
+            page_size = int(request.query_params.get('page_size', self.page_size))
+        except ValueError:
+            return Response(
+                {"detail": "group_id, page and page_size must be integers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        page_size = max(1, min(page_size, self.max_page_size))
+
+        # Fetch one extra row to learn whether there is a next page.
+        results = run_search(match, group_id, page_size + 1, (page - 1) * page_size)
+
+        next_url = None
+        if len(results) > page_size:
+            params = request.query_params.copy()
+            params['page'] = page + 1
+            next_url = request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+        return Response(
+            {
+                "next": next_url,
+                "results": results[:page_size]
+            },
+            status=status.HTTP_200_OK
+        )
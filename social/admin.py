@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import FriendRequest, Post, Comment, PostInteraction
+from .models import FriendRequest, Friendship, Post, Comment, PostInteraction
 
-admin.site.register([FriendRequest, Post, Comment, PostInteraction])
+admin.site.register([FriendRequest, Friendship, Post, Comment, PostInteraction])
 
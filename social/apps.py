@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class SocialConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "social"
+
+    def ready(self):
+        from django.db.models.signals import post_delete
+
+        from . import images
+        from .models import Post
+
+        post_delete.connect(
+            images.on_post_deleted,
+            sender=Post,
+            dispatch_uid='social.images.on_post_deleted',
+        )
@@ -0,0 +1,117 @@
+"""
+Per-user home feeds.
+
+A new post is fanned out on write: one FeedEntry row per friend of the
+author, per member of the post's group and for the author. Groups with
+more than FEED_FANOUT_MAX_GROUP_SIZE members are skipped at write time
+and their posts are pulled when the feed is read instead, so a post in a
+huge group doesn't write a row for every member.
+"""
+from django.conf import settings
+from django.db.models import Prefetch
+
+from core.pagination import KeysetPagination
+from core.tasks import task
+from groups_app.models import Group, GroupMember
+
+from .friends import friend_ids
+from .models import Post, Comment, FeedEntry
+
+
+class FeedPagination(KeysetPagination):
+    """
+    Pages feed entries on (created_at, post_id), which matches the
+    (created_at, id) keys of the posts they point at.
+    """
+    id_field = 'post_id'
+
+
+@task
+def fan_out_post(post_id):
+    """
+    Write the post into the feed of everyone who should see it.
+    """
+    try:
+        post = Post.objects.select_related('group').get(id=post_id)
+    except Post.DoesNotExist:
+        return 0
+
+    recipients = {post.author_id} | friend_ids(post.author_id)
+    if post.group and post.group.members_count <= settings.FEED_FANOUT_MAX_GROUP_SIZE:
+        recipients.update(
+            GroupMember.objects.filter(group_id=post.group_id).values_list('user_id', flat=True)
+        )
+
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(user_id=user_id, post_id=post.id, created_at=post.created_at)
+            for user_id in recipients
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return len(recipients)
+
+
+def schedule_fan_out(post):
+    """
+    Fan the post out inline, or as a background task when
+    FEED_FANOUT_ASYNC is set. Call after the post's transaction has
+    committed.
+    """
+    if settings.FEED_FANOUT_ASYNC:
+        fan_out_post.enqueue(post.id)
+    else:
+        fan_out_post(post.id)
+
+
+def large_group_ids(user):
+    """
+    Groups of the user whose posts are pulled at read time.
+    """
+    return list(
+        Group.objects.filter(
+            memberships__user=user,
+            members_count__gt=settings.FEED_FANOUT_MAX_GROUP_SIZE,
+        ).values_list('id', flat=True)
+    )
+
+
+def with_post_relations(queryset, prefix=''):
+    comments = Comment.objects.select_related('user').order_by('created_at', 'id')
+    return queryset.select_related(
+        f'{prefix}author', f'{prefix}group'
+    ).prefetch_related(Prefetch(f'{prefix}comments', queryset=comments))
+
+
+def paginate_feed(request, view=None):
+    """
+    Return ``(paginator, posts)`` for one page of the requesting user's feed.
+    """
+    paginator = FeedPagination()
+    entries = with_post_relations(
+        FeedEntry.objects.filter(user=request.user), prefix='post__'
+    )
+    posts = [entry.post for entry in paginator.paginate_queryset(entries, request, view)]
+
+    large_groups = large_group_ids(request.user)
+    if not large_groups:
+        return paginator, posts
+
+    # Hybrid read: merge in the same page of posts from large groups,
+    # which were not fanned out. A post can come from both sides when its
+    # author is also a friend, so dedupe on id.
+    pulled = KeysetPagination()
+    pulled_posts = pulled.paginate_queryset(
+        with_post_relations(Post.objects.filter(group_id__in=large_groups)),
+        request,
+        view,
+    )
+
+    merged = {post.id: post for post in posts + pulled_posts}
+    merged = sorted(merged.values(), key=lambda p: (p.created_at, p.id), reverse=True)
+    page = merged[:paginator.page_size]
+
+    has_next = paginator.has_next or pulled.has_next or len(merged) > len(page)
+    paginator.next_position = (page[-1].created_at, page[-1].id) if has_next and page else None
+    return paginator, page
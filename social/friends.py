@@ -0,0 +1,46 @@
+"""
+Friendship lookups over the symmetric Friendship edge table.
+
+Every query here starts from the (user, friend) unique index, so none of
+them scan FriendRequest.
+"""
+from django.contrib.auth.models import User
+
+from .models import Friendship
+
+
+def add_friendship(user_id, friend_id):
+    Friendship.objects.bulk_create(
+        [
+            Friendship(user_id=user_id, friend_id=friend_id),
+            Friendship(user_id=friend_id, friend_id=user_id),
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def remove_friendship(user_id, friend_id):
+    Friendship.objects.filter(user_id=user_id, friend_id=friend_id).delete()
+    Friendship.objects.filter(user_id=friend_id, friend_id=user_id).delete()
+
+
+def are_friends(user_id, other_id):
+    return Friendship.objects.filter(user_id=user_id, friend_id=other_id).exists()
+
+
+def friend_ids(user_id):
+    return set(
+        Friendship.objects.filter(user_id=user_id).values_list('friend_id', flat=True)
+    )
+
+
+def friends_of(user_id):
+    return User.objects.filter(
+        id__in=Friendship.objects.filter(user_id=user_id).values('friend_id')
+    )
+
+
+def mutual_friends(user_id, other_id):
+    return friends_of(user_id).filter(
+        id__in=Friendship.objects.filter(user_id=other_id).values('friend_id')
+    )
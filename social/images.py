@@ -0,0 +1,266 @@
+"""
+Post image pipeline.
+
+The request reads the upload's header to check it is an image, and
+stores the original without its metadata: a JPEG is copied with its
+EXIF, XMP, IPTC and comment segments left out (no re-encoding; only the
+orientation is kept), and other formats are re-encoded only when their
+header carries metadata. Storage writes the result chunk by chunk.
+Resized WebP variants are made after the post is committed,
+as a background task when IMAGE_VARIANTS_ASYNC is set, and their storage
+names are saved in ``Post.image_variants``. Variants are re-encoded from
+pixels only, so EXIF (GPS position included) and other metadata are not
+carried over.
+
+Storage is content-addressed (core/storage.py), so a re-uploaded image
+gets the name of the earlier copy; its post then shares the earlier
+post's variants instead of encoding them again. Deleting a post drops its
+references to the image and variants.
+"""
+import os
+import shutil
+import tempfile
+import uuid
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from core.tasks import task
+
+from .models import Post
+
+
+# Pillow format -> file extension for the stored original.
+UPLOAD_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+
+
+# JPEG segments that carry metadata: APP1 (EXIF, XMP), APP13 (IPTC) and
+# comments.
+_JPEG_METADATA_MARKERS = {0xE1, 0xED, 0xFE}
+# JPEG markers that have no length field.
+_JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+
+# Image.info keys that describe the image rather than where it came from.
+_KEPT_INFO = {
+    'icc_profile', 'transparency', 'dpi', 'gamma', 'srgb', 'aspect',
+    'duration', 'loop', 'background', 'disposal',
+}
+
+_ORIENTATION = 0x0112
+
+
+def _orientation_exif(orientation):
+    """
+    An APP1 segment holding only the EXIF orientation, or b'' if the
+    image is upright.
+    """
+    if orientation in (None, 1):
+        return b''
+    exif = Image.Exif()
+    exif[_ORIENTATION] = orientation
+    data = exif.tobytes()
+    return b'\xff\xe1' + (len(data) + 2).to_bytes(2, 'big') + data
+
+
+def _copy_jpeg_without_metadata(source, dest, orientation):
+    """
+    Copy a JPEG from ``source`` to ``dest`` leaving out its metadata
+    segments. The compressed image data is copied as is.
+    """
+    read = source.read
+    if read(2) != b'\xff\xd8':
+        raise ValueError("Not a JPEG.")
+    dest.write(b'\xff\xd8')
+    dest.write(_orientation_exif(orientation))
+    while True:
+        marker = read(2)
+        while marker[1:] == b'\xff':  # Fill bytes before a marker.
+            marker = b'\xff' + read(1)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise ValueError("Malformed JPEG.")
+        code = marker[1]
+        if code in _JPEG_STANDALONE_MARKERS:
+            dest.write(marker)
+            continue
+        if code in (0xD9, 0xDA):
+            # End of image, or start of scan: the rest is image data.
+            dest.write(marker)
+            shutil.copyfileobj(source, dest)
+            return
+        length = read(2)
+        if len(length) < 2:
+            raise ValueError("Malformed JPEG.")
+        payload = read(int.from_bytes(length, 'big') - 2)
+        if code not in _JPEG_METADATA_MARKERS:
+            dest.write(marker + length + payload)
+
+
+def _reencode_without_metadata(img, dest):
+    """
+    Save ``img`` in its own format to ``dest`` keeping only _KEPT_INFO.
+    """
+    image_format = img.format
+    animated = getattr(img, 'is_animated', False)
+    if not animated:
+        img = ImageOps.exif_transpose(img)
+    img.info = {key: value for key, value in img.info.items() if key in _KEPT_INFO}
+    options = {'save_all': True} if animated else {}
+    if image_format == 'WEBP':
+        options['quality'] = 90
+    img.save(dest, image_format, **options)
+
+
+def _has_metadata(img):
+    return bool(img.getexif()) or any(key not in _KEPT_INFO for key in img.info)
+
+
+def prepare_upload(uploaded):
+    """
+    Check an uploaded file is an image in UPLOAD_FORMATS and return the
+    file to store: the upload under a random name, with its metadata
+    removed. Return None if it isn't an image in UPLOAD_FORMATS.
+    """
+    try:
+        img = Image.open(uploaded)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        uploaded.seek(0)
+        return None
+
+    with img:
+        image_format = img.format
+        if image_format not in UPLOAD_FORMATS:
+            uploaded.seek(0)
+            return None
+        name = f'{uuid.uuid4().hex}.{UPLOAD_FORMATS[image_format]}'
+
+        if image_format != 'JPEG' and not _has_metadata(img):
+            uploaded.seek(0)
+            uploaded.name = name
+            return uploaded
+
+        clean = tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        try:
+            if image_format == 'JPEG':
+                orientation = img.getexif().get(_ORIENTATION)
+                uploaded.seek(0)
+                _copy_jpeg_without_metadata(uploaded, clean, orientation)
+            else:
+                _reencode_without_metadata(img, clean)
+        except (ValueError, OSError, Image.DecompressionBombError):
+            clean.close()
+            return None
+    clean.seek(0)
+    return File(clean, name=name)
+
+
+def _has_alpha(img):
+    return 'A' in img.getbands() or 'transparency' in img.info
+
+
+def _reuse_variants(post):
+    """
+    Take references to the variants of another post with the same image.
+    Returns them, or None if there are none to share.
+    """
+    add_reference = getattr(post.image.storage, 'add_reference', None)
+    if add_reference is None:
+        return None
+    variants = (
+        Post.objects.filter(image=post.image.name)
+        .exclude(id=post.id)
+        .exclude(image_variants={})
+        .values_list('image_variants', flat=True)
+        .first()
+    )
+    if not variants or set(variants) != set(settings.IMAGE_VARIANTS):
+        return None
+    with transaction.atomic():
+        # A blob whose last post was deleted meanwhile can't be shared.
+        if not all(add_reference(name) for name in variants.values()):
+            transaction.set_rollback(True)
+            return None
+    return variants
+
+
+def _release(storage, names):
+    for name in names:
+        storage.delete(name)
+
+
+@task
+def generate_variants(post_id):
+    """
+    Write the IMAGE_VARIANTS of the post's image and record them on the
+    post. Returns the variant name -> storage name mapping.
+    """
+    try:
+        post = Post.objects.only('id', 'image').get(id=post_id)
+    except Post.DoesNotExist:
+        return {}
+    if not post.image:
+        return {}
+
+    storage = post.image.storage
+    variants = _reuse_variants(post)
+    if variants is not None:
+        _record_variants(post_id, storage, variants)
+        return variants
+
+    stem = os.path.splitext(os.path.basename(post.image.name))[0]
+    sizes = sorted(settings.IMAGE_VARIANTS.items(), key=lambda item: item[1], reverse=True)
+    variants = {}
+
+    with post.image.open('rb'), Image.open(post.image) as img:
+        # JPEGs decode straight at the smallest scale that still covers
+        # the largest variant, which is most of the work for big photos.
+        largest = sizes[0][1]
+        img.draft('RGB', (largest, largest))
+        source = ImageOps.exif_transpose(img)
+        source = source.convert('RGBA' if _has_alpha(source) else 'RGB')
+
+        # Largest first, each variant resized from the previous one.
+        for name, size in sizes:
+            source = source.copy()
+            source.thumbnail((size, size), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            source.save(buffer, 'WEBP', quality=settings.IMAGE_VARIANT_QUALITY, method=4)
+            variants[name] = storage.save(
+                f'posts/variants/{stem}_{name}.webp', ContentFile(buffer.getvalue())
+            )
+
+    _record_variants(post_id, storage, variants)
+    return variants
+
+
+def _record_variants(post_id, storage, variants):
+    if not Post.objects.filter(id=post_id).update(image_variants=variants):
+        # The post was deleted while its variants were being made.
+        _release(storage, variants.values())
+
+
+def schedule_variants(post):
+    """
+    Generate the post's image variants inline, or as a background task
+    when IMAGE_VARIANTS_ASYNC is set. Call after the post's transaction
+    has committed.
+    """
+    if not post.image:
+        return
+    if settings.IMAGE_VARIANTS_ASYNC:
+        generate_variants.enqueue(post.id)
+    else:
+        generate_variants(post.id)
+
+
+def on_post_deleted(sender, instance, **kwargs):
+    """
+    Release the deleted post's image and variants once the delete commits.
+    """
+    if not instance.image:
+        return
+    storage = instance.image.storage
+    names = [instance.image.name, *instance.image_variants.values()]
+    transaction.on_commit(lambda: _release(storage, names))
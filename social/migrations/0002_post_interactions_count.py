@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_interactions_count(apps, schema_editor):
+    Post = apps.get_model("social", "Post")
+    PostInteraction = apps.get_model("social", "PostInteraction")
+
+    interactions = (
+        PostInteraction.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    Post.objects.update(interactions_count=Coalesce(Subquery(interactions), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="interactions_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_interactions_count, migrations.RunPython.noop),
+    ]
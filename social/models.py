@@ -24,10 +24,43 @@ class FriendRequest(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['receiver', 'status', '-created_at'],
+                name='social_fr_receiver_idx',
+            ),
+            models.Index(fields=['sender', 'receiver'], name='social_fr_sender_idx'),
+        ]
+
     def __str__(self):
         return f"{self.sender.username} → {self.receiver.username} ({self.status})"
 
 
+class Friendship(models.Model):
+    """
+    Symmetric friendship edge, stored once in each direction so every
+    lookup starts from ``user``. Written when a FriendRequest is accepted.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='friendships'
+    )
+    friend = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'friend')
+
+    def __str__(self):
+        return f"{self.user_id} ↔ {self.friend_id}"
+
+
 class Post(models.Model):
     POST_TYPES = [
         ('question', 'Question'),
@@ -45,7 +78,18 @@ class Post(models.Model):
     content = models.TextField()
     post_type = models.CharField(max_length=20, choices=POST_TYPES)
     image = models.ImageField(upload_to='posts/', null=True, blank=True)
+    # Variant name -> storage name, filled in by social.images once the
+    # resized copies exist; empty until then.
+    image_variants = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained by ReactionView; see the reconcile_counters command.
+    interactions_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='social_post_created_idx'),
+            models.Index(fields=['group', '-created_at', '-id'], name='social_post_group_idx'),
+        ]
 
     def __str__(self):
         return f"{self.author.username} - {self.post_type}"
@@ -86,3 +130,34 @@ class PostInteraction(models.Model):
 
     def __str__(self):
         return f"{self.user.username} → {self.reaction} on post {self.post.id}"
+
+
+class FeedEntry(models.Model):
+    """
+    One post in one user's home feed, written when the post is created
+    (see social.feed). ``created_at`` is copied from the post so a feed
+    page is a single range scan over the (user, created_at) index.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(
+                fields=['user', '-created_at', '-post'],
+                name='social_feed_user_created_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Post {self.post_id} in {self.user_id}'s feed"
@@ -27,15 +27,18 @@ class PostSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     group_name = serializers.CharField(source='group.name', read_only=True)
     comments = CommentSerializer(many=True, read_only=True)
-    interactions_count = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
         fields = [
             'id', 'author', 'group', 'group_name', 'content',
-            'post_type', 'image', 'created_at', 'comments', 'interactions_count'
+            'post_type', 'image', 'image_variants', 'created_at', 'comments',
+            'interactions_count'
         ]
+        read_only_fields = ['interactions_count']
 
-    def get_interactions_count(self, obj):
-        return obj.interactions.count()
+    def get_image_variants(self, post):
+        storage = post.image.storage
+        return {name: storage.url(path) for name, path in post.image_variants.items()}
 
@@ -1,3 +1,386 @@
-from django.test import TestCase
+import tempfile
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.querycheck import detect_n_plus_one
+from core.testing import QueryPlanAssertionsMixin
+from groups_app.models import Group, GroupMember
+
+from .friends import add_friendship
+from .models import FriendRequest, Friendship, Post, Comment, FeedEntry, PostInteraction
+
+
+class ReactionCounterTests(TestCase):
+    """
+    ReactionView keeps Post.interactions_count in step with the reactions.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='alice', password='pw')
+        cls.user = User.objects.create_user(username='bob', password='pw')
+        cls.post = Post.objects.create(author=cls.author, content='Hi', post_type='tip')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_new_reaction_increments_and_update_does_not(self):
+        url = reverse('post_reaction', args=[self.post.id])
+        self.client.post(url, {'reaction': 'helpful'})
+        self.client.post(url, {'reaction': 'not_clear'})
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.interactions_count, 1)
+
+        response = self.client.get(reverse('post_list_create'))
+        self.assertEqual(response.data['results'][0]['interactions_count'], 1)
+
+    def test_concurrent_first_reaction_is_an_update(self):
+        # The other request's row lands between the lookup and the insert.
+        PostInteraction.objects.create(post=self.post, user=self.user, reaction='helpful')
+        url = reverse('post_reaction', args=[self.post.id])
+
+        with mock.patch.object(QuerySet, 'first', return_value=None):
+            response = self.client.post(url, {'reaction': 'not_clear'})
+
+        self.assertEqual(response.data, {'message': 'Reaction updated.'})
+        self.assertEqual(PostInteraction.objects.get().reaction, 'not_clear')
+
+
+class FeedTests(TestCase):
+    """
+    Posts are fanned out to friends and group members on creation.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='alice', password='pw')
+        cls.friend = User.objects.create_user(username='bob', password='pw')
+        cls.member = User.objects.create_user(username='carol', password='pw')
+        cls.stranger = User.objects.create_user(username='dave', password='pw')
+        FriendRequest.objects.create(sender=cls.friend, receiver=cls.author, status='accepted')
+        add_friendship(cls.friend.id, cls.author.id)
+        cls.group = Group.objects.create(name='Physics', created_by=cls.author, members_count=2)
+        GroupMember.objects.create(group=cls.group, user=cls.author)
+        GroupMember.objects.create(group=cls.group, user=cls.member)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def create_post(self, content, group=None):
+        self.client.force_authenticate(self.author)
+        data = {'content': content, 'post_type': 'tip'}
+        if group:
+            data['group_id'] = group.id
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('post_list_create'), data)
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def feed_ids(self, user, page_size=20):
+        self.client.force_authenticate(user)
+        ids = []
+        url = reverse('feed') + f'?page_size={page_size}'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(p['id'] for p in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_fan_out_on_write(self):
+        personal = self.create_post('Personal')
+        in_group = self.create_post('In group', group=self.group)
+
+        self.assertEqual(self.feed_ids(self.author), [in_group, personal])
+        self.assertEqual(self.feed_ids(self.friend), [in_group, personal])
+        self.assertEqual(self.feed_ids(self.member), [in_group])
+        self.assertEqual(self.feed_ids(self.stranger), [])
+
+    def test_feed_read_is_one_range_scan(self):
+        for i in range(5):
+            self.create_post(f'Post {i}', group=self.group)
+
+        self.client.force_authenticate(self.member)
+        # Feed entries with posts joined, then their comments, then the
+        # large-group lookup.
+        with self.assertNumQueries(3):
+            self.client.get(reverse('feed'))
+
+    @override_settings(FEED_FANOUT_MAX_GROUP_SIZE=1)
+    def test_large_groups_are_pulled_at_read_time(self):
+        personal = self.create_post('Personal')
+        posts = [self.create_post(f'Post {i}', group=self.group) for i in range(5)]
+
+        self.assertFalse(FeedEntry.objects.filter(user=self.member).exists())
+        self.assertEqual(self.feed_ids(self.member, page_size=2), posts[::-1])
+        # The friend sees group posts through fan-out; nothing is repeated.
+        self.assertEqual(self.feed_ids(self.friend, page_size=2), posts[::-1] + [personal])
+        self.assertEqual(self.feed_ids(self.author, page_size=4), posts[::-1] + [personal])
+
+
+class FriendshipTests(TestCase):
+    """
+    Accepted requests become symmetric Friendship edges.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(username='alice', password='pw')
+        cls.bob = User.objects.create_user(username='bob', password='pw')
+        cls.carol = User.objects.create_user(username='carol', password='pw')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def befriend(self, sender, receiver):
+        self.client.force_authenticate(sender)
+        response = self.client.post(reverse('send_friend_request'), {'receiver_id': receiver.id})
+        self.assertEqual(response.status_code, 201)
+        self.client.force_authenticate(receiver)
+        response = self.client.post(
+            reverse('respond_friend_request', args=[response.data['request']['id']]),
+            {'action': 'accept'},
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_accept_writes_both_directions(self):
+        self.befriend(self.alice, self.bob)
+
+        self.assertEqual(Friendship.objects.count(), 2)
+        for user, friend in [(self.alice, self.bob), (self.bob, self.alice)]:
+            self.client.force_authenticate(user)
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse('friends_list'))
+            self.assertEqual([u['id'] for u in response.data], [friend.id])
+
+    def test_rejecting_an_accepted_request_ends_the_friendship(self):
+        self.befriend(self.alice, self.bob)
+        friend_request = FriendRequest.objects.get()
+
+        response = self.client.post(
+            reverse('respond_friend_request', args=[friend_request.id]), {'action': 'reject'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Friendship.objects.exists())
+        self.assertEqual(self.client.get(reverse('friends_list')).data, [])
+
+    def test_cannot_request_existing_friend(self):
+        self.befriend(self.alice, self.bob)
+
+        self.client.force_authenticate(self.bob)
+        response = self.client.post(reverse('send_friend_request'), {'receiver_id': self.alice.id})
+        self.assertEqual(response.status_code, 400)
+
+    def test_mutual_friends(self):
+        self.befriend(self.alice, self.carol)
+        self.befriend(self.carol, self.bob)
+
+        self.client.force_authenticate(self.alice)
+        response = self.client.get(reverse('mutual_friends', args=[self.bob.id]))
+
+        self.assertFalse(response.data['is_friend'])
+        self.assertEqual([u['id'] for u in response.data['mutual_friends']], [self.carol.id])
+
+
+class QueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    """
+    Every social list endpoint's queries are answered from an index.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(username='alice', password='pw')
+        cls.bob = User.objects.create_user(username='bob', password='pw')
+        cls.group = Group.objects.create(name='Physics', created_by=cls.alice, members_count=1)
+        GroupMember.objects.create(group=cls.group, user=cls.alice)
+        FriendRequest.objects.create(sender=cls.bob, receiver=cls.alice)
+        add_friendship(cls.alice.id, cls.bob.id)
+        posts = Post.objects.bulk_create(
+            [Post(author=cls.alice, group=cls.group, content='Hi', post_type='tip') for _ in range(5)]
+        )
+        FeedEntry.objects.bulk_create(
+            [FeedEntry(user=cls.alice, post=p, created_at=p.created_at) for p in posts]
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def test_pending_friend_requests(self):
+        self.assertQueriesUseIndexes(lambda: self.client.get(reverse('pending_friend_requests')))
+
+    def test_friend_lists(self):
+        # Friends are ordered by username, which sorts the (small) result.
+        self.assertQueriesUseIndexes(
+            lambda: self.client.get(reverse('friends_list')), allow_sort=True
+        )
+        self.assertQueriesUseIndexes(
+            lambda: self.client.get(reverse('mutual_friends', args=[self.bob.id])), allow_sort=True
+        )
+
+    def test_posts_and_feed(self):
+        # Prefetching comments for a page of posts sorts the IN (...) result.
+        self.assertQueriesUseIndexes(
+            lambda: self.client.get(reverse('post_list_create')), allow_sort=True
+        )
+        self.assertQueriesUseIndexes(lambda: self.client.get(reverse('feed')), allow_sort=True)
+
+
+class PostListQueryTests(TestCase):
+    def test_post_list_does_not_query_per_post(self):
+        users = User.objects.bulk_create([User(username=f'user{i}') for i in range(10)])
+        group = Group.objects.create(name='Physics', created_by=users[0])
+        posts = Post.objects.bulk_create(
+            [Post(author=u, group=group, content='Hi', post_type='tip') for u in users]
+        )
+        Comment.objects.bulk_create([Comment(post=p, user=users[0], text='ok') for p in posts])
+        client = APIClient()
+        client.force_authenticate(users[0])
+
+        with detect_n_plus_one(threshold=1):
+            response = client.get(reverse('post_list_create'))
+
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(len(response.data['results'][0]['comments']), 1)
+
+
+class AsyncListViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(username='alice', password='pw')
+        cls.bob = User.objects.create_user(username='bob', password='pw')
+        cls.carol = User.objects.create_user(username='carol', password='pw')
+        add_friendship(cls.alice.id, cls.carol.id)
+        add_friendship(cls.alice.id, cls.bob.id)
+        post = Post.objects.create(author=cls.bob, content='Hi', post_type='tip')
+        Comment.objects.create(post=post, user=cls.carol, text='ok')
+        cls.headers = {'Authorization': f'Bearer {AccessToken.for_user(cls.alice)}'}
+
+    def sync_data(self, name):
+        client = APIClient()
+        client.force_authenticate(self.alice)
+        return client.get(reverse(name)).json()
+
+    async def test_post_list_matches_sync_view(self):
+        response = await self.async_client.get(reverse('post_list_async'), headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), await sync_to_async(self.sync_data)('post_list_create'))
+        self.assertEqual(response.json()['results'][0]['comments'][0]['text'], 'ok')
+
+    async def test_friends_list_matches_sync_view(self):
+        response = await self.async_client.get(reverse('friends_list_async'), headers=self.headers)
+
+        self.assertEqual([u['username'] for u in response.json()], ['bob', 'carol'])
+        self.assertEqual(response.json(), await sync_to_async(self.sync_data)('friends_list'))
+
+
+@override_settings(IMAGE_VARIANTS_ASYNC=False, IMAGE_VARIANTS={'thumb': 32, 'medium': 64})
+class PostImageTests(TestCase):
+    def setUp(self):
+        self.media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+        self.user = User.objects.create_user(username='alice', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, data, name='photo.jpg'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse('post_list_create'),
+                {'content': 'Slide', 'post_type': 'tip', 'image': SimpleUploadedFile(name, data)},
+                format='multipart',
+            )
+
+    def test_variants_are_resized_webp_without_exif(self):
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        buffer = BytesIO()
+        Image.new('RGB', (200, 100), 'red').save(buffer, 'JPEG', exif=exif)
+
+        response = self.upload(buffer.getvalue())
+
+        self.assertEqual(response.status_code, 201)
+        post = Post.objects.get()
+        self.assertNotEqual(post.image.name, 'posts/photo.jpg')
+        self.assertEqual(set(post.image_variants), {'thumb', 'medium'})
+        with post.image.storage.open(post.image_variants['thumb']) as f, Image.open(f) as thumb:
+            self.assertEqual(thumb.format, 'WEBP')
+            self.assertEqual(thumb.size, (32, 16))
+            self.assertNotIn('exif', thumb.info)
+
+        listed = self.client.get(reverse('post_list_create')).data['results'][0]
+        self.assertTrue(listed['image_variants']['thumb'].endswith('.webp'))
+
+    def test_stored_jpeg_has_no_metadata_but_keeps_its_orientation(self):
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        exif[0x0112] = 6
+        exif.get_ifd(0x8825)[2] = (51.0, 30.0, 0.0)
+        buffer = BytesIO()
+        Image.new('RGB', (200, 100), 'red').save(buffer, 'JPEG', exif=exif, comment=b'secret')
+
+        self.assertEqual(self.upload(buffer.getvalue()).status_code, 201)
+
+        post = Post.objects.get()
+        with post.image.open('rb'), Image.open(post.image) as stored:
+            self.assertEqual(stored.format, 'JPEG')
+            self.assertEqual(stored.size, (200, 100))
+            self.assertEqual(dict(stored.getexif()), {0x0112: 6})
+            self.assertNotIn('comment', stored.info)
+            stored.load()
+        with post.image.storage.open(post.image_variants['thumb']) as f, Image.open(f) as thumb:
+            self.assertEqual(thumb.size, (16, 32))
+
+    def test_stored_png_has_no_exif(self):
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        buffer = BytesIO()
+        Image.new('RGB', (100, 100), 'blue').save(buffer, 'PNG', exif=exif)
+
+        self.assertEqual(self.upload(buffer.getvalue(), name='slide.png').status_code, 201)
+
+        post = Post.objects.get()
+        with post.image.open('rb'), Image.open(post.image) as stored:
+            self.assertEqual(stored.format, 'PNG')
+            self.assertNotIn('exif', stored.info)
+            self.assertFalse(stored.getexif())
+
+    def test_duplicate_uploads_share_files_until_the_last_post_is_deleted(self):
+        buffer = BytesIO()
+        Image.new('RGB', (100, 100), 'blue').save(buffer, 'PNG')
+        self.upload(buffer.getvalue(), name='slide.png')
+        self.upload(buffer.getvalue(), name='slide-again.png')
+
+        first, second = Post.objects.order_by('id')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(first.image_variants, second.image_variants)
+        storage = first.image.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(storage.exists(second.image.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(storage.exists(second.image.name))
+        self.assertFalse(storage.exists(second.image_variants['thumb']))
+
+    def test_rejects_files_that_are_not_images(self):
+        response = self.upload(b'not an image', name='notes.jpg')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Post.objects.exists())
@@ -4,6 +4,7 @@ from .views import (
     PendingFriendRequestsView,
     RespondFriendRequestView,
     FriendsListView,
+    MutualFriendsView,
 )
 
 urlpatterns = [
@@ -11,17 +12,28 @@ urlpatterns = [
     path('friends/requests/', PendingFriendRequestsView.as_view(), name='pending_friend_requests'),
     path('friends/requests/<int:pk>/respond/', RespondFriendRequestView.as_view(), name='respond_friend_request'),
     path('friends/', FriendsListView.as_view(), name='friends_list'),
+    path('friends/<int:user_id>/mutual/', MutualFriendsView.as_view(), name='mutual_friends'),
 ]
 
 #added later
 from .views import (
     PostListCreateView,
+    FeedView,
     CommentCreateView,
     ReactionView,
 )
 
 urlpatterns += [
     path('posts/', PostListCreateView.as_view(), name='post_list_create'),
+    path('feed/', FeedView.as_view(), name='feed'),
     path('posts/<int:post_id>/comment/', CommentCreateView.as_view(), name='comment_create'),
     path('posts/<int:post_id>/react/', ReactionView.as_view(), name='post_reaction'),
 ]
+
+# Async read endpoints
+from .views import AsyncPostListView, AsyncFriendsListView
+
+urlpatterns += [
+    path('async/posts/', AsyncPostListView.as_view(), name='post_list_async'),
+    path('async/friends/', AsyncFriendsListView.as_view(), name='friends_list_async'),
+]
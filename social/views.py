@@ -1,4 +1,7 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import F
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -7,9 +10,14 @@ from rest_framework.permissions import IsAuthenticated
 from .models import FriendRequest
 from .serializers import FriendRequestSerializer
 from accounts.serializers import UserSerializer
+from core.async_views import AsyncAPIView, json_response
+from core.pagination import KeysetPagination
+from notifications import inbox
+from notifications.models import Notification
 
 from .models import Post, Comment, PostInteraction          # added for line 156
 from .serializers import PostSerializer, CommentSerializer
+from . import feed, friends, images
 
 class SendFriendRequestView(APIView):
     """
@@ -40,11 +48,15 @@ class SendFriendRequestView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Check if a pending or accepted request already exists
-        existing = FriendRequest.objects.filter(
-            sender=request.user,
-            receiver=receiver,
-        ).exclude(status='rejected').first()
+        # Check if already friends (in either direction) or a pending
+        # request already exists
+        existing = (
+            friends.are_friends(request.user.id, receiver.id)
+            or FriendRequest.objects.filter(
+                sender=request.user,
+                receiver=receiver,
+            ).exclude(status='rejected').exists()
+        )
 
         if existing:
             return Response(
@@ -56,6 +68,10 @@ class SendFriendRequestView(APIView):
             sender=request.user,
             receiver=receiver
         )
+        inbox.notify.enqueue(
+            receiver.id, Notification.FRIEND_REQUEST, request.user.id,
+            friend_request_id=friend_request.id
+        )
 
         return Response(
             {
@@ -76,7 +92,7 @@ class PendingFriendRequestsView(APIView):
         qs = FriendRequest.objects.filter(
             receiver=request.user,
             status='pending'
-        ).order_by('-created_at')
+        ).select_related('sender', 'receiver').order_by('-created_at')
 
         serializer = FriendRequestSerializer(qs, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -105,12 +121,17 @@ class RespondFriendRequestView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        if action == 'accept':
-            fr.status = 'accepted'
-        else:
-            fr.status = 'rejected'
+        with transaction.atomic():
+            if action == 'accept':
+                fr.status = 'accepted'
+                friends.add_friendship(fr.sender_id, fr.receiver_id)
+            else:
+                if fr.status == 'accepted':
+                    # Rejecting an accepted request ends the friendship.
+                    friends.remove_friendship(fr.sender_id, fr.receiver_id)
+                fr.status = 'rejected'
 
-        fr.save()
+            fr.save()
 
         return Response(
             {
@@ -124,46 +145,53 @@ class RespondFriendRequestView(APIView):
 class FriendsListView(APIView):
     """
     List all friends of the logged-in user.
-    We consider any accepted FriendRequest as a friendship.
+    Friendships are written when a FriendRequest is accepted.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        # Requests where current user is the sender
-        sent = FriendRequest.objects.filter(
-            sender=request.user,
-            status='accepted'
-        )
-
-        # Requests where current user is the receiver
-        received = FriendRequest.objects.filter(
-            receiver=request.user,
-            status='accepted'
-        )
+        friend_users = friends.friends_of(request.user.id).order_by('username')
+        serializer = UserSerializer(friend_users, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
-        friend_users = set()
 
-        for fr in sent:
-            friend_users.add(fr.receiver)
+class MutualFriendsView(APIView):
+    """
+    List the friends the logged-in user has in common with another user.
+    """
+    permission_classes = [IsAuthenticated]
 
-        for fr in received:
-            friend_users.add(fr.sender)
+    def get(self, request, user_id):
+        if not User.objects.filter(id=user_id).exists():
+            return Response(
+                {"detail": "User not found."},
+                status=status.HTTP_404_NOT_FOUND
+            )
 
-        serializer = UserSerializer(friend_users, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        mutual = friends.mutual_friends(request.user.id, user_id).order_by('username')
+        return Response(
+            {
+                "is_friend": friends.are_friends(request.user.id, user_id),
+                "mutual_friends": UserSerializer(mutual, many=True).data
+            },
+            status=status.HTTP_200_OK
+        )
 
 
 class PostListCreateView(APIView):
     """
-    GET: list all posts
+    GET: list posts newest first, one cursor page at a time
     POST: create a new post
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        posts = Post.objects.all().order_by('-created_at')
-        serializer = PostSerializer(posts, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(
+            feed.with_post_relations(Post.objects.all()), request, view=self
+        )
+        serializer = PostSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         content = request.data.get('content')
@@ -174,6 +202,11 @@ class PostListCreateView(APIView):
         if not content:
             return Response({"detail": "Content is required."}, status=400)
 
+        if image is not None:
+            image = images.prepare_upload(image)
+            if image is None:
+                return Response({"detail": "Upload a valid image."}, status=400)
+
         group = None
         if group_id:
             from groups_app.models import Group
@@ -189,11 +222,26 @@ class PostListCreateView(APIView):
             group=group,
             image=image
         )
+        transaction.on_commit(lambda: feed.schedule_fan_out(post))
+        transaction.on_commit(lambda: images.schedule_variants(post))
 
         serializer = PostSerializer(post)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class FeedView(APIView):
+    """
+    GET: the logged-in user's home feed (posts from friends, their groups
+    and themselves), newest first, one cursor page at a time.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        paginator, posts = feed.paginate_feed(request, view=self)
+        serializer = PostSerializer(posts, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
 class CommentCreateView(APIView):
     """
     POST: Add comment to a post
@@ -239,7 +287,49 @@ class ReactionView(APIView):
             existing.save()
             message = "Reaction updated."
         else:
-            PostInteraction.objects.create(post=post, user=request.user, reaction=reaction)
-            message = "Reaction added."
+            try:
+                with transaction.atomic():
+                    PostInteraction.objects.create(post=post, user=request.user, reaction=reaction)
+                    Post.objects.filter(id=post.id).update(
+                        interactions_count=F('interactions_count') + 1
+                    )
+                message = "Reaction added."
+            except IntegrityError:
+                # Lost a race with a concurrent first reaction; it counted.
+                PostInteraction.objects.filter(post=post, user=request.user).update(
+                    reaction=reaction
+                )
+                message = "Reaction updated."
 
         return Response({"message": message}, status=200)
+
+
+class AsyncPostListView(AsyncAPIView):
+    """
+    GET: the post list served from the event loop (see PostListCreateView).
+    """
+
+    async def get(self, request):
+        paginator = KeysetPagination()
+        page = paginator.page_queryset(feed.with_post_relations(Post.objects.all()), request)
+        # Iterating a prefetching queryset fetches the page and its
+        # comments together, so serializing doesn't touch the database and
+        # can run on the CPU-bound pool instead of the event loop.
+        rows = paginator.paginate_rows([post async for post in page])
+        data = await sync_to_async(
+            lambda: PostSerializer(rows, many=True).data,
+            thread_sensitive=False,
+            executor='serialization',
+        )()
+        return json_response(paginator.get_paginated_data(data))
+
+
+class AsyncFriendsListView(AsyncAPIView):
+    """
+    GET: the friends list served from the event loop (see FriendsListView).
+    """
+
+    async def get(self, request):
+        friend_users = friends.friends_of(request.user.id).order_by('username')
+        users = [user async for user in friend_users.aiterator()]
+        return json_response(UserSerializer(users, many=True).data)